@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from bookings.services.archive_service import ArchiveService
+
+class Command(BaseCommand):
+    help = "Move classes older than the retention window, with their bookings, into the archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days", type=int,
+            default=getattr(settings, "BOOKINGS_ARCHIVE_RETENTION_DAYS", 90),
+            help="Archive classes scheduled more than this many days ago.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=500,
+            help="Number of classes moved per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Archiving classes older than {options['retention_days']} days...")
+        archived_classes, archived_bookings = ArchiveService.archive_past_classes(
+            options["retention_days"], options["batch_size"]
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived_classes} classes and {archived_bookings} bookings"
+        ))
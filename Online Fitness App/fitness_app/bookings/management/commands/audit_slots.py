@@ -0,0 +1,38 @@
+import time
+from django.core.management.base import BaseCommand
+from bookings.services.slot_audit_service import SlotAuditService
+
+# mismatched classes listed individually in the output, the rest are only counted
+MAX_LISTED_MISMATCHES = 20
+
+class Command(BaseCommand):
+    help = "Find classes whose booked count differs from their bookings and repair them. Safe to run on a live database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500,
+            help="Number of classes repaired per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Only report the mismatched classes.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        class_ids = []
+        for class_id, booked_count, bookings, capacity in SlotAuditService.find_mismatches():
+            class_ids.append(class_id)
+            if len(class_ids) <= MAX_LISTED_MISMATCHES:
+                overbooked = " (overbooked)" if bookings > capacity else ""
+                self.stdout.write(
+                    f"Class {class_id}: booked_count {booked_count}, bookings {bookings}, capacity {capacity}{overbooked}"
+                )
+        self.stdout.write(f"Found {len(class_ids)} mismatched classes in {time.perf_counter() - started:.2f}s")
+
+        if options["dry_run"] or not class_ids:
+            return
+        repaired = SlotAuditService.repair(class_ids, options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Repaired {repaired} classes in {time.perf_counter() - started:.2f}s"
+        ))
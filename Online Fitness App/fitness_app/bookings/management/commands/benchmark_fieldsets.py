@@ -0,0 +1,78 @@
+import statistics
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from bookings.models import Booking, Client, FitnessClass, Instructor
+from bookings.services.listing_cache import ListingCache
+from bookings.views import BookingView, FitnessClassesView
+
+# (label, view, url) of every request that is timed, full payload first
+SCENARIOS = [
+    ("classes: all fields", FitnessClassesView, "/api/classes/get-all-classes/"),
+    ("classes: id,class_name,available_slots", FitnessClassesView,
+     "/api/classes/get-all-classes/?fields=id,class_name,available_slots"),
+    ("bookings: all fields", BookingView,
+     "/api/bookings/get-all-bookings/?email_address=bench@example.com&limit=200"),
+    ("bookings: fitness_class_name,scheduled_at", BookingView,
+     "/api/bookings/get-all-bookings/?email_address=bench@example.com&limit=200&fields=fitness_class_name,scheduled_at"),
+]
+
+class Command(BaseCommand):
+    help = "Compare payload size and latency of full and sparse (fields=) listings. Test data is rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--classes", type=int, default=2000, help="Number of upcoming classes to create.")
+        parser.add_argument("--bookings", type=int, default=200, help="Number of bookings of the benchmark client.")
+        parser.add_argument("--runs", type=int, default=20, help="Timed requests per scenario.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options["classes"], options["bookings"])
+            results = [self.measure(label, view, url, options["runs"]) for label, view, url in SCENARIOS]
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{'scenario':<45} {'bytes':>10} {'median ms':>10}")
+        for label, size, median in results:
+            self.stdout.write(f"{label:<45} {size:>10} {median:>10.2f}")
+        for (label, size, median), (_, full_size, full_median) in zip(results[1::2], results[0::2]):
+            self.stdout.write(self.style.SUCCESS(
+                f"{label}: {100 * (1 - size / full_size):.0f}% smaller, {100 * (1 - median / full_median):.0f}% faster"
+            ))
+
+    def seed(self, classes, bookings):
+        instructors = Instructor.objects.bulk_create(
+            [Instructor(instructor_name=f"Benchmark Instructor {i}") for i in range(20)]
+        )
+        start = timezone.now() + timedelta(days=1)
+        fitness_classes = FitnessClass.objects.bulk_create([
+            FitnessClass(
+                class_name=("YOGA", "ZUMBA", "HIIT")[i % 3],
+                instructor=instructors[i % len(instructors)],
+                available_slots=20,
+                scheduled_at=start + timedelta(hours=i),
+            )
+            for i in range(classes)
+        ])
+        client = Client.objects.create(
+            first_name="Bench", last_name="Mark", email_address="bench@example.com", phone_number="0000000000"
+        )
+        Booking.objects.bulk_create([
+            Booking(client=client, fitness_class=fitness_class, scheduled_at=fitness_class.scheduled_at)
+            for fitness_class in fitness_classes[:bookings]
+        ])
+
+    def measure(self, label, view, url, runs):
+        factory = APIRequestFactory()
+        handler = view.as_view()
+        timings = []
+        for _ in range(runs):
+            # a cached listing skips the query and serializer work the fieldsets save, measure that work
+            ListingCache.bump_version()
+            started = time.perf_counter()
+            response = handler(factory.get(url))
+            response.render()
+            timings.append((time.perf_counter() - started) * 1000)
+        return label, len(response.content), statistics.median(timings)
@@ -0,0 +1,88 @@
+import queue
+import threading
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+from bookings.models import Client, FitnessClass, Instructor
+from bookings.services.booking_service import BookingService
+
+BENCHMARK_EMAIL_DOMAIN = "group-commit.benchmark"
+
+class Command(BaseCommand):
+    help = (
+        "Compare booking throughput of per-request commits and group commit on a burst of bookings for one class. "
+        "Test data is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Bookings attempted per run.")
+        parser.add_argument("--threads", type=int, default=16, help="Concurrent request threads.")
+        parser.add_argument("--window-ms", type=int, default=5, help="Group commit window.")
+        parser.add_argument("--batch-size", type=int, default=50, help="Group commit maximum batch size.")
+
+    def handle(self, *args, **options):
+        modes = [
+            ("per-request commits", {"ENABLED": False}),
+            ("group commit", {
+                "ENABLED": True, "WINDOW_MS": options["window_ms"], "MAX_BATCH_SIZE": options["batch_size"],
+            }),
+        ]
+        results = []
+        for label, group_commit in modes:
+            instructor = Instructor.objects.create(instructor_name=f"Benchmark Instructor ({label})")
+            try:
+                with override_settings(BOOKINGS_GROUP_COMMIT=group_commit):
+                    results.append((label, *self.run(instructor, options["requests"], options["threads"])))
+            finally:
+                # cascades to the class, its bookings and its occupancy rollups
+                instructor.delete()
+                Client.objects.filter(email_address__endswith=f"@{BENCHMARK_EMAIL_DOMAIN}").delete()
+
+        self.stdout.write(f"{'mode':<22} {'booked':>7} {'errors':>7} {'seconds':>8} {'bookings/s':>11}")
+        for label, booked, errors, elapsed in results:
+            self.stdout.write(f"{label:<22} {booked:>7} {errors:>7} {elapsed:>8.2f} {booked / elapsed:>11.1f}")
+        (_, base_booked, _, base_elapsed), (_, booked, _, elapsed) = results
+        if base_booked:
+            self.stdout.write(self.style.SUCCESS(
+                f"group commit: {(booked / elapsed) / (base_booked / base_elapsed):.1f}x the throughput"
+            ))
+
+    def run(self, instructor, requests, threads):
+        fitness_class = FitnessClass.objects.create(
+            class_name="HIIT",
+            instructor=instructor,
+            capacity=requests,
+            scheduled_at=timezone.now() + timedelta(days=1),
+        )
+        pending = queue.Queue()
+        for i in range(requests):
+            pending.put(f"client{i}@{BENCHMARK_EMAIL_DOMAIN}")
+        errors = []
+
+        def worker():
+            try:
+                while True:
+                    try:
+                        email = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        BookingService.create_booking(fitness_class.id, "Bench", "Mark", email)
+                    except Exception as error:
+                        errors.append(error)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        fitness_class.refresh_from_db()
+        return fitness_class.booked_count, len(errors), elapsed
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from bookings.services.import_service import ImportService
+
+# failed rows listed individually in the output, the rest are only counted
+MAX_LISTED_ERRORS = 20
+
+class Command(BaseCommand):
+    help = (
+        "Import clients (upserted by email address) or fitness classes from a CSV file. "
+        "The file is streamed and written in chunks, one transaction each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=["clients", "classes"], help="What the file holds.")
+        parser.add_argument("path", help="CSV file with a header row.")
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000,
+            help="Number of rows validated and written per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        importer = ImportService.import_clients if options["kind"] == "clients" else ImportService.import_classes
+        try:
+            # utf-8-sig drops the byte order mark spreadsheet exports start with
+            with open(options["path"], newline="", encoding="utf-8-sig") as csv_file:
+                report = importer(csv_file, options["chunk_size"])
+        except (OSError, UnicodeDecodeError, ValueError) as error:
+            raise CommandError(str(error))
+
+        for line, message in report["errors"][:MAX_LISTED_ERRORS]:
+            self.stdout.write(f"Line {line}: {message}")
+        if report["failed"] > MAX_LISTED_ERRORS:
+            self.stdout.write(f"... and {report['failed'] - MAX_LISTED_ERRORS} more failed rows")
+
+        rate = report["rows"] / report["seconds"] if report["seconds"] else 0
+        summary = (
+            f"Read {report['rows']} rows in {report['seconds']:.2f}s ({rate:.0f} rows/s): "
+            f"{report['created']} created, {report['updated']} updated, {report['failed']} failed"
+        )
+        self.stdout.write(self.style.WARNING(summary) if report["failed"] else self.style.SUCCESS(summary))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from bookings.services.occupancy_service import OccupancyService
+
+class Command(BaseCommand):
+    help = "Recompute the occupancy rollups from the class and booking tables."
+
+    def handle(self, *args, **kwargs):
+        buckets = OccupancyService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {buckets} occupancy rollup buckets"))
@@ -4,6 +4,7 @@ from bookings.models.instructor_model import Instructor
 from bookings.models.fitness_class_model import FitnessClass
 from bookings.models.booking_model import Booking
 from bookings.models.client_model import Client
+from bookings.services.occupancy_service import OccupancyService
 import pytz
 
 class Command(BaseCommand):
@@ -39,19 +40,19 @@ class Command(BaseCommand):
             {
                 "class_name": "YOGA",
                 "instructor_id": 1,
-                "available_slots": 10,
+                "capacity": 10,
                 "scheduled_at": timezone.datetime(2025, 9, 1, 7, 0, 0)
             },
             {
                 "class_name": "ZUMBA",
                 "instructor_id": 2,
-                "available_slots": 15,
+                "capacity": 15,
                 "scheduled_at": timezone.datetime(2025, 8, 30, 10, 30, 0)
             },
             {
                 "class_name": "HIIT",
                 "instructor_id": 3,
-                "available_slots": 5,
+                "capacity": 5,
                 "scheduled_at": timezone.datetime(2025, 9, 3, 6, 30, 0)
             },
         ]
@@ -62,7 +63,7 @@ class Command(BaseCommand):
             fc = FitnessClass.objects.create(
                 class_name=c["class_name"],
                 instructor=instructors[c["instructor_id"]],
-                available_slots=c["available_slots"],
+                capacity=c["capacity"],
                 scheduled_at=scheduled_time
             )
             fitness_classes[c["class_name"]] = fc
@@ -100,9 +101,13 @@ class Command(BaseCommand):
                 client=client,
                 fitness_class=fc
             )
-            # decrement available slots
-            fc.available_slots -= 1
+            # take a slot
+            fc.booked_count += 1
             fc.save()
             self.stdout.write(self.style.SUCCESS(f"Booking for {client.first_name} in {fc.class_name} created"))
 
+        # seeded rows bypass the services, so recompute the analytics rollups from scratch
+        OccupancyService.rebuild()
+        self.stdout.write(self.style.SUCCESS("Occupancy rollups rebuilt"))
+
         self.stdout.write(self.style.SUCCESS("Seed data completed successfully!"))
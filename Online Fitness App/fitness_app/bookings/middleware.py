@@ -0,0 +1,161 @@
+import cProfile
+import random
+from contextlib import ExitStack
+from time import perf_counter
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import sync_and_async_middleware
+from django.utils.deprecation import MiddlewareMixin
+from bookings.services.compression import compress, negotiate_encoding
+from bookings.services.identity_map import identity_map_scope
+from bookings.services.metrics import DB_TIME, REQUEST_LATENCY, REQUESTS, QueryTimer
+from bookings.services.profiling import RequestProfile, current_profile, profile_scope, profiling_settings
+
+
+@sync_and_async_middleware
+def identity_map_middleware(get_response):
+    """
+    Gives every request its own identity map of loaded classes and instructors.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            with identity_map_scope():
+                return await get_response(request)
+    else:
+        def middleware(request):
+            with identity_map_scope():
+                return get_response(request)
+    return middleware
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """
+    Records the latency, database time and status code of every request, labelled by URL name.
+    """
+    def record(request, response, started, timer):
+        match = request.resolver_match
+        view = match.url_name if match and match.url_name else "unmatched"
+        REQUEST_LATENCY.observe(perf_counter() - started, view, request.method)
+        DB_TIME.observe(timer.seconds, view, request.method)
+        REQUESTS.inc(view, request.method, str(response.status_code))
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            timer = QueryTimer()
+            started = perf_counter()
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer))
+                response = await get_response(request)
+            record(request, response, started, timer)
+            return response
+    else:
+        def middleware(request):
+            timer = QueryTimer()
+            started = perf_counter()
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer))
+                response = get_response(request)
+            record(request, response, started, timer)
+            return response
+    return middleware
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses the JSON responses of the bookings API with brotli or gzip, as negotiated through Accept-Encoding.
+    Responses below `BOOKINGS_COMPRESSION_MIN_SIZE` bytes (e.g. error messages), streams and
+    responses that already carry a Content-Encoding (cached precompressed payloads) are left alone.
+    Other responses, the admin's HTML pages in particular, are never compressed: they carry CSRF tokens
+    whose compressed length would give them away (BREACH). Compress those with Django's GZipMiddleware,
+    which pads the compressed length.
+    """
+    @staticmethod
+    def is_bookings_api(request):
+        match = request.resolver_match
+        return match is not None and match.func.__module__ == "bookings.views"
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if not response.get("Content-Type", "").startswith("application/json") or not self.is_bookings_api(request):
+            return response
+        if len(response.content) < getattr(settings, "BOOKINGS_COMPRESSION_MIN_SIZE", 512):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        # the encoded body is no longer byte-for-byte the one a strong ETag promises
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profiles staff requests that ask for it with `?profile=1` or an `X-Profile: 1` header, plus a
+    `SAMPLE_RATE` fraction of all other staff requests (see `BOOKINGS_PROFILING`).
+    A profiled request runs under cProfile with every SQL query timed; the report, with EXPLAIN
+    plans of the slowest queries and validation / service / serialization / rendering timings,
+    is stored and its ID returned in the `X-Profile-Report` header.
+    When profiling is disabled the middleware is removed from the stack and costs nothing.
+    """
+    def __init__(self, get_response):
+        config = profiling_settings()
+        if not config["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = config["SAMPLE_RATE"]
+
+    def should_profile(self, request):
+        user = getattr(request, "user", None)
+        if user is None or not user.is_staff:
+            return False
+        if request.GET.get("profile") == "1" or request.META.get("HTTP_X_PROFILE") == "1":
+            return True
+        return random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        profiler = cProfile.Profile()
+        started = perf_counter()
+        with profile_scope(profile), ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile.record_query))
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        total_ms = (perf_counter() - started) * 1000
+
+        response["X-Profile-Report"] = profile.save(request, response, profiler, total_ms)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered by the handler right after this hook, time it as its own phase
+        profile = current_profile()
+        if profile is not None:
+            started = perf_counter()
+
+            def rendered(response):
+                profile.record_phase("rendering", (perf_counter() - started) * 1000)
+            response.add_post_render_callback(rendered)
+        return response
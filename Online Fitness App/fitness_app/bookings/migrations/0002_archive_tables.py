@@ -0,0 +1,37 @@
+# Generated by Django 4.2.20 on 2026-10-19 18:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedFitnessClass',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('class_name', models.CharField(choices=[('YOGA', 'Yoga'), ('ZUMBA', 'Zumba'), ('HIIT', 'HIIT')], max_length=100)),
+                ('available_slots', models.PositiveIntegerField()),
+                ('created_date', models.DateTimeField()),
+                ('updated_on', models.DateTimeField()),
+                ('scheduled_at', models.DateTimeField(db_index=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('instructor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_classes', to='bookings.instructor')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedBooking',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('booked_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bookings', to='bookings.client')),
+                ('fitness_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='bookings.archivedfitnessclass')),
+            ],
+        ),
+    ]
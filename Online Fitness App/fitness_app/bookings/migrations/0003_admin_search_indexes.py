@@ -0,0 +1,28 @@
+# Generated by Django 4.2.20 on 2026-10-19 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_archive_tables'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='client',
+            name='last_name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='fitnessclass',
+            name='class_name',
+            field=models.CharField(choices=[('YOGA', 'Yoga'), ('ZUMBA', 'Zumba'), ('HIIT', 'HIIT')], db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='instructor',
+            name='instructor_name',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+    ]
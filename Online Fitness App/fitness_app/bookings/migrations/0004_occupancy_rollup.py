@@ -0,0 +1,75 @@
+# Generated by Django 4.2.20 on 2026-10-19 18:46
+
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay, TruncDate
+import django.db.models.deletion
+
+
+def aggregate(queryset, prefix=''):
+    return queryset.annotate(
+        date=TruncDate(f'{prefix}scheduled_at'),
+        hour=ExtractHour(f'{prefix}scheduled_at'),
+        weekday=ExtractIsoWeekDay(f'{prefix}scheduled_at'),
+        bucket_class_name=F(f'{prefix}class_name'),
+        bucket_instructor_id=F(f'{prefix}instructor_id'),
+    ).values('date', 'hour', 'weekday', 'bucket_class_name', 'bucket_instructor_id').order_by()
+
+
+def fill_rollups(apps, schema_editor):
+    # the same aggregation as OccupancyService.rebuild(), over the tables as they are at this point
+    OccupancyRollup = apps.get_model('bookings', 'OccupancyRollup')
+    buckets = {}
+
+    def bucket_for(row):
+        key = (row['date'], row['hour'], row['bucket_class_name'], row['bucket_instructor_id'])
+        if key not in buckets:
+            buckets[key] = OccupancyRollup(
+                date=row['date'], weekday=row['weekday'], hour=row['hour'],
+                class_name=row['bucket_class_name'], instructor_id=row['bucket_instructor_id'],
+            )
+        return buckets[key]
+
+    for class_name, booking_name in (('FitnessClass', 'Booking'), ('ArchivedFitnessClass', 'ArchivedBooking')):
+        class_model = apps.get_model('bookings', class_name)
+        booking_model = apps.get_model('bookings', booking_name)
+        for row in aggregate(class_model.objects).annotate(classes=Count('id'), slots_left=Sum('available_slots')):
+            rollup = bucket_for(row)
+            rollup.classes_count += row['classes']
+            rollup.capacity += row['slots_left']
+        for row in aggregate(booking_model.objects, 'fitness_class__').annotate(bookings=Count('id')):
+            rollup = bucket_for(row)
+            rollup.bookings_count += row['bookings']
+            # available_slots counts what was left, a class's capacity is that plus its bookings
+            rollup.capacity += row['bookings']
+
+    OccupancyRollup.objects.bulk_create(buckets.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupancyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('weekday', models.PositiveSmallIntegerField()),
+                ('hour', models.PositiveSmallIntegerField()),
+                ('class_name', models.CharField(choices=[('YOGA', 'Yoga'), ('ZUMBA', 'Zumba'), ('HIIT', 'HIIT')], max_length=100)),
+                ('classes_count', models.PositiveIntegerField(default=0)),
+                ('capacity', models.PositiveIntegerField(default=0)),
+                ('bookings_count', models.PositiveIntegerField(default=0)),
+                ('instructor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy_rollups', to='bookings.instructor')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='occupancyrollup',
+            constraint=models.UniqueConstraint(fields=('date', 'hour', 'class_name', 'instructor'), name='unique_occupancy_bucket'),
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.20 on 2026-10-19 18:47
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Lower, Trim
+
+
+def copy_scheduled_at(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    FitnessClass = apps.get_model('bookings', 'FitnessClass')
+    Booking.objects.update(
+        scheduled_at=Subquery(
+            FitnessClass.objects.filter(pk=OuterRef('fitness_class_id')).values('scheduled_at')[:1]
+        )
+    )
+
+
+def normalize_emails(apps, schema_editor):
+    Client = apps.get_model('bookings', 'Client')
+    Booking = apps.get_model('bookings', 'Booking')
+    ArchivedBooking = apps.get_model('bookings', 'ArchivedBooking')
+    clients = Client.objects.annotate(normalized=Lower(Trim('email_address')))
+    # emails were matched case-sensitively before, the same person may have a client per spelling
+    duplicated = clients.values('normalized').annotate(clients=Count('id')).filter(clients__gt=1)
+    for email in duplicated.values_list('normalized', flat=True):
+        survivor, *duplicates = clients.filter(normalized=email).order_by('id').values_list('id', flat=True)
+        Booking.objects.filter(client_id__in=duplicates).update(client_id=survivor)
+        ArchivedBooking.objects.filter(client_id__in=duplicates).update(client_id=survivor)
+        Client.objects.filter(id__in=duplicates).delete()
+    Client.objects.update(email_address=Lower(Trim('email_address')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_occupancy_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='scheduled_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(copy_scheduled_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='booking',
+            name='scheduled_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['client', 'scheduled_at', 'id', 'fitness_class', 'booked_at'], name='booking_client_history_idx'),
+        ),
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.20 on 2026-10-19 18:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_booking_history_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedfitnessclass',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(default=60),
+        ),
+        migrations.AddField(
+            model_name='fitnessclass',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(default=60),
+        ),
+        migrations.AddIndex(
+            model_name='fitnessclass',
+            index=models.Index(fields=['instructor', 'scheduled_at'], name='class_instructor_schedule_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-19 18:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_class_duration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='bookings_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
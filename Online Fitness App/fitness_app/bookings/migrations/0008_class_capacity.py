@@ -0,0 +1,89 @@
+# Generated by Django 4.2.20 on 2026-10-19 19:02
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+
+def booking_count(booking_model):
+    return Coalesce(
+        Subquery(
+            booking_model.objects.filter(fitness_class_id=OuterRef('pk')).order_by().values('fitness_class_id')
+            .annotate(total=Count('id')).values('total')
+        ),
+        Value(0),
+    )
+
+
+def split_available_slots(apps, schema_editor):
+    # capacity is what was left plus what was booked
+    for class_name, booking_name in (('FitnessClass', 'Booking'), ('ArchivedFitnessClass', 'ArchivedBooking')):
+        class_model = apps.get_model('bookings', class_name)
+        class_model.objects.update(booked_count=booking_count(apps.get_model('bookings', booking_name)))
+        class_model.objects.update(capacity=F('available_slots') + F('booked_count'))
+
+
+def merge_available_slots(apps, schema_editor):
+    for class_name in ('FitnessClass', 'ArchivedFitnessClass'):
+        apps.get_model('bookings', class_name).objects.update(
+            available_slots=Greatest(F('capacity') - F('booked_count'), Value(0))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_client_bookings_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fitnessclass',
+            name='capacity',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='fitnessclass',
+            name='booked_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='fitnessclass',
+            name='available_slots',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedfitnessclass',
+            name='capacity',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedfitnessclass',
+            name='booked_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='archivedfitnessclass',
+            name='available_slots',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.RunPython(split_available_slots, merge_available_slots),
+        migrations.RemoveField(
+            model_name='fitnessclass',
+            name='available_slots',
+        ),
+        migrations.RemoveField(
+            model_name='archivedfitnessclass',
+            name='available_slots',
+        ),
+        migrations.AlterField(
+            model_name='fitnessclass',
+            name='capacity',
+            field=models.PositiveIntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='archivedfitnessclass',
+            name='capacity',
+            field=models.PositiveIntegerField(),
+        ),
+    ]
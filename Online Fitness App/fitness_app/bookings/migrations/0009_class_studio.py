@@ -0,0 +1,23 @@
+# Generated by Django 4.2.20 on 2026-10-19 19:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_class_capacity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedfitnessclass',
+            name='studio',
+            field=models.SlugField(default='main'),
+        ),
+        migrations.AddField(
+            model_name='fitnessclass',
+            name='studio',
+            field=models.SlugField(default='main'),
+        ),
+    ]
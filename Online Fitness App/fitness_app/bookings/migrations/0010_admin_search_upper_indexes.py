@@ -0,0 +1,38 @@
+# Generated by Django 4.2.20 on 2026-10-19 19:40
+
+from django.db import migrations
+
+# (index, table, column) of the name columns the admin searches with istartswith
+UPPER_INDEXES = (
+    ('client_last_name_upper_idx', 'bookings_client', 'last_name'),
+    ('instructor_name_upper_idx', 'bookings_instructor', 'instructor_name'),
+)
+
+
+def create_upper_indexes(apps, schema_editor):
+    # istartswith compares UPPER(column::text) LIKE 'TERM%' on PostgreSQL, which only an index
+    # on that expression with pattern ops can answer. Other databases have no such lookup to serve.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in UPPER_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" (UPPER("{column}"::text) text_pattern_ops)'
+        )
+
+
+def drop_upper_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in UPPER_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0009_class_studio'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_upper_indexes, drop_upper_indexes),
+    ]
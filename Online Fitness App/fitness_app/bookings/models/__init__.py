@@ -1,5 +1,8 @@
+from bookings.models.archived_booking_model import ArchivedBooking
+from bookings.models.archived_fitness_class_model import ArchivedFitnessClass
 from bookings.models.booking_model import Booking
 from bookings.models.class_type_choices import ClassType
 from bookings.models.client_model import Client
 from bookings.models.fitness_class_model import FitnessClass
-from bookings.models.instructor_model import Instructor
\ No newline at end of file
+from bookings.models.instructor_model import Instructor
+from bookings.models.occupancy_rollup_model import OccupancyRollup
\ No newline at end of file
@@ -0,0 +1,35 @@
+from django.db import models
+from bookings.models.archived_fitness_class_model import ArchivedFitnessClass
+from bookings.models.client_model import Client
+
+class ArchivedBooking(models.Model):
+    """
+    Cold-storage copy of a booking whose fitness class has been archived.
+    Rows keep the primary key they had in `Booking`.
+
+    Attributes:
+        client (ForeignKey): The client who made the booking.
+        fitness_class (ForeignKey): The archived fitness class that was booked.
+        booked_at (DateTimeField): Timestamp of when the booking was created.
+        archived_at (DateTimeField): Timestamp of when the booking was moved to the archive.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    client = models.ForeignKey(
+        Client, on_delete=models.CASCADE, related_name="archived_bookings"
+        )
+    fitness_class = models.ForeignKey(
+        ArchivedFitnessClass, on_delete=models.CASCADE, related_name="bookings"
+        )
+    booked_at = models.DateTimeField()
+    archived_at = models.DateTimeField(
+        auto_now_add=True
+        )
+
+    @property
+    def scheduled_at(self):
+        """Return the scheduled time of the archived class, mirroring `Booking.scheduled_at`."""
+        return self.fitness_class.scheduled_at
+
+    def __str__(self):
+        """Return a human-readable string representation of the archived booking."""
+        return f"{self.client.first_name} booked {self.fitness_class.class_name} at {self.booked_at} (archived)"
@@ -0,0 +1,37 @@
+from django.db import models
+from bookings.models.class_type_choices import ClassType
+from bookings.models.fitness_class_model import DEFAULT_STUDIO
+from bookings.models.instructor_model import Instructor
+
+class ArchivedFitnessClass(models.Model):
+    """
+    Cold-storage copy of a fitness class that is older than the retention window.
+    Rows keep the primary key they had in `FitnessClass`.
+
+    Attributes:
+        studio (str): The studio (location) that held the class.
+        class_name (str): The type of class (Yoga, Zumba, HIIT), chosen from `ClassType`.
+        instructor (Instructor): The instructor who conducted the class.
+        capacity (int): Number of people the class could take.
+        booked_count (int): Number of bookings the class had when it was archived.
+        created_date (datetime): The timestamp when the class was created.
+        updated_on (datetime): The timestamp when the class details were last updated.
+        scheduled_at (datetime): The scheduled date and time of the class.
+        duration_minutes (int): Length of the class in minutes.
+        archived_at (datetime): The timestamp when the class was moved to the archive.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    studio = models.SlugField(max_length=50, default=DEFAULT_STUDIO)
+    class_name = models.CharField(max_length=100, choices=ClassType.choices)
+    instructor = models.ForeignKey(Instructor, on_delete=models.CASCADE, related_name="archived_classes")
+    capacity = models.PositiveIntegerField()
+    booked_count = models.PositiveIntegerField(default=0)
+    created_date = models.DateTimeField()
+    updated_on = models.DateTimeField()
+    scheduled_at = models.DateTimeField(db_index=True)
+    duration_minutes = models.PositiveIntegerField(default=60)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        """Return a human-readable string representation of the archived fitness class."""
+        return f"{self.class_name} by {self.instructor.instructor_name} at {self.scheduled_at} (archived)"
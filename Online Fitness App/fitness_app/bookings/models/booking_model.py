@@ -10,6 +10,9 @@ class Booking(models.Model):
         client (ForeignKey): The client who made the booking.
         fitness_class (ForeignKey): The fitness class that was booked.
         booked_at (DateTimeField): Timestamp of when the booking was created.
+        scheduled_at (DateTimeField): Copy of the booked class's scheduled time, so a client's
+            history can be filtered, ordered and paginated from the booking index alone. Saving a
+            rescheduled class updates it (see `bookings.signals`), queryset.update() does not.
     """
     client = models.ForeignKey(
         Client, on_delete=models.CASCADE, related_name="bookings"
@@ -20,6 +23,23 @@ class Booking(models.Model):
     booked_at = models.DateTimeField(
         auto_now_add=True
         )
+    scheduled_at = models.DateTimeField(
+        editable=False
+        )
+
+    class Meta:
+        indexes = [
+            # covers every booking column, so a client's page is read straight from the index
+            models.Index(
+                fields=["client", "scheduled_at", "id", "fitness_class", "booked_at"],
+                name="booking_client_history_idx"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.scheduled_at is None:
+            self.scheduled_at = self.fitness_class.scheduled_at
+        super().save(*args, **kwargs)
 
     def __str__(self):
         """Return a human-readable string representation of the booking."""
@@ -7,13 +7,24 @@ class Client(models.Model):
     Attributes:
         first_name(str) :  First name of the client
         last_name(str)  : Last name of the client
-        email_address(str): Email address of the client
+        email_address(str): Email address of the client, stored lower-cased so lookups are case-insensitive
         phone_number(str) : Phone number of the client
+        bookings_version(int) : Incremented whenever the client's bookings change, versions the calendar feed
     """
     first_name = models.CharField(max_length=255)
-    last_name = models.CharField(max_length=255)
+    last_name = models.CharField(max_length=255, db_index=True)
     email_address = models.EmailField(unique=True)
     phone_number = models.CharField(max_length=20)
+    bookings_version = models.PositiveIntegerField(default=0, editable=False)
+
+    @staticmethod
+    def normalize_email(email_address: str) -> str:
+        """Return the form emails are stored and looked up in."""
+        return email_address.strip().lower()
+
+    def save(self, *args, **kwargs):
+        self.email_address = self.normalize_email(self.email_address)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         """Return a human-readable string representation of the client."""
@@ -1,25 +1,59 @@
+from datetime import timedelta
 from django.db import models
 from bookings.models.class_type_choices import ClassType
 from bookings.models.instructor_model import Instructor
 
+# upper bound of a class's duration, lets overlap checks use a bounded range scan on scheduled_at
+MAX_CLASS_DURATION_MINUTES = 240
+# studio of classes created without one
+DEFAULT_STUDIO = "main"
+
 class FitnessClass(models.Model):
     """
-    Represents a fitness class offered in the studio.
+    Represents a fitness class offered in one of the studios.
 
     Attributes:
+        studio (str): The studio (location) holding the class, its classes and bookings are stored
+            in the database alias `BOOKINGS_STUDIO_DATABASES` maps it to.
         class_name (str): The type of class (Yoga, Zumba, HIIT), chosen from `ClassType`.
         instructor (Instructor): The instructor conducting the class.
-        available_slots (int): Number of available booking slots for the class.
+        capacity (int): Number of people the class can take.
+        booked_count (int): Number of bookings made for the class, kept in step with its `Booking` rows
+            (`python manage.py audit_slots` finds and repairs any drift).
+        available_slots (int, derived): Slots left, `capacity - booked_count`. Assigning it sets the capacity.
         created_date (datetime): The timestamp when the class was created.
         updated_on (datetime): The timestamp when the class details were last updated.
         scheduled_at (datetime): The scheduled date and time for the class. 
+        duration_minutes (int): Length of the class in minutes, at most `MAX_CLASS_DURATION_MINUTES`.
     """
-    class_name = models.CharField(max_length=100, choices=ClassType.choices)
+    studio = models.SlugField(max_length=50, default=DEFAULT_STUDIO)
+    class_name = models.CharField(max_length=100, choices=ClassType.choices, db_index=True)
     instructor = models.ForeignKey(Instructor, on_delete=models.CASCADE)
-    available_slots = models.PositiveIntegerField()
+    capacity = models.PositiveIntegerField()
+    booked_count = models.PositiveIntegerField(default=0)
     created_date = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     scheduled_at = models.DateTimeField()
+    duration_minutes = models.PositiveIntegerField(default=60)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["instructor", "scheduled_at"], name="class_instructor_schedule_idx"),
+        ]
+
+    @property
+    def available_slots(self):
+        """Return the number of slots left, never negative even for an overbooked class."""
+        return max(self.capacity - self.booked_count, 0)
+
+    @available_slots.setter
+    def available_slots(self, value):
+        self.capacity = self.booked_count + value
+
+    @property
+    def ends_at(self):
+        """Return the date and time the class finishes."""
+        return self.scheduled_at + timedelta(minutes=self.duration_minutes)
 
     def __str__(self):
         """Return a human-readable string representation of the fitness classes."""
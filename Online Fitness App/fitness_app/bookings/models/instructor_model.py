@@ -7,7 +7,7 @@ class Instructor(models.Model):
     Attributes:
         instructor_name(str) : Name of the instructor
     """
-    instructor_name = models.CharField(max_length=100)
+    instructor_name = models.CharField(max_length=100, db_index=True)
 
     def __str__(self):
         """Return a human-readable string representation of the instructor."""
@@ -0,0 +1,39 @@
+from django.db import models
+from bookings.models.class_type_choices import ClassType
+from bookings.models.instructor_model import Instructor
+
+class OccupancyRollup(models.Model):
+    """
+    Pre-aggregated occupancy of all classes sharing a date, hour, class type and instructor.
+    Filled when the table is created, then kept up to date incrementally by the booking and fitness class
+    services and, for classes edited with `save()`, by the class signals.
+
+    Attributes:
+        date (date): Local date the classes are scheduled on.
+        weekday (int): ISO weekday of `date` (1 = Monday ... 7 = Sunday).
+        hour (int): Local hour the classes start at (0-23).
+        class_name (str): The type of class, chosen from `ClassType`.
+        instructor (Instructor): The instructor conducting the classes.
+        classes_count (int): Number of classes in the bucket.
+        capacity (int): Total number of slots offered by the classes in the bucket.
+        bookings_count (int): Total number of bookings made for the classes in the bucket.
+    """
+    date = models.DateField()
+    weekday = models.PositiveSmallIntegerField()
+    hour = models.PositiveSmallIntegerField()
+    class_name = models.CharField(max_length=100, choices=ClassType.choices)
+    instructor = models.ForeignKey(Instructor, on_delete=models.CASCADE, related_name="occupancy_rollups")
+    classes_count = models.PositiveIntegerField(default=0)
+    capacity = models.PositiveIntegerField(default=0)
+    bookings_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "hour", "class_name", "instructor"], name="unique_occupancy_bucket"
+            ),
+        ]
+
+    def __str__(self):
+        """Return a human-readable string representation of the rollup bucket."""
+        return f"{self.class_name} by {self.instructor_id} on {self.date} {self.hour}:00"
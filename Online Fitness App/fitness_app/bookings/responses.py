@@ -0,0 +1,38 @@
+import json
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from rest_framework.response import Response
+from bookings.services.compression import negotiate_encoding
+
+
+class CachedPayloadResponse(Response):
+    """
+    DRF response whose body is taken as-is from a listing cache entry,
+    in the encoding negotiated with the client, instead of being rendered again.
+    """
+    def __init__(self, entry, accept_encoding="", data=None, status=None):
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding not in entry or len(entry["identity"]) < getattr(settings, "BOOKINGS_COMPRESSION_MIN_SIZE", 512):
+            encoding = None
+        self._entry = entry
+        self._encoding = encoding
+        super().__init__(data, status=status)
+        if encoding:
+            self["Content-Encoding"] = encoding
+        patch_vary_headers(self, ("Accept-Encoding",))
+
+    @property
+    def data(self):
+        # only decoded when something (e.g. a test client) actually inspects the data
+        if self._data is None:
+            self._data = json.loads(self._entry["identity"])
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    @property
+    def rendered_content(self):
+        self["Content-Type"] = "application/json"
+        return self._entry[self._encoding or "identity"]
@@ -0,0 +1,46 @@
+from django.db import DEFAULT_DB_ALIAS
+from bookings.services.shards import (
+    REPLICATED_MODELS, SHARDED_MODELS, database_for_id, is_sharded, shard_databases, studio_database,
+)
+
+
+class StudioRouter:
+    """
+    Database router placing each studio's classes and bookings (with their seat counts) on the alias
+    `BOOKINGS_STUDIO_DATABASES` maps the studio to, every other table stays on "default".
+
+    Queries built from a manager carry no instance, services pick the alias with `.using()`
+    (see `bookings.services.shards`). The router places new instances and keeps relations working:
+    a new class goes to its studio's alias and a new booking to its class's alias. Clients and
+    instructors are replicated into the aliases referencing them, so they can relate to rows anywhere.
+    """
+
+    def _database(self, model, instance=None, **hints):
+        if not is_sharded(model) or instance is None or instance._state.db:
+            # Django falls back to the alias the instance was loaded from
+            return None
+        studio = getattr(instance, "studio", None)
+        if studio is not None:
+            return studio_database(studio)
+        fitness_class_id = getattr(instance, "fitness_class_id", None)
+        if fitness_class_id is not None:
+            return database_for_id(fitness_class_id)
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._database(model, **hints)
+
+    def db_for_write(self, model, **hints):
+        return self._database(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if obj1._meta.model_name in REPLICATED_MODELS or obj2._meta.model_name in REPLICATED_MODELS:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == DEFAULT_DB_ALIAS or db not in shard_databases():
+            return None
+        # the other aliases only get the tables of the sharded and replicated models,
+        # data migrations (model_name None) only ever touch "default"
+        return app_label == "bookings" and model_name in (*SHARDED_MODELS, *REPLICATED_MODELS)
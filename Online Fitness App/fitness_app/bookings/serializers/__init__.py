@@ -1,3 +1,5 @@
 from .instructor_serializer import InstructorSerializer
-from .fitness_class_serializer import FitnessClassSerializer, CreateFitnessClassSerializer
-from .booking_serializer import BookingSerializer, CreateBookingSerializer
+from .fitness_class_serializer import FitnessClassSerializer, CreateFitnessClassSerializer, ClassIdsQuerySerializer, ClassSearchQuerySerializer, ClassSearchResultSerializer
+from .booking_serializer import BookingSerializer, CreateBookingSerializer, CancelBookingSerializer, BookingHistoryQuerySerializer
+from .occupancy_serializer import OccupancyQuerySerializer
+from .import_serializer import ImportClientSerializer, ImportFitnessClassSerializer
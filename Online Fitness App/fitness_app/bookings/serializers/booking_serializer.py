@@ -1,11 +1,21 @@
 from rest_framework import serializers
-from bookings.models import FitnessClass
+from bookings.models import Client, FitnessClass
+from bookings.services.booking_service import BookingService, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from bookings.services.schedule_conflict_service import ScheduleConflictService
+from bookings.services.identity_map import load
+from bookings.services.shards import database_for_id
+from bookings.serializers.sparse_fieldset import SparseFieldsetMixin
 from django.utils import timezone
 
+# error codes of the rejections counted in the bookings_rejected_total metric, a request failing several
+# of these checks is counted under the first one
+REJECTION_REASONS = ("duplicate_email", "schedule_conflict", "class_full")
 
-class BookingSerializer(serializers.Serializer):
+
+class BookingSerializer(SparseFieldsetMixin, serializers.Serializer):
     """
     Serializer for booking information.
+    Pass `context={"fields": [...]}` to output only some of the fields.
 
     Fields:
         first_name (str): First name of the client.
@@ -20,10 +30,20 @@ class BookingSerializer(serializers.Serializer):
     last_name = serializers.CharField(source='client.last_name', read_only=True)
     email_address = serializers.EmailField(source='client.email_address', read_only=True)
     fitness_class_name = serializers.CharField(source='fitness_class.class_name', read_only=True)
-    scheduled_at = serializers.DateTimeField(source='fitness_class.scheduled_at', read_only=True)
+    scheduled_at = serializers.DateTimeField(read_only=True)
     instructor_name = serializers.CharField(source='fitness_class.instructor.instructor_name', read_only=True)
     booked_at = serializers.DateTimeField(read_only=True)
 
+    field_columns = {
+        "first_name": ["client__first_name"],
+        "last_name": ["client__last_name"],
+        "email_address": ["client__email_address"],
+        "fitness_class_name": ["fitness_class__class_name"],
+        "scheduled_at": ["scheduled_at"],
+        "instructor_name": ["fitness_class__instructor__instructor_name"],
+        "booked_at": ["booked_at"],
+    }
+
 
 class CreateBookingSerializer(serializers.Serializer):
     """
@@ -40,6 +60,7 @@ class CreateBookingSerializer(serializers.Serializer):
         - Ensures the class has available slots.
         - Ensures the class is not already scheduled in the past.
         - Ensures email address is unique for the same class.
+        - Ensures the client has no other booking at an overlapping time.
         - Ensures names are non-empty and alphabetic.
     """
     class_id = serializers.IntegerField()
@@ -48,13 +69,12 @@ class CreateBookingSerializer(serializers.Serializer):
     email_address = serializers.EmailField()
 
     def validate_class_id(self, value):
-        try:
-            fitness_class = FitnessClass.objects.get(id=value)
-        except FitnessClass.DoesNotExist:
-            raise serializers.ValidationError("Fitness class with ID {value} does not exist.")
+        fitness_class = load(FitnessClass, value)
+        if fitness_class is None:
+            raise serializers.ValidationError(f"Fitness class with ID {value} does not exist.")
         
         if fitness_class.available_slots <= 0:
-            raise serializers.ValidationError("No available slots for this class.")
+            raise serializers.ValidationError("No available slots for this class.", code="class_full")
         
         if fitness_class.scheduled_at < timezone.now():
             raise serializers.ValidationError("Cannot book a class that has already started or finished.")
@@ -75,8 +95,74 @@ class CreateBookingSerializer(serializers.Serializer):
         return value
     
     def validate_email_address(self, value):
+        value = Client.normalize_email(value)
         class_id = self.initial_data.get("class_id")
-        if class_id and FitnessClass.objects.filter(id=class_id, bookings__client__email_address=value).exists():
-            raise serializers.ValidationError("This email is already registered for the selected class.")
+        if class_id and FitnessClass.objects.using(database_for_id(int(class_id))).filter(
+            id=class_id, bookings__client__email_address=value
+        ).exists():
+            raise serializers.ValidationError(
+                "This email is already registered for the selected class.", code="duplicate_email")
         return value
 
+    def validate(self, value):
+        fitness_class = load(FitnessClass, value['class_id'])
+        if ScheduleConflictService.client_conflicts(value['email_address'], fitness_class):
+            raise serializers.ValidationError(
+                "You already have a booking for a class at an overlapping time.", code="schedule_conflict")
+        return value
+
+    def rejection_reason(self):
+        """Return the `REJECTION_REASONS` entry a rejected request is counted under, None if it is just malformed."""
+        codes = {error.code for errors in self.errors.values() for error in errors}
+        return next((reason for reason in REJECTION_REASONS if reason in codes), None)
+
+
+
+class CancelBookingSerializer(serializers.Serializer):
+    """
+    Serializer for cancelling a booking.
+
+    Fields:
+        booking_id (int): ID of the booking to be cancelled.
+        email_address (str): Email address of the client who made the booking.
+    """
+    booking_id = serializers.IntegerField()
+    email_address = serializers.EmailField()
+
+
+class BookingHistoryQuerySerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of a client's booking history.
+
+    Fields:
+        email_address (str): Email address of the client, matched case-insensitively.
+        include_archived (bool): Also return bookings of archived classes.
+        when (str, optional): Only upcoming or only past classes.
+        start (datetime, optional): Only classes scheduled at or after this time.
+        end (datetime, optional): Only classes scheduled at or before this time.
+        cursor (str, optional): `next_cursor` returned with the previous page.
+        limit (int): Page size.
+        fields (str, optional): Comma separated `BookingSerializer` fields to return.
+
+    Validations:
+        - cursor must be one returned by a previous page.
+        - fields must be `BookingSerializer` fields.
+    """
+    email_address = serializers.EmailField()
+    include_archived = serializers.BooleanField(default=False)
+    when = serializers.ChoiceField(choices=["upcoming", "past"], required=False)
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=MAX_PAGE_SIZE, default=DEFAULT_PAGE_SIZE)
+    fields = serializers.CharField(required=False)
+
+    def validate_fields(self, value):
+        return BookingSerializer.parse_fields(value)
+
+    def validate_cursor(self, value):
+        try:
+            BookingService.decode_cursor(value)
+        except ValueError:
+            raise serializers.ValidationError("Invalid cursor.")
+        return value
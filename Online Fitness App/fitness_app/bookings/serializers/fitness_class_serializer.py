@@ -1,29 +1,58 @@
+from datetime import timedelta
 from django.utils import timezone
 from rest_framework import serializers
 from bookings.models import ClassType, Instructor
 from bookings.serializers.instructor_serializer import InstructorSerializer
-from bookings.models.fitness_class_model import FitnessClass
+from bookings.models.fitness_class_model import DEFAULT_STUDIO, FitnessClass, MAX_CLASS_DURATION_MINUTES
+from bookings.services.schedule_conflict_service import ScheduleConflictService
+from bookings.services.instructor_cache import InstructorCache
+from bookings.serializers.sparse_fieldset import SparseFieldsetMixin
+from bookings.services.shards import studio_database
 
-class FitnessClassSerializer(serializers.Serializer):
+# largest number of classes the batch lookup returns in one request
+MAX_BATCH_CLASS_IDS = 100
+# largest number of classes a search returns
+MAX_SEARCH_RESULTS = 200
+
+class FitnessClassSerializer(SparseFieldsetMixin, serializers.Serializer):
     """
     Serializer for displaying FitnessClass details.
+    Pass `context={"fields": [...]}` to output only some of the fields.
 
     Fields:
         id (int): ID of the fitness class (read-only).
+        studio (str): Studio holding the class (read-only).
         class_name (str): Name/type of the class, must be one of ClassType choices.
         instructor (InstructorSerializer): Nested instructor details.
-        available_slots (int): Number of available slots for the class, must be >= 1.
+        capacity (int): Number of people the class can take.
+        available_slots (int): Number of slots left in the class.
         scheduled_at (datetime): Scheduled date and time of the class.
+        duration_minutes (int): Length of the class in minutes.
     
     Validations:
         - Instructor must exist.
         - Scheduled time must be in the future.
     """
     id = serializers.IntegerField(read_only=True)
+    studio = serializers.CharField(read_only=True)
     class_name = serializers.ChoiceField(choices=ClassType.choices)
     instructor = InstructorSerializer()
-    available_slots = serializers.IntegerField(min_value=1)
+    capacity = serializers.IntegerField(read_only=True)
+    available_slots = serializers.IntegerField(read_only=True)
     scheduled_at = serializers.DateTimeField()
+    duration_minutes = serializers.IntegerField(min_value=1, max_value=MAX_CLASS_DURATION_MINUTES)
+
+    field_columns = {
+        "id": ["id"],
+        "studio": ["studio"],
+        "class_name": ["class_name"],
+        # the instructor itself comes from the instructor cache
+        "instructor": ["instructor_id"],
+        "capacity": ["capacity"],
+        "available_slots": ["capacity", "booked_count"],
+        "scheduled_at": ["scheduled_at"],
+        "duration_minutes": ["duration_minutes"],
+    }
 
     def validate_instructor_id(self, value):
         try:
@@ -46,9 +75,12 @@ class CreateFitnessClassSerializer(serializers.Serializer):
         instructor_id (int): ID of the instructor for the class.
         available_slots (int): Number of available slots for the class, must be >= 1 and <= 100 (to avoid overbooking)
         scheduled_at (datetime): Scheduled date and time of the class.
+        duration_minutes (int): Length of the class in minutes, 60 by default.
+        studio (str): Studio holding the class, `DEFAULT_STUDIO` by default.
     
     Validations:
-        - Duplicate class checks.
+        - Duplicate class checks within the studio.
+        - The instructor must not be teaching another class at an overlapping time.
         - Instructor with given ID must exist.
         - Scheduled time must be in the future.
     """
@@ -56,25 +88,106 @@ class CreateFitnessClassSerializer(serializers.Serializer):
     instructor_id = serializers.IntegerField()
     available_slots = serializers.IntegerField(min_value=1, max_value=100)
     scheduled_at = serializers.DateTimeField()
+    duration_minutes = serializers.IntegerField(min_value=1, max_value=MAX_CLASS_DURATION_MINUTES, default=60)
+    studio = serializers.SlugField(max_length=50, default=DEFAULT_STUDIO)
 
     def validate(self, value):
-        if FitnessClass.objects.filter(
+        if FitnessClass.objects.using(studio_database(value['studio'])).filter(
+            studio=value['studio'],
             class_name=value['class_name'], 
             scheduled_at=value['scheduled_at']
         ).exists():
             raise serializers.ValidationError(
                 "A class of this type is already scheduled at this time.")
+        ends_at = value['scheduled_at'] + timedelta(minutes=value['duration_minutes'])
+        if ScheduleConflictService.instructor_conflicts(value['instructor_id'], value['scheduled_at'], ends_at):
+            raise serializers.ValidationError(
+                "The instructor is already teaching a class at an overlapping time.")
         return value
 
     def validate_instructor_id(self, value):
-        from ..models import Instructor
-        try:
-            Instructor.objects.get(id=value)
-        except Instructor.DoesNotExist:
+        if InstructorCache.get(value) is None:
             raise serializers.ValidationError("Instructor with this ID does not exist.")
         return value
 
     def validate_scheduled_at(self, value):
         if value < timezone.now():
             raise serializers.ValidationError("Scheduled time must be in the future.")
-        return value
\ No newline at end of file
+        return value
+
+
+class ClassIdsQuerySerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of the batch class lookup.
+
+    Fields:
+        ids (str): Comma separated IDs of the fitness classes, at most `MAX_BATCH_CLASS_IDS`.
+
+    Validations:
+        - Every ID must be a positive integer.
+    """
+    ids = serializers.CharField()
+
+    def validate_ids(self, value):
+        try:
+            ids = [int(class_id) for class_id in value.split(",") if class_id.strip()]
+        except ValueError:
+            raise serializers.ValidationError("IDs must be comma separated integers.")
+        if not ids or any(class_id <= 0 for class_id in ids):
+            raise serializers.ValidationError("Provide at least one positive class ID.")
+        if len(ids) > MAX_BATCH_CLASS_IDS:
+            raise serializers.ValidationError(f"At most {MAX_BATCH_CLASS_IDS} class IDs can be fetched at once.")
+        return ids
+
+
+class ClassSearchQuerySerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of the class search.
+
+    Fields:
+        start (datetime, optional): Earliest start of the classes, now by default.
+        end (datetime, optional): Latest start of the classes, 24 hours after `start` by default.
+        class_type (str, optional): Only classes of this `ClassType`.
+        instructor_id (int, optional): Only classes of this instructor.
+        studio (str, optional): Only classes of this studio.
+        min_slots (int): Fewest seats a class must have left, 1 by default.
+        limit (int): Most classes to return, 50 by default and at most `MAX_SEARCH_RESULTS`.
+
+    Validations:
+        - start must not be after end.
+    """
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    class_type = serializers.ChoiceField(choices=ClassType.choices, required=False)
+    instructor_id = serializers.IntegerField(min_value=1, required=False)
+    studio = serializers.SlugField(max_length=50, required=False)
+    min_slots = serializers.IntegerField(min_value=0, default=1)
+    limit = serializers.IntegerField(min_value=1, max_value=MAX_SEARCH_RESULTS, default=50)
+
+    def validate(self, value):
+        if value.get("start") and value.get("end") and value["start"] > value["end"]:
+            raise serializers.ValidationError("start must not be after end.")
+        return value
+
+
+class ClassSearchResultSerializer(serializers.Serializer):
+    """
+    Serializer for the classes found by the class search, read from the availability index.
+    Pass `context={"instructors": {id: Instructor}}` to include the instructor names.
+
+    Fields:
+        id, studio, class_name, capacity, available_slots, scheduled_at, duration_minutes: As in `FitnessClassSerializer`.
+        instructor (dict): ID and name of the instructor.
+    """
+    id = serializers.IntegerField(read_only=True)
+    studio = serializers.CharField(read_only=True)
+    class_name = serializers.CharField(read_only=True)
+    instructor = serializers.SerializerMethodField()
+    capacity = serializers.IntegerField(read_only=True)
+    available_slots = serializers.IntegerField(read_only=True)
+    scheduled_at = serializers.DateTimeField(read_only=True)
+    duration_minutes = serializers.IntegerField(read_only=True)
+
+    def get_instructor(self, obj):
+        instructor = self.context.get("instructors", {}).get(obj.instructor_id)
+        return {"id": obj.instructor_id, "instructor_name": instructor.instructor_name if instructor else None}
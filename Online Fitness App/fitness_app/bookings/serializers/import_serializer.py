@@ -0,0 +1,43 @@
+from rest_framework import serializers
+from bookings.models import Client
+from bookings.serializers.booking_serializer import CreateBookingSerializer
+from bookings.serializers.fitness_class_serializer import CreateFitnessClassSerializer
+
+
+class ImportClientSerializer(serializers.Serializer):
+    """
+    Serializer for one client row of a CSV import.
+
+    Fields:
+        first_name (str): First name of the client.
+        last_name (str): Last name of the client.
+        email_address (str): Email address of the client, the key rows are upserted by.
+        phone_number (str): Phone number of the client.
+
+    Validations:
+        - Same name rules as booking requests: non-empty and alphabetic.
+        - Email address is normalised the way it is stored.
+    """
+    first_name = serializers.CharField(max_length=255)
+    last_name = serializers.CharField(max_length=255)
+    email_address = serializers.EmailField()
+    phone_number = serializers.CharField(max_length=20)
+
+    validate_first_name = CreateBookingSerializer.validate_first_name
+    validate_last_name = CreateBookingSerializer.validate_last_name
+
+    def validate_email_address(self, value):
+        return Client.normalize_email(value)
+
+
+class ImportFitnessClassSerializer(CreateFitnessClassSerializer):
+    """
+    Serializer for one class row of a CSV import, with the field rules of `CreateFitnessClassSerializer`.
+
+    Validations:
+        - Duplicate class and instructor overlap checks are left to `ImportService`,
+          which runs them for a whole chunk of rows with one query each.
+    """
+
+    def validate(self, value):
+        return value
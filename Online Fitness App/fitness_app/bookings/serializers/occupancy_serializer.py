@@ -0,0 +1,27 @@
+from rest_framework import serializers
+from bookings.models import ClassType
+from bookings.services.occupancy_service import GROUP_BY_FIELDS
+
+
+class OccupancyQuerySerializer(serializers.Serializer):
+    """
+    Serializer for the occupancy analytics query parameters.
+
+    Fields:
+        start_date (date, optional): First class date to include.
+        end_date (date, optional): Last class date to include.
+        class_type (str, optional): Only include classes of this `ClassType`.
+        group_by (str): Dimension the fill rates are grouped by - class_type, instructor, weekday or hour.
+
+    Validations:
+        - start_date must not be after end_date.
+    """
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    class_type = serializers.ChoiceField(choices=ClassType.choices, required=False)
+    group_by = serializers.ChoiceField(choices=list(GROUP_BY_FIELDS), default="class_type")
+
+    def validate(self, value):
+        if value.get("start_date") and value.get("end_date") and value["start_date"] > value["end_date"]:
+            raise serializers.ValidationError("start_date must not be after end_date.")
+        return value
@@ -0,0 +1,37 @@
+from rest_framework import serializers
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin that only outputs the fields requested through the `fields` context entry.
+
+    Subclasses list, in `field_columns`, the ORM paths each field reads, so the view can
+    load just those columns (and joins) with `columns_for()`.
+    """
+    field_columns = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get("fields")
+        if requested:
+            for field_name in set(self.fields) - set(requested):
+                self.fields.pop(field_name)
+
+    @classmethod
+    def parse_fields(cls, value: str):
+        """
+        Parse a comma separated `fields=` query parameter.
+        Raises ValidationError if a field does not exist.
+        """
+        fields = list(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+        unknown = [name for name in fields if name not in cls.field_columns]
+        if not fields or unknown:
+            raise serializers.ValidationError(
+                f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(cls.field_columns)}."
+            )
+        return fields
+
+    @classmethod
+    def columns_for(cls, fields):
+        """Return the ORM paths needed to serialize the given fields."""
+        return list(dict.fromkeys(column for name in fields for column in cls.field_columns[name]))
@@ -0,0 +1,95 @@
+from datetime import timedelta
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+from django.utils.timezone import now
+from bookings.models.archived_booking_model import ArchivedBooking
+from bookings.models.archived_fitness_class_model import ArchivedFitnessClass
+from bookings.models.booking_model import Booking
+from bookings.models.client_model import Client
+from bookings.models.fitness_class_model import FitnessClass
+from bookings.services.shards import shard_databases
+
+
+class ArchiveService:
+    """
+    Service layer for archiving past classes.
+
+    Functionalities:
+        1. archive_past_classes() - moves classes older than the retention window, together with their bookings,
+           from every studio database into the archive tables on "default"
+            Input: retention_days, batch_size
+            Output: (number of archived classes, number of archived bookings)
+    """
+
+    @staticmethod
+    def archive_past_classes(retention_days: int, batch_size: int = 500):
+        cutoff = now() - timedelta(days=retention_days)
+        archived_classes = archived_bookings = 0
+
+        for database in shard_databases():
+            while True:
+                moved = ArchiveService._archive_batch(database, cutoff, batch_size)
+                if moved is None:
+                    break
+                archived_classes += moved[0]
+                archived_bookings += moved[1]
+
+        return archived_classes, archived_bookings
+
+    @staticmethod
+    def _archive_batch(database, cutoff, batch_size: int):
+        """Move one batch of a studio database's old classes into the archive on "default", None when done."""
+        # every batch is moved in its own short transaction so the live tables are never locked for long
+        with transaction.atomic(using=database), transaction.atomic():
+            classes = list(
+                FitnessClass.objects.using(database).filter(
+                    scheduled_at__lt=cutoff
+                ).order_by('scheduled_at', 'id')[:batch_size]
+            )
+            if not classes:
+                return None
+            class_ids = [fitness_class.id for fitness_class in classes]
+
+            # conflicts are rows archived by an earlier run whose delete failed in another database
+            ArchivedFitnessClass.objects.bulk_create([
+                ArchivedFitnessClass(
+                    id=fitness_class.id,
+                    studio=fitness_class.studio,
+                    class_name=fitness_class.class_name,
+                    instructor_id=fitness_class.instructor_id,
+                    capacity=fitness_class.capacity,
+                    booked_count=fitness_class.booked_count,
+                    created_date=fitness_class.created_date,
+                    updated_on=fitness_class.updated_on,
+                    scheduled_at=fitness_class.scheduled_at,
+                    duration_minutes=fitness_class.duration_minutes,
+                )
+                for fitness_class in classes
+            ], ignore_conflicts=True)
+
+            bookings = Booking.objects.using(database).filter(fitness_class_id__in=class_ids)
+            archived_bookings = len(ArchivedBooking.objects.bulk_create(
+                (
+                    ArchivedBooking(
+                        id=booking_id,
+                        client_id=client_id,
+                        fitness_class_id=fitness_class_id,
+                        booked_at=booked_at,
+                    )
+                    for booking_id, client_id, fitness_class_id, booked_at in bookings.values_list(
+                        'id', 'client_id', 'fitness_class_id', 'booked_at'
+                    ).iterator()
+                ),
+                batch_size=batch_size,
+                ignore_conflicts=True,
+            ))
+
+            # the archived bookings leave the clients' calendar feeds, a subquery cannot reach another database
+            client_ids = bookings.values('client_id')
+            if database != DEFAULT_DB_ALIAS:
+                client_ids = list(client_ids.distinct().values_list('client_id', flat=True))
+            Client.objects.filter(id__in=client_ids).update(bookings_version=F('bookings_version') + 1)
+            bookings.delete()
+            FitnessClass.objects.using(database).filter(id__in=class_ids).delete()
+
+        return len(classes), archived_bookings
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class LocalBackend:
+    """
+    Backend that delivers availability events to subscribers of the current process only.
+
+    A multi-worker backend (for example Redis pub/sub) implements the same two methods and sets
+    `cross_process = True`, which lets the class search trust the seat counts it received:
+        1. start(deliver) - called once; the backend must call deliver(event) for every event it receives
+        2. publish(event) - sends the event to every worker process (including this one)
+    """
+    cross_process = False
+
+    def start(self, deliver):
+        self._deliver = deliver
+
+    def publish(self, event):
+        self._deliver(event)
+
+
+class Subscription:
+    """
+    A single connected stream consumer.
+
+    Pending updates are kept per class id, so a slow consumer only ever holds the
+    latest seat count of each class instead of an unbounded queue of deltas.
+    A consumer on an event loop awaits next_batch(), one in a plain thread (WSGI) calls wait_batch().
+    """
+    def __init__(self, loop=None):
+        self._loop = loop
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event() if loop is not None else threading.Event()
+
+    def offer(self, event):
+        """Record an event (thread-safe) and wake the consumer."""
+        with self._lock:
+            self._pending[event["class_id"]] = event
+        if self._loop is None:
+            self._ready.set()
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # the consumer's loop is already closed, it will be unsubscribed shortly
+            pass
+
+    def _take(self):
+        self._ready.clear()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return list(pending.values())
+
+    async def next_batch(self, timeout):
+        """
+        Wait up to `timeout` seconds for updates.
+        Returns the coalesced list of events, or an empty list on timeout.
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        return self._take()
+
+    def wait_batch(self, timeout):
+        """The same as next_batch(), blocking the calling thread."""
+        if not self._ready.wait(timeout):
+            return []
+        return self._take()
+
+
+class AvailabilityBroadcaster:
+    """
+    Fans out seat availability changes to every connected stream.
+
+    Funcationalities:
+        1. subscribe() / unsubscribe() - register a stream consumer, on the running event loop if there is one
+        2. add_listener() - register a callable receiving every event in the delivering thread, it must not block
+        3. publish() - called once per seat change, regardless of how many consumers are connected
+    """
+    def __init__(self, backend=None):
+        self._subscriptions = set()
+        self._listeners = []
+        self._lock = threading.Lock()
+        self.backend = backend or import_string(
+            getattr(settings, "BOOKINGS_AVAILABILITY_BACKEND",
+                    "bookings.services.availability_broadcaster.LocalBackend")
+        )()
+        self.backend.start(self._deliver)
+
+    def subscribe(self) -> Subscription:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        subscription = Subscription(loop)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def add_listener(self, listener):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def publish(self, class_id: int, available_slots: int):
+        self.backend.publish({"class_id": class_id, "available_slots": available_slots})
+
+    def _deliver(self, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(event)
+        for subscription in subscriptions:
+            subscription.offer(event)
+
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster() -> AvailabilityBroadcaster:
+    """Return the process-wide broadcaster, creating it on first use."""
+    global _broadcaster
+    if _broadcaster is None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                _broadcaster = AvailabilityBroadcaster()
+    return _broadcaster
@@ -0,0 +1,245 @@
+import bisect
+import threading
+import time
+from collections import namedtuple
+from django.conf import settings
+from django.utils.timezone import now
+from bookings.models.fitness_class_model import FitnessClass
+from bookings.services.availability_broadcaster import get_broadcaster
+from bookings.services.shards import group_by_database, shard_databases
+
+# what the index keeps of an upcoming class, plain tuples keep it compact
+IndexedClass = namedtuple("IndexedClass", (
+    "scheduled_at", "id", "studio", "class_name", "instructor_id", "duration_minutes", "capacity", "available_slots",
+))
+# columns an IndexedClass is read from, the seats left are derived from the last two
+COLUMNS = ("scheduled_at", "id", "studio", "class_name", "instructor_id", "duration_minutes", "capacity", "booked_count")
+
+# process-local state, guarded by _lock
+_lock = threading.Lock()
+_build_lock = threading.Lock()
+_pending = set()
+_state = {"buckets": None, "built_at": None, "listening": False, "replay": None}
+
+
+def _hour(moment) -> int:
+    """Return the bucket of a point in time: hours since the epoch, i.e. one bucket per hour of every day."""
+    return int(moment.timestamp()) // 3600
+
+
+def _entry(row) -> IndexedClass:
+    *fields, capacity, booked_count = row
+    return IndexedClass(*fields, capacity, max(capacity - booked_count, 0))
+
+
+class _Buckets:
+    """Upcoming classes bucketed by the hour they start in, with the sorted hours holding classes."""
+    __slots__ = ("buckets", "hours", "classes")
+
+    def __init__(self, rows=()):
+        self.buckets = {}
+        self.hours = []
+        self.classes = {}
+        for row in rows:
+            self.put(_entry(row))
+
+    def put(self, entry: IndexedClass):
+        self.discard(entry.id)
+        hour = _hour(entry.scheduled_at)
+        bucket = self.buckets.get(hour)
+        if bucket is None:
+            bucket = self.buckets[hour] = {}
+            bisect.insort(self.hours, hour)
+        bucket[entry.id] = entry
+        self.classes[entry.id] = hour
+
+    def discard(self, class_id: int):
+        hour = self.classes.pop(class_id, None)
+        if hour is None:
+            return
+        bucket = self.buckets[hour]
+        del bucket[class_id]
+        if not bucket:
+            del self.buckets[hour]
+            del self.hours[bisect.bisect_left(self.hours, hour)]
+
+    def set_seats(self, class_id: int, available_slots: int) -> bool:
+        """Update the seats left of an indexed class, False if the class is not indexed."""
+        hour = self.classes.get(class_id)
+        if hour is None:
+            return False
+        bucket = self.buckets[hour]
+        bucket[class_id] = bucket[class_id]._replace(available_slots=available_slots)
+        return True
+
+    def between(self, start, end):
+        """Yield the buckets of the hours from start to end, in order."""
+        first = bisect.bisect_left(self.hours, _hour(start))
+        last = bisect.bisect_right(self.hours, _hour(end))
+        for hour in self.hours[first:last]:
+            yield self.buckets[hour]
+
+
+class AvailabilityIndex:
+    """
+    Process-local search index of the upcoming classes of every studio, bucketed by the hour they start in.
+
+    Searches read only the buckets of the requested time window instead of scanning all classes. The index
+    is built on the first search and kept current from the availability broadcaster: seat counts are updated
+    in place, classes not indexed yet are loaded by ID on the next search, and classes saved or deleted in
+    this process are refreshed from the saved instance.
+
+    The default `LocalBackend` delivers events inside the publishing process only, so with it the seats of the
+    classes found are read back from the database (one primary key query per studio database) before they
+    are returned. With a backend reaching every worker (`cross_process = True`) searches need no query.
+    Classes created or edited by another worker without an event reaching this one are picked up by the full
+    rebuild every `BOOKINGS_SEARCH_INDEX_MAX_AGE` seconds.
+
+    Functionalities:
+        1. search() - upcoming classes starting within a time window, optionally of one class type, instructor
+           or studio, with at least the given number of seats left
+            Output: List of IndexedClass ordered by scheduled time, at most `limit` of them
+        2. refresh() - re-indexes a class saved in this process
+        3. remove() - drops a class deleted in this process
+        4. invalidate() - drops this process's index, the next search rebuilds it
+    """
+
+    @staticmethod
+    def _apply(event):
+        """Apply a seat change event. Called with _lock held."""
+        if not _state["buckets"].set_seats(event["class_id"], event["available_slots"]):
+            _pending.add(event["class_id"])
+
+    @staticmethod
+    def _on_event(event):
+        with _lock:
+            if _state["replay"] is not None:
+                # a rebuild is reading the classes, apply the event on top of what it read
+                _state["replay"].append(event)
+            elif _state["buckets"] is not None:
+                AvailabilityIndex._apply(event)
+
+    @staticmethod
+    def _stale():
+        max_age = getattr(settings, "BOOKINGS_SEARCH_INDEX_MAX_AGE", 60)
+        return _state["built_at"] is None or time.monotonic() - _state["built_at"] > max_age
+
+    @staticmethod
+    def _build():
+        with _build_lock:
+            if not AvailabilityIndex._stale():
+                # built by another thread meanwhile
+                return
+            if not _state["listening"]:
+                get_broadcaster().add_listener(AvailabilityIndex._on_event)
+                _state["listening"] = True
+            with _lock:
+                _state["replay"] = []
+            try:
+                upcoming = FitnessClass.objects.filter(scheduled_at__gte=now()).values_list(*COLUMNS)
+                buckets = _Buckets(row for database in shard_databases() for row in upcoming.using(database))
+            finally:
+                with _lock:
+                    replay, _state["replay"] = _state["replay"], None
+            with _lock:
+                _state["buckets"] = buckets
+                for event in replay:
+                    AvailabilityIndex._apply(event)
+                _state["built_at"] = time.monotonic()
+
+    @staticmethod
+    def _reload(class_ids):
+        """Read classes from their databases into the index, dropping the deleted ones. Returns {id: IndexedClass}."""
+        entries = {
+            row[1]: _entry(row)
+            for database, ids in group_by_database(class_ids).items()
+            for row in FitnessClass.objects.using(database).filter(id__in=ids).values_list(*COLUMNS)
+        }
+        with _lock:
+            for entry in entries.values():
+                _state["buckets"].put(entry)
+            for class_id in set(class_ids).difference(entries):
+                _state["buckets"].discard(class_id)
+        return entries
+
+    @staticmethod
+    def _load_pending():
+        with _lock:
+            class_ids = list(_pending)
+            _pending.clear()
+        AvailabilityIndex._reload(class_ids)
+
+    @staticmethod
+    def _collect(start, end, matches, limit, after=None):
+        """Return up to `limit` indexed classes passing `matches` in scheduled order, after the (scheduled_at, id) `after`."""
+        found = []
+        with _lock:
+            for bucket in _state["buckets"].between(after[0] if after else start, end):
+                found.extend(sorted(
+                    entry for entry in bucket.values() if (after is None or entry[:2] > after) and matches(entry)
+                ))
+                if len(found) >= limit:
+                    break
+        return found[:limit]
+
+    @staticmethod
+    def search(start, end, class_type=None, instructor_id=None, min_slots=1, studio=None, limit=50):
+        if AvailabilityIndex._stale():
+            AvailabilityIndex._build()
+        if _pending:
+            AvailabilityIndex._load_pending()
+        # only upcoming classes are indexed
+        start = max(start, now())
+
+        def matches(entry):
+            return (
+                start <= entry.scheduled_at <= end
+                and entry.available_slots >= min_slots
+                and (class_type is None or entry.class_name == class_type)
+                and (instructor_id is None or entry.instructor_id == instructor_id)
+                and (studio is None or entry.studio == studio)
+            )
+
+        # seat changes made by other workers only reach this one through a cross-process backend
+        verify = not getattr(get_broadcaster().backend, "cross_process", False)
+        found, after = [], None
+        while len(found) < limit:
+            wanted = limit - len(found)
+            candidates = AvailabilityIndex._collect(start, end, matches, wanted, after)
+            if not candidates:
+                break
+            after = candidates[-1][:2]
+            if verify:
+                fresh = AvailabilityIndex._reload([entry.id for entry in candidates])
+                found += [fresh[entry.id] for entry in candidates if entry.id in fresh and matches(fresh[entry.id])]
+            else:
+                found += candidates
+            if len(candidates) < wanted:
+                break
+        return found
+
+    @staticmethod
+    def refresh(fitness_class):
+        entry = IndexedClass(*(getattr(fitness_class, column) for column in COLUMNS[:-2]),
+                             fitness_class.capacity, fitness_class.available_slots)
+        with _lock:
+            if _state["buckets"] is None:
+                return
+            if _state["replay"] is not None:
+                # a rebuild is reading the classes, have the class reloaded after it
+                _pending.add(entry.id)
+            _state["buckets"].put(entry)
+
+    @staticmethod
+    def remove(class_id: int):
+        with _lock:
+            if _state["buckets"] is None:
+                return
+            if _state["replay"] is not None:
+                _pending.add(class_id)
+            _state["buckets"].discard(class_id)
+
+    @staticmethod
+    def invalidate():
+        with _lock:
+            _state["built_at"] = None
@@ -1,58 +1,328 @@
+import binascii
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from operator import attrgetter
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, transaction
+from django.db.models import F, Q
+from django.utils.timezone import now
+from bookings.models.archived_booking_model import ArchivedBooking
 from bookings.models.booking_model import Booking
 from bookings.models.client_model import Client
 from bookings.models.fitness_class_model import FitnessClass
+from bookings.services.availability_broadcaster import get_broadcaster
+from bookings.services.group_commit import GroupCommitQueue
+from bookings.services.identity_map import register
+from bookings.services.instructor_cache import InstructorCache
+from bookings.services.metrics import BOOKING_REJECTIONS, BOOKINGS_CREATED, LOCK_RETRIES
+from bookings.services.occupancy_service import OccupancyService
+from bookings.services.projection import project
+from bookings.services.schedule_conflict_service import ScheduleConflictService
+from bookings.services.shards import database_for_id, merge_sorted, replicate, shard_databases
+
+# number of bookings returned per page of a client's history
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# a booking transaction that finds its row or database locked is retried this many times in all
+LOCK_RETRY_ATTEMPTS = 3
+LOCK_RETRY_BACKOFF_SECONDS = 0.05
+# fragments of the lock errors reported by SQLite, PostgreSQL and MySQL
+LOCK_ERROR_MARKERS = ("database is locked", "could not obtain lock", "deadlock", "lock wait timeout")
 
 
 class BookingService:
     """
     Service Layer for Booking.
 
+    Bookings are stored in the database of their class's studio, found from the class or booking ID.
+    A client's history is read from every studio database and merged.
+
     Funcationalities: 
-        1. get_all_bookings() method - for fetching all bookings with respect to email provided
-            Input: User/Client email
-            Output: Bookings related to user
+        1. get_all_bookings() method - for fetching a page of bookings with respect to email provided (case-insensitive)
+            Input: User/Client email, include_archived flag to also return bookings of archived classes,
+                   optional upcoming/past and date-range filters, keyset cursor, page size and
+                   the columns to load (only the joins those columns need are made)
+            Output: (Bookings related to user ordered by the class's scheduled time, cursor of the next page or None),
+                    or None if no client has this email
         2. create_booking() method - for creating a booking with parameters class_id, first_name, last_name and client email
             Input: class_id, first_name, last_name and client_email
-            Output: Created booking data
+            Output: Created booking data, or None if the class is missing or full.
+            The transaction is retried when it hits a locked row or database. With `BOOKINGS_GROUP_COMMIT`
+            enabled, concurrent bookings of the same class are gathered and committed by create_bookings().
+        3. cancel_booking() method - for cancelling a client's booking and releasing its slot
+            Input: booking_id and client_email
+            Output: True if the booking was cancelled, False if no such booking exists for the client
+        4. create_bookings() method - for booking several clients into one class in a single transaction,
+           with one slot update and one bulk insert
+            Input: class_id and a list of (first_name, last_name, client_email)
+            Output: List with the created booking, or None if rejected (class full, already booked or overlapping
+                    another booking of the client), per request
     """
     @staticmethod
-    def get_all_bookings(client_email : str):
+    def encode_cursor(booking) -> str:
+        """Return an opaque keyset cursor pointing just after the given booking."""
+        position = f"{booking.scheduled_at.isoformat()}|{booking.id}"
+        return urlsafe_b64encode(position.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor : str):
+        """Return the (scheduled_at, booking id) position of a cursor, raises ValueError if it is malformed."""
         try:
-            # check if client exists with the email provided
-            client = Client.objects.get(email_address=client_email)
-        except Client.DoesNotExist:
+            scheduled_at, booking_id = urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return datetime.fromisoformat(scheduled_at), int(booking_id)
+        except (binascii.Error, UnicodeDecodeError, TypeError) as error:
+            raise ValueError("Malformed cursor") from error
+
+    @staticmethod
+    def _filter_history(bookings, scheduled_field : str, when=None, start=None, end=None, after=None, columns=None):
+        current_time = now()
+        if when == "upcoming":
+            bookings = bookings.filter(**{f"{scheduled_field}__gte": current_time})
+        elif when == "past":
+            bookings = bookings.filter(**{f"{scheduled_field}__lt": current_time})
+        if start:
+            bookings = bookings.filter(**{f"{scheduled_field}__gte": start})
+        if end:
+            bookings = bookings.filter(**{f"{scheduled_field}__lte": end})
+        if after:
+            scheduled_at, booking_id = after
+            bookings = bookings.filter(
+                Q(**{f"{scheduled_field}__gt": scheduled_at}) | Q(**{scheduled_field: scheduled_at, "id__gt": booking_id})
+            )
+        if columns:
+            # the id and scheduled time are always needed for ordering and the next cursor
+            bookings = project(bookings, ['id', 'scheduled_at', *columns])
+        else:
+            bookings = bookings.select_related('client', 'fitness_class', 'fitness_class__instructor')
+        return bookings.order_by(scheduled_field, 'id')
+
+    @staticmethod
+    def get_all_bookings(client_email : str, include_archived : bool = False, when=None, start=None, end=None,
+                         cursor=None, limit : int = DEFAULT_PAGE_SIZE, columns=None):
+        client_email = Client.normalize_email(client_email)
+        after = BookingService.decode_cursor(cursor) if cursor else None
+        page = []
+
+        if include_archived and when != "upcoming":
+            # archived classes are always older than live ones, so they come first
+            archived_bookings = BookingService._filter_history(
+                ArchivedBooking.objects.filter(client__email_address=client_email),
+                'fitness_class__scheduled_at', when, start, end, after
+            )
+            page = list(archived_bookings[:limit + 1])
+
+        if len(page) <= limit:
+            # one query per studio database joining client, class and instructor,
+            # walking the (client, scheduled_at, id) index
+            bookings = BookingService._filter_history(
+                Booking.objects.filter(client__email_address=client_email),
+                'scheduled_at', when, start, end, after, columns
+            )
+            remaining = limit + 1 - len(page)
+            page += merge_sorted(
+                (bookings.using(database)[:remaining] for database in shard_databases()),
+                key=attrgetter('scheduled_at', 'id'),
+            )[:remaining]
+
+        if not page and not Client.objects.filter(email_address=client_email).exists():
+            # no client with this email, as opposed to a client without matching bookings
             return None
-        # get all the bookings with respect to the email provided
-        bookings = Booking.objects.filter(client=client).select_related(
-            'fitness_class', 'fitness_class__instructor'
-        )
-        return bookings
-    
+
+        next_cursor = BookingService.encode_cursor(page[limit - 1]) if len(page) > limit else None
+        return page[:limit], next_cursor
+
+    @staticmethod
+    def _retry_on_lock(operation, using=DEFAULT_DB_ALIAS):
+        """Run a transaction on the given database, running it again when it fails on a locked row or database."""
+        for attempt in range(1, LOCK_RETRY_ATTEMPTS + 1):
+            try:
+                return operation()
+            except OperationalError as error:
+                # inside an outer transaction the whole outer transaction is broken, let it fail
+                retryable = not transaction.get_connection(using).in_atomic_block and any(
+                    marker in str(error).lower() for marker in LOCK_ERROR_MARKERS
+                )
+                if not retryable or attempt == LOCK_RETRY_ATTEMPTS:
+                    raise
+                LOCK_RETRIES.inc()
+                time.sleep(LOCK_RETRY_BACKOFF_SECONDS * attempt)
+
     @staticmethod
     def create_booking(class_id : int, first_name: str, last_name: str, client_email : str):
-        try:
-            fitness_class = FitnessClass.objects.get(id=class_id)
-        except FitnessClass.DoesNotExist:
-            return None
+        group_commit = getattr(settings, "BOOKINGS_GROUP_COMMIT", {})
+        if group_commit.get("ENABLED"):
+            return _group_commit_queue.submit(
+                class_id, (first_name, last_name, client_email),
+                group_commit.get("WINDOW_MS", 5) / 1000, group_commit.get("MAX_BATCH_SIZE", 50),
+            )
 
-        # check if slots available
-        if fitness_class.available_slots <= 0:
+        result = BookingService._retry_on_lock(
+            lambda: BookingService._book(class_id, first_name, last_name, client_email), database_for_id(class_id)
+        )
+        if result is None:
             return None
+        booking, fitness_class = result
+        BOOKINGS_CREATED.inc()
 
-        # get or create client
-        client, _ = Client.objects.get_or_create(
-            email_address=client_email,
-            defaults={"first_name": first_name, "last_name": last_name}
-        )
+        # push the new seat count to the live availability stream
+        get_broadcaster().publish(fitness_class.id, fitness_class.available_slots)
+
+        return booking
+
+    @staticmethod
+    def _book(class_id : int, first_name: str, last_name: str, client_email : str):
+        database = database_for_id(class_id)
+        with transaction.atomic(using=database):
+            try:
+                # lock the class row so concurrent bookings cannot oversell it,
+                # this deliberately re-reads the seat count validated earlier in the request
+                fitness_class = FitnessClass.objects.using(database).select_for_update().get(id=class_id)
+            except FitnessClass.DoesNotExist:
+                return None
+            fitness_class.instructor = InstructorCache.get(fitness_class.instructor_id)
+            register(fitness_class)
+
+            # check if slots available
+            if fitness_class.available_slots <= 0:
+                BOOKING_REJECTIONS.inc("class_full")
+                return None
 
-        # create booking
-        booking = Booking.objects.create(
-            client=client,
-            fitness_class=fitness_class
+            # get or create client
+            client, _ = Client.objects.get_or_create(
+                email_address=Client.normalize_email(client_email),
+                defaults={"first_name": first_name, "last_name": last_name}
+            )
+
+            # create booking, the class is set first so it places the booking in the class's database
+            replicate([client], database)
+            booking = Booking(fitness_class=fitness_class, scheduled_at=fitness_class.scheduled_at)
+            booking.client = client
+            booking.save(using=database)
+            Client.objects.filter(pk=client.pk).update(bookings_version=F('bookings_version') + 1)
+
+            # take a slot
+            fitness_class.booked_count += 1
+            fitness_class.save(update_fields=['booked_count', 'updated_on'])
+
+            OccupancyService.record_booking_change(fitness_class, 1)
+
+        return booking, fitness_class
+
+    @staticmethod
+    def create_bookings(class_id : int, requests):
+        result = BookingService._retry_on_lock(
+            lambda: BookingService._book_many(class_id, requests), database_for_id(class_id)
         )
+        if result is None:
+            return [None] * len(requests)
+        bookings, rejections, fitness_class = result
+        for reason in rejections:
+            BOOKING_REJECTIONS.inc(reason)
+
+        created = len(bookings) - bookings.count(None)
+        if created:
+            BOOKINGS_CREATED.inc(amount=created)
+            get_broadcaster().publish(fitness_class.id, fitness_class.available_slots)
+        return bookings
+
+    @staticmethod
+    def _book_many(class_id : int, requests):
+        database = database_for_id(class_id)
+        with transaction.atomic(using=database):
+            try:
+                fitness_class = FitnessClass.objects.using(database).select_for_update().get(id=class_id)
+            except FitnessClass.DoesNotExist:
+                return None
+            fitness_class.instructor = InstructorCache.get(fitness_class.instructor_id)
+            register(fitness_class)
+
+            emails = [Client.normalize_email(client_email) for _, _, client_email in requests]
+            already_booked = set(Booking.objects.using(database).filter(
+                fitness_class=fitness_class, client__email_address__in=emails
+            ).values_list('client__email_address', flat=True))
+            # the clients' other bookings are checked for overlaps in one go, as they may have changed since
+            # each request was validated
+            overlapping = ScheduleConflictService.validate_client_schedule([
+                (email, email, fitness_class) for email in dict.fromkeys(emails) if email not in already_booked
+            ])
+
+            # first come, first served: index of every accepted request by email
+            accepted, rejections = {}, []
+            for index, email in enumerate(emails):
+                if email in already_booked or email in accepted:
+                    rejections.append("duplicate_email")
+                elif email in overlapping:
+                    rejections.append("schedule_conflict")
+                elif len(accepted) >= fitness_class.available_slots:
+                    rejections.append("class_full")
+                else:
+                    accepted[email] = index
+
+            bookings = [None] * len(requests)
+            if not accepted:
+                return bookings, rejections, fitness_class
+
+            # get or create the clients, two queries whatever the batch size
+            clients = {client.email_address: client for client in Client.objects.filter(email_address__in=accepted)}
+            new_clients = [
+                Client(first_name=requests[index][0], last_name=requests[index][1], email_address=email)
+                for email, index in accepted.items() if email not in clients
+            ]
+            if new_clients:
+                Client.objects.bulk_create(new_clients, ignore_conflicts=True)
+                clients.update({
+                    client.email_address: client
+                    for client in Client.objects.filter(email_address__in=[client.email_address for client in new_clients])
+                })
+
+            replicate([clients[email] for email in accepted], database)
+            new_bookings = []
+            for email in accepted:
+                # the class is set first so it places the booking in the class's database
+                booking = Booking(fitness_class=fitness_class, scheduled_at=fitness_class.scheduled_at)
+                booking.client = clients[email]
+                new_bookings.append(booking)
+            created = Booking.objects.using(database).bulk_create(new_bookings)
+            for booking, index in zip(created, accepted.values()):
+                bookings[index] = booking
+            Client.objects.filter(
+                id__in=[clients[email].id for email in accepted]
+            ).update(bookings_version=F('bookings_version') + 1)
+
+            # take all the slots at once
+            fitness_class.booked_count += len(accepted)
+            fitness_class.save(update_fields=['booked_count', 'updated_on'])
+
+            OccupancyService.record_booking_change(fitness_class, len(accepted))
+
+        return bookings, rejections, fitness_class
+
+    @staticmethod
+    def cancel_booking(booking_id : int, client_email : str):
+        database = database_for_id(booking_id)
+        with transaction.atomic(using=database):
+            booking = Booking.objects.using(database).filter(
+                id=booking_id, client__email_address=Client.normalize_email(client_email)
+            ).select_related('fitness_class').first()
+            if booking is None:
+                return False
+
+            fitness_class = FitnessClass.objects.using(database).select_for_update().get(id=booking.fitness_class_id)
+            booking.delete()
+            Client.objects.filter(pk=booking.client_id).update(bookings_version=F('bookings_version') + 1)
+
+            # release the slot
+            fitness_class.booked_count -= 1
+            fitness_class.save(update_fields=['booked_count', 'updated_on'])
+
+            OccupancyService.record_booking_change(fitness_class, -1)
+
+        get_broadcaster().publish(fitness_class.id, fitness_class.available_slots)
+
+        return True
 
-        # reduce available slots
-        fitness_class.available_slots -= 1
-        fitness_class.save()
 
-        return booking
\ No newline at end of file
+# gathers concurrent bookings of the same class when BOOKINGS_GROUP_COMMIT is enabled
+_group_commit_queue = GroupCommitQueue(BookingService.create_bookings)
@@ -0,0 +1,128 @@
+import heapq
+from datetime import timedelta, timezone
+from itertools import chain
+from operator import attrgetter
+from django.conf import settings
+from django.core.cache import cache
+from bookings.models.booking_model import Booking
+from bookings.models.client_model import Client
+from bookings.services.shards import shard_databases
+
+# bookings fetched per round trip while generating a feed
+FEED_CHUNK_SIZE = 200
+
+# content lines longer than this many octets are folded (RFC 5545, section 3.1)
+MAX_LINE_OCTETS = 75
+
+CALENDAR_HEADER = (
+    "BEGIN:VCALENDAR",
+    "VERSION:2.0",
+    "PRODID:-//Online Fitness Studio//Bookings//EN",
+    "CALSCALE:GREGORIAN",
+    "METHOD:PUBLISH",
+    "X-WR-CALNAME:Fitness classes",
+)
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    """Return a content line terminated by CRLF, folded so no physical line exceeds 75 octets."""
+    parts, current, size = [], "", 0
+    for character in line:
+        octets = len(character.encode())
+        if size + octets > MAX_LINE_OCTETS:
+            parts.append(current)
+            # continuation lines start with a space, which counts towards their length
+            current, size = " ", 1
+        current += character
+        size += octets
+    parts.append(current)
+    return "\r\n".join(parts) + "\r\n"
+
+
+def _timestamp(value) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+class CalendarService:
+    """
+    Service layer for the clients' iCalendar (.ics) feeds.
+
+    A feed is versioned by `Client.bookings_version`, which changes only when the client's bookings do,
+    so answering a poll takes one lookup on the unique email index. Generated feeds are cached per version.
+
+    Functionalities:
+        1. feed_version() - version of a client's feed
+            Input: client email
+            Output: (client id, bookings version), or None if no such client exists
+        2. etag() - ETag of a feed version
+        3. cached_feed() - body generated earlier for a feed version, or None
+        4. stream_feed() - generates a feed line by line, caching the body once it is complete
+            Output: generator of feed chunks
+    """
+
+    @staticmethod
+    def feed_version(client_email: str):
+        return Client.objects.filter(
+            email_address=Client.normalize_email(client_email)
+        ).values_list('id', 'bookings_version').first()
+
+    @staticmethod
+    def etag(client_id: int, version: int) -> str:
+        return f'"calendar-{client_id}-{version}"'
+
+    @staticmethod
+    def _cache_key(client_id: int, version: int) -> str:
+        return f"bookings:calendar:{client_id}:{version}"
+
+    @staticmethod
+    def cached_feed(client_id: int, version: int):
+        return cache.get(CalendarService._cache_key(client_id, version))
+
+    @staticmethod
+    def _events(client_id: int):
+        bookings = Booking.objects.filter(client_id=client_id).select_related(
+            'fitness_class__instructor'
+        ).only(
+            'id', 'booked_at', 'scheduled_at', 'fitness_class__class_name', 'fitness_class__duration_minutes',
+            'fitness_class__instructor__instructor_name',
+        ).order_by('scheduled_at', 'id')
+
+        # the client's bookings of every studio, merged as they stream in
+        for booking in heapq.merge(
+            *(bookings.using(database).iterator(chunk_size=FEED_CHUNK_SIZE) for database in shard_databases()),
+            key=attrgetter('scheduled_at', 'id'),
+        ):
+            fitness_class = booking.fitness_class
+            instructor_name = fitness_class.instructor.instructor_name
+            lines = (
+                "BEGIN:VEVENT",
+                f"UID:booking-{booking.id}@online-fitness-studio",
+                f"DTSTAMP:{_timestamp(booking.booked_at)}",
+                f"DTSTART:{_timestamp(booking.scheduled_at)}",
+                f"DTEND:{_timestamp(booking.scheduled_at + timedelta(minutes=fitness_class.duration_minutes))}",
+                f"SUMMARY:{_escape(f'{fitness_class.class_name} with {instructor_name}')}",
+                f"DESCRIPTION:{_escape(f'{fitness_class.class_name} class led by {instructor_name}.')}",
+                "END:VEVENT",
+            )
+            yield "".join(_fold(line) for line in lines)
+
+    @staticmethod
+    def stream_feed(client_id: int, version: int):
+        # the bookings are read after the version, so the cached body is never older than its version
+        chunks = []
+        for chunk in chain(
+            ["".join(_fold(line) for line in CALENDAR_HEADER)],
+            CalendarService._events(client_id),
+            [_fold("END:VCALENDAR")],
+        ):
+            chunks.append(chunk)
+            yield chunk
+        cache.set(
+            CalendarService._cache_key(client_id, version),
+            "".join(chunks),
+            getattr(settings, "BOOKINGS_CALENDAR_CACHE_TIMEOUT", 24 * 60 * 60),
+        )
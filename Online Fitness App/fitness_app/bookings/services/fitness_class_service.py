@@ -1,35 +1,115 @@
-from bookings.models.fitness_class_model import FitnessClass
-from bookings.models.instructor_model import Instructor
+from datetime import timedelta
+from operator import attrgetter, itemgetter
+from bookings.models.fitness_class_model import DEFAULT_STUDIO, FitnessClass
+from bookings.services.availability_broadcaster import get_broadcaster
+from bookings.services.availability_index import AvailabilityIndex
+from bookings.services.identity_map import load_many
+from bookings.services.instructor_cache import InstructorCache
+from bookings.services.occupancy_service import OccupancyService
+from bookings.services.projection import project
+from bookings.services.shards import merge_sorted, replicate, shard_databases, studio_database
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
 from django.utils.timezone import now
 
 class FitnessClassService:
     """
     Service layer for Fitness class
 
+    Classes are stored in the database of their studio. Without a studio, listings query every
+    studio database and merge the results by scheduled time.
+
     Functionalities:
         1. get_all_classes() - fetches all upcoming classes
-            Input: None
+            Input: Optional list of columns to load, instructors come from the instructor cache rather than a join,
+                   optional studio
             Output: All classes whose scheduled at time is greater than the current time and orderd by time the class is scheduled
 
-        2. create_fitness_class() - creates a fitness class with parameters: class_name, instructor_id, available_slots and scheduled_at time
-            Input: class_name, instructor_id, available_slots and scheduled_at time
+        2. create_fitness_class() - creates a fitness class with parameters: class_name, instructor_id, available_slots, scheduled_at time and duration
+            Input: class_name, instructor_id, available_slots, scheduled_at time, duration_minutes and studio
             Output: Fitness class created
+
+        3. get_classes_by_ids() - fetches specific classes with their instructors in a single query
+            Input: List of class IDs
+            Output: (classes found, in the requested order, IDs that do not exist)
+
+        4. get_availability_snapshot() - fetches seat counts of all upcoming classes
+            Input: None
+            Output: List of {"class_id", "available_slots"} dicts, used as the first event of the availability stream
+
+        5. search_classes() - finds upcoming classes with free seats from the in-memory availability index, without a query
+            Input: Optional time window (the next 24 hours by default), class type, instructor ID, studio,
+                   minimum seats left (1 by default) and result limit
+            Output: List of IndexedClass ordered by scheduled time
     """
 
     @staticmethod
-    def get_all_classes():
-        try:
-            classes = FitnessClass.objects.filter(scheduled_at__gte=now()).select_related('instructor').order_by('scheduled_at')
-        except FitnessClass.DoesNotExist:
-            return None
+    def get_all_classes(columns=None, studio=None):
+        classes = FitnessClass.objects.filter(scheduled_at__gte=now())
+        databases = shard_databases()
+        if studio:
+            classes = classes.filter(studio=studio)
+            databases = [studio_database(studio)]
+        if columns:
+            # the scheduled time is needed to merge the studio databases
+            classes = project(classes, [*columns, 'scheduled_at'] if len(databases) > 1 else columns)
+        classes = classes.order_by('scheduled_at')
+        classes = merge_sorted(
+            (classes.using(database) for database in databases), key=attrgetter('scheduled_at')
+        )
+        if not columns or 'instructor_id' in columns:
+            InstructorCache.attach(classes)
         return classes
         
 
     @staticmethod
-    def create_fitness_class(class_name, instructor_id, available_slots, scheduled_at):
-        return FitnessClass.objects.create(
-            class_name=class_name,
-            instructor_id=instructor_id,
-            available_slots=available_slots,
-            scheduled_at=scheduled_at
-        )
\ No newline at end of file
+    def create_fitness_class(class_name, instructor_id, available_slots, scheduled_at, duration_minutes=60,
+                             studio=DEFAULT_STUDIO):
+        database = studio_database(studio)
+        # the instructor was cached while validating the request
+        instructor = InstructorCache.get(instructor_id)
+        with transaction.atomic(using=database):
+            replicate([instructor], database)
+            fitness_class = FitnessClass.objects.using(database).create(
+                studio=studio,
+                class_name=class_name,
+                instructor_id=instructor_id,
+                capacity=available_slots,
+                scheduled_at=scheduled_at,
+                duration_minutes=duration_minutes
+            )
+            OccupancyService.record_class_created(fitness_class)
+        fitness_class.instructor = instructor
+        get_broadcaster().publish(fitness_class.id, fitness_class.available_slots)
+        return fitness_class
+
+    @staticmethod
+    def get_classes_by_ids(class_ids):
+        found = load_many(FitnessClass, class_ids)
+        classes = InstructorCache.attach(found[class_id] for class_id in dict.fromkeys(class_ids) if class_id in found)
+        missing = [class_id for class_id in dict.fromkeys(class_ids) if class_id not in found]
+        return classes, missing
+
+    @staticmethod
+    def get_availability_snapshot():
+        upcoming = FitnessClass.objects.filter(
+            scheduled_at__gte=now()
+        ).annotate(
+            slots_left=Greatest(F('capacity') - F('booked_count'), Value(0))
+        ).order_by('scheduled_at').values_list('scheduled_at', 'id', 'slots_left')
+        return [
+            {"class_id": class_id, "available_slots": available_slots}
+            for _, class_id, available_slots in merge_sorted(
+                (upcoming.using(database) for database in shard_databases()), key=itemgetter(0)
+            )
+        ]
+
+    @staticmethod
+    def search_classes(start=None, end=None, class_type=None, instructor_id=None, studio=None, min_slots=1, limit=50):
+        start = start or now()
+        end = end or start + timedelta(days=1)
+        return AvailabilityIndex.search(
+            start, end, class_type=class_type, instructor_id=instructor_id, min_slots=min_slots, studio=studio,
+            limit=limit
+        )
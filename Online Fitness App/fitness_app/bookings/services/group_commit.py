@@ -0,0 +1,76 @@
+import threading
+
+
+class _Pending:
+    """One request waiting in a batch, completed by the thread that commits the batch."""
+    __slots__ = ("payload", "done", "result", "error")
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Batch:
+    def __init__(self):
+        self.items = []
+        self.full = threading.Event()
+
+
+class GroupCommitQueue:
+    """
+    Gathers concurrent writes for the same key (e.g. bookings of one class) and commits them together.
+
+    The first request for a key opens a batch and becomes its leader: it waits up to the window, or
+    until the batch reaches its maximum size, then commits every gathered payload with a single call
+    of `commit_batch(key, payloads)`, which returns one result per payload. The other requests only
+    wait for their own result, so a burst of N requests costs one transaction instead of N.
+
+    Functionalities:
+        1. submit() - adds a payload to the open batch of its key and blocks until the batch is committed
+            Input: key, payload, window in seconds, maximum batch size
+            Output: Result of the payload, the batch's exception is raised in every waiting request
+    """
+    def __init__(self, commit_batch):
+        self.commit_batch = commit_batch
+        self._lock = threading.Lock()
+        self._open = {}
+
+    def submit(self, key, payload, window_seconds: float, max_batch_size: int):
+        pending = _Pending(payload)
+        with self._lock:
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._open[key] = _Batch()
+            batch.items.append(pending)
+            if len(batch.items) >= max_batch_size:
+                # close the batch now, the next request for this key opens a new one
+                del self._open[key]
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(window_seconds)
+            with self._lock:
+                if self._open.get(key) is batch:
+                    del self._open[key]
+            self._commit(key, batch.items)
+        else:
+            pending.done.wait()
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _commit(self, key, items):
+        try:
+            results = self.commit_batch(key, [item.payload for item in items])
+            for item, result in zip(items, results):
+                item.result = result
+        except Exception as error:
+            for item in items:
+                item.error = error
+        finally:
+            for item in items:
+                item.done.set()
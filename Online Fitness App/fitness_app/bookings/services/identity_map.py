@@ -0,0 +1,75 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from bookings.services.shards import group_by_database, is_sharded
+
+# identity map of the request being handled, set by IdentityMapMiddleware
+_current_identity_map = ContextVar("bookings_identity_map", default=None)
+
+
+class IdentityMap:
+    """
+    Request-scoped registry holding at most one loaded instance per model and primary key,
+    so serializers and services share objects instead of re-fetching them.
+    """
+    def __init__(self):
+        self._objects = {}
+
+    def get(self, model, pk):
+        return self._objects.get((model, pk))
+
+    def add(self, obj):
+        self._objects[(type(obj), obj.pk)] = obj
+        return obj
+
+
+@contextmanager
+def identity_map_scope():
+    """Activate a fresh identity map for the duration of the block."""
+    token = _current_identity_map.set(IdentityMap())
+    try:
+        yield
+    finally:
+        _current_identity_map.reset(token)
+
+
+def register(obj):
+    """Record an instance in the active identity map (if any), replacing any older copy."""
+    identity_map = _current_identity_map.get()
+    if identity_map is not None and obj is not None:
+        identity_map.add(obj)
+    return obj
+
+
+def load_many(model, ids, select_related=()):
+    """
+    Return {pk: instance} for the given primary keys, missing ones are left out.
+    Instances already in the active identity map are reused, the rest are fetched with a
+    single `pk__in` query (per studio database for classes and bookings) and registered
+    together with their `select_related` objects.
+    """
+    identity_map = _current_identity_map.get()
+    found = {}
+    missing = []
+    for pk in dict.fromkeys(ids):
+        obj = identity_map.get(model, pk) if identity_map is not None else None
+        if obj is None:
+            missing.append(pk)
+        else:
+            found[pk] = obj
+
+    if not missing:
+        return found
+    querysets = [model.objects.filter(pk__in=missing)]
+    if is_sharded(model):
+        querysets = [model.objects.using(database).filter(pk__in=pks) for database, pks in group_by_database(missing).items()]
+    for queryset in querysets:
+        for obj in queryset.select_related(*select_related):
+            found[obj.pk] = register(obj)
+            for field_name in select_related:
+                register(getattr(obj, field_name))
+    return found
+
+
+def load(model, pk, select_related=()):
+    """Return the instance with the given primary key, or None if it does not exist."""
+    return load_many(model, [pk], select_related).get(pk)
@@ -0,0 +1,230 @@
+import csv
+import logging
+import time
+from datetime import timedelta
+from itertools import islice
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, transaction
+from django.db.models import F
+from rest_framework import serializers
+from bookings.models.client_model import Client
+from bookings.models.fitness_class_model import FitnessClass
+from bookings.serializers.import_serializer import ImportClientSerializer, ImportFitnessClassSerializer
+from bookings.services.availability_broadcaster import get_broadcaster
+from bookings.services.instructor_cache import InstructorCache
+from bookings.services.listing_cache import ListingCache
+from bookings.services.occupancy_service import OccupancyService
+from bookings.services.schedule_conflict_service import ScheduleConflictService
+from bookings.services.shards import replicate, shard_databases, studio_database
+
+logger = logging.getLogger(__name__)
+
+CLIENT_COLUMNS = ("first_name", "last_name", "email_address", "phone_number")
+CLASS_COLUMNS = ("class_name", "instructor_id", "available_slots", "scheduled_at")
+
+# rows kept in the report's error list, the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportService:
+    """
+    Service layer for bulk imports of CSV files, e.g. when migrating the data of an acquired studio.
+
+    Files are read row by row and handled a chunk at a time, so memory use does not grow with the file.
+    Each row is checked with the field rules of the API serializers; the checks that need the database
+    (existing clients, duplicate classes, instructor overlaps) run once per chunk. Each chunk is written
+    in its own transaction, a chunk that fails to write is reported and the import goes on with the next.
+
+    Functionalities:
+        1. import_clients() - upserts clients by email address, a later row for the same email wins; updated clients
+           have their copies in the studio databases refreshed and their calendar feed version bumped
+            Input: Open CSV file with CLIENT_COLUMNS, chunk size
+            Output: Import report
+        2. import_classes() - inserts fitness classes into their studio's database, rows clashing with an existing
+           or earlier row are rejected
+            Input: Open CSV file with CLASS_COLUMNS (and optionally duration_minutes and studio), chunk size
+            Output: Import report
+
+    The import report is a dict: {"rows", "created", "updated", "failed", "errors": [(line, message)], "seconds"}.
+    """
+
+    @staticmethod
+    def _read(csv_file, required_columns):
+        """Yield (line number, row) with the empty cells dropped, so optional columns fall back to their defaults."""
+        reader = csv.DictReader(csv_file)
+        missing = [column for column in required_columns if column not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"Missing CSV columns: {', '.join(missing)}")
+        for row in reader:
+            yield reader.line_num, {
+                column: value.strip() for column, value in row.items()
+                if column is not None and isinstance(value, str) and value.strip()
+            }
+
+    @staticmethod
+    def _chunks(rows, chunk_size: int):
+        while chunk := list(islice(rows, chunk_size)):
+            yield chunk
+
+    @staticmethod
+    def _new_report():
+        return {"rows": 0, "created": 0, "updated": 0, "failed": 0, "errors": [], "started": time.perf_counter()}
+
+    @staticmethod
+    def _fail(report, line: int, message: str):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append((line, message))
+
+    @staticmethod
+    def _finish(report):
+        report["seconds"] = time.perf_counter() - report.pop("started")
+        return report
+
+    @staticmethod
+    def _validate(serializer, chunk, report):
+        """Run the serializer's rules on every row of the chunk, return [(line, validated data)] of the valid ones."""
+        valid = []
+        for line, row in chunk:
+            try:
+                valid.append((line, serializer.run_validation(row)))
+            except serializers.ValidationError as error:
+                ImportService._fail(report, line, ImportService._message(error.detail))
+        return valid
+
+    @staticmethod
+    def _message(detail):
+        if isinstance(detail, dict):
+            return "; ".join(f"{field}: {' '.join(str(message) for message in messages)}" for field, messages in detail.items())
+        return " ".join(str(message) for message in detail)
+
+    @staticmethod
+    def import_clients(csv_file, chunk_size: int = 1000):
+        report = ImportService._new_report()
+        serializer = ImportClientSerializer()
+        for chunk in ImportService._chunks(ImportService._read(csv_file, CLIENT_COLUMNS), chunk_size):
+            report["rows"] += len(chunk)
+            valid = ImportService._validate(serializer, chunk, report)
+            # keyed by email, a repeated email keeps its last row
+            clients = {data["email_address"]: Client(**data) for _, data in valid}
+            if not clients:
+                continue
+            try:
+                with transaction.atomic():
+                    existing = Client.objects.filter(email_address__in=clients)
+                    existing_ids = list(existing.values_list("id", flat=True))
+                    Client.objects.bulk_create(
+                        clients.values(),
+                        update_conflicts=True,
+                        unique_fields=["email_address"],
+                        update_fields=["first_name", "last_name", "phone_number"],
+                    )
+                    # bulk_create sends no signals, do what saving each client would have done:
+                    # their calendar feeds carry their names
+                    Client.objects.filter(id__in=existing_ids).update(bookings_version=F("bookings_version") + 1)
+            except DatabaseError as error:
+                logger.error(f"Error occured while importing clients: {error}")
+                for line, _ in valid:
+                    ImportService._fail(report, line, f"Chunk could not be written: {error}")
+                continue
+            ImportService._refresh_client_copies(existing_ids)
+            report["created"] += len(clients) - len(existing_ids)
+            report["updated"] += len(existing_ids)
+        return ImportService._finish(report)
+
+    @staticmethod
+    def _refresh_client_copies(client_ids):
+        """Refresh the copies of updated clients in the other studio databases, as the `update_replicas` signal does."""
+        databases = [database for database in shard_databases() if database != DEFAULT_DB_ALIAS]
+        if not client_ids or not databases:
+            return
+        clients = {client.id: client for client in Client.objects.filter(id__in=client_ids)}
+        for database in databases:
+            # only clients with bookings there have a copy
+            copied = Client.objects.using(database).filter(id__in=client_ids).values_list("id", flat=True)
+            replicate([clients[client_id] for client_id in copied], database)
+
+    @staticmethod
+    def _check_classes(valid, report):
+        """Reject the rows duplicating a class or overlapping another class of their instructor."""
+        studios = {data["studio"] for _, data in valid}
+        existing = FitnessClass.objects.filter(
+            studio__in=studios, scheduled_at__in={data["scheduled_at"] for _, data in valid}
+        ).values_list("studio", "class_name", "scheduled_at")
+        existing = {
+            slot
+            for database in {studio_database(studio) for studio in studios}
+            for slot in existing.using(database)
+        }
+        conflicts = ScheduleConflictService.validate_instructor_schedule([
+            (("row", line), data["instructor_id"], data["scheduled_at"],
+             data["scheduled_at"] + timedelta(minutes=data["duration_minutes"]))
+            for line, data in valid
+        ])
+
+        accepted, taken = [], set()
+        for line, data in valid:
+            slot = (data["studio"], data["class_name"], data["scheduled_at"])
+            # other rows are keyed ("row", line), anything else is a class already in the database
+            clashes = [key for key in conflicts.get(("row", line), ()) if not isinstance(key, tuple) or key in taken]
+            if slot in existing:
+                ImportService._fail(report, line, "A class of this type is already scheduled at this time.")
+            elif clashes:
+                ImportService._fail(report, line, "The instructor is already teaching a class at an overlapping time.")
+            else:
+                existing.add(slot)
+                taken.add(("row", line))
+                accepted.append((line, data))
+        return accepted
+
+    @staticmethod
+    def import_classes(csv_file, chunk_size: int = 1000):
+        report = ImportService._new_report()
+        serializer = ImportFitnessClassSerializer()
+        broadcaster = get_broadcaster()
+        for chunk in ImportService._chunks(ImportService._read(csv_file, CLASS_COLUMNS), chunk_size):
+            report["rows"] += len(chunk)
+            # one query for the chunk's instructors, validation then reads them from the cache
+            instructor_ids = [row["instructor_id"] for _, row in chunk if row.get("instructor_id", "").isdigit()]
+            InstructorCache.get_many(int(instructor_id) for instructor_id in instructor_ids)
+
+            valid = ImportService._validate(serializer, chunk, report)
+            accepted = ImportService._check_classes(valid, report) if valid else []
+            by_database = {}
+            for line, data in accepted:
+                by_database.setdefault(studio_database(data["studio"]), []).append((line, data))
+            for database, rows in by_database.items():
+                classes = ImportService._insert_classes(database, rows, report)
+                for fitness_class in classes:
+                    broadcaster.publish(fitness_class.id, fitness_class.available_slots)
+            if accepted:
+                # bulk_create sends no signals
+                ListingCache.bump_version()
+        return ImportService._finish(report)
+
+    @staticmethod
+    def _insert_classes(database, rows, report):
+        """Insert the accepted rows of one studio database in one transaction, return the created classes."""
+        classes = [
+            FitnessClass(
+                studio=data["studio"],
+                class_name=data["class_name"],
+                instructor_id=data["instructor_id"],
+                capacity=data["available_slots"],
+                scheduled_at=data["scheduled_at"],
+                duration_minutes=data["duration_minutes"],
+            )
+            for _, data in rows
+        ]
+        instructors = InstructorCache.get_many(fitness_class.instructor_id for fitness_class in classes)
+        try:
+            with transaction.atomic(using=database):
+                replicate(instructors.values(), database)
+                classes = FitnessClass.objects.using(database).bulk_create(classes, batch_size=500)
+                OccupancyService.record_classes_created(classes)
+        except DatabaseError as error:
+            logger.error(f"Error occured while importing classes: {error}")
+            for line, _ in rows:
+                ImportService._fail(report, line, f"Chunk could not be written: {error}")
+            return []
+        report["created"] += len(classes)
+        return classes
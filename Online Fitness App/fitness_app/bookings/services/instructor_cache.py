@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import cache
+from bookings.models.instructor_model import Instructor
+from bookings.services.metrics import CACHE_REQUESTS
+
+VERSION_KEY = "bookings:instructors:version"
+
+# process-local state, guarded by _lock
+_lock = threading.Lock()
+_entries = OrderedDict()
+_state = {"version": None, "checked_at": float("-inf"), "generation": 0}
+
+
+class InstructorCache:
+    """
+    Process-local, size-bounded LRU cache of instructors, read through to the database.
+
+    The instructor table is small and rarely changes, so class listings and validations take instructors
+    from here instead of joining or querying them. Saving or deleting an instructor clears this process's
+    entries and bumps a version stamp in the shared Django cache; other workers compare their stamp at most
+    every `BOOKINGS_INSTRUCTOR_CACHE_RECHECK_SECONDS` and clear theirs when it moved. Updates made with
+    queryset.update() send no signals and must call invalidate() themselves.
+    Cached instances are shared between requests and must be treated as read-only.
+
+    Functionalities:
+        1. get_many() - instructors of the given IDs, the ones not cached are fetched with one query
+            Output: {id: Instructor}, missing IDs are left out
+        2. get() - instructor with the given ID, or None
+        3. attach() - sets the instructor of fitness classes loaded without it
+        4. invalidate() - drops the cached instructors of every worker
+    """
+
+    @staticmethod
+    def _shared_version():
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            # start from the clock so a re-created stamp never matches one that was evicted
+            cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+            version = cache.get(VERSION_KEY)
+        return version
+
+    @staticmethod
+    def _sync():
+        """Clear the local entries if another worker invalidated them. Called with _lock held."""
+        checked_at = time.monotonic()
+        if checked_at - _state["checked_at"] < getattr(settings, "BOOKINGS_INSTRUCTOR_CACHE_RECHECK_SECONDS", 1.0):
+            return
+        _state["checked_at"] = checked_at
+        version = InstructorCache._shared_version()
+        if version != _state["version"]:
+            _entries.clear()
+            _state["version"] = version
+            _state["generation"] += 1
+
+    @staticmethod
+    def get_many(instructor_ids):
+        found, missing = {}, []
+        with _lock:
+            InstructorCache._sync()
+            generation = _state["generation"]
+            for instructor_id in dict.fromkeys(instructor_ids):
+                instructor = _entries.get(instructor_id)
+                if instructor is None:
+                    missing.append(instructor_id)
+                else:
+                    _entries.move_to_end(instructor_id)
+                    found[instructor_id] = instructor
+        if found:
+            CACHE_REQUESTS.inc("instructors", "hit", amount=len(found))
+        if not missing:
+            return found
+
+        CACHE_REQUESTS.inc("instructors", "miss", amount=len(missing))
+        loaded = {instructor.id: instructor for instructor in Instructor.objects.filter(pk__in=missing)}
+        found.update(loaded)
+        with _lock:
+            # skip storing rows read while an invalidation went through, they may be stale
+            if generation == _state["generation"]:
+                _entries.update(loaded)
+                max_size = getattr(settings, "BOOKINGS_INSTRUCTOR_CACHE_SIZE", 1000)
+                while len(_entries) > max_size:
+                    _entries.popitem(last=False)
+        return found
+
+    @staticmethod
+    def get(instructor_id):
+        return InstructorCache.get_many([instructor_id]).get(instructor_id)
+
+    @staticmethod
+    def attach(fitness_classes):
+        fitness_classes = list(fitness_classes)
+        instructors = InstructorCache.get_many(fitness_class.instructor_id for fitness_class in fitness_classes)
+        for fitness_class in fitness_classes:
+            # an instructor deleted meanwhile is left to the lazy relation
+            if fitness_class.instructor_id in instructors:
+                fitness_class.instructor = instructors[fitness_class.instructor_id]
+        return fitness_classes
+
+    @staticmethod
+    def invalidate():
+        with _lock:
+            _entries.clear()
+            _state["generation"] += 1
+            _state["checked_at"] = float("-inf")
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.add(VERSION_KEY, time.time_ns(), timeout=None)
@@ -0,0 +1,63 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+from bookings.services.compression import SUPPORTED_ENCODINGS, compress
+from bookings.services.metrics import CACHE_REQUESTS
+
+VERSION_KEY = "bookings:classes:version"
+
+
+class ListingCache:
+    """
+    Cache of the rendered upcoming-classes listing.
+
+    Every entry holds the JSON body together with its compressed variants, so repeat hits
+    cost neither serialization nor compression. Entries are keyed by a version stamp that is
+    bumped whenever a class is saved or deleted, and expire after
+    `BOOKINGS_LISTING_CACHE_TIMEOUT` seconds since the listing also depends on the current time.
+
+    Functionalities:
+        1. key() - cache key of a field selection (and studio) under the current version, taken before building
+           the payload so a concurrent invalidation is never stored under the new version
+        2. get() - cached entry of a key, or None
+        3. store() - renders, compresses and caches a payload
+            Output: {"identity": bytes, "gzip": bytes, ["br": bytes]}
+        4. bump_version() - invalidates every cached listing
+    """
+
+    @staticmethod
+    def _version():
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            # start from the clock so a re-created stamp never matches entries of an evicted one
+            cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+            version = cache.get(VERSION_KEY)
+        return version
+
+    @staticmethod
+    def key(fields=None, studio=None):
+        return f"bookings:classes:{ListingCache._version()}:{studio or '*'}:{','.join(fields or ['*'])}"
+
+    @staticmethod
+    def get(key):
+        entry = cache.get(key)
+        CACHE_REQUESTS.inc("class_listing", "miss" if entry is None else "hit")
+        return entry
+
+    @staticmethod
+    def store(key, payload):
+        body = JSONRenderer().render(payload)
+        entry = {"identity": body}
+        for encoding in SUPPORTED_ENCODINGS:
+            entry[encoding] = compress(body, encoding, best=True)
+        cache.set(key, entry, getattr(settings, "BOOKINGS_LISTING_CACHE_TIMEOUT", 30))
+        return entry
+
+    @staticmethod
+    def bump_version():
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            # the version key was evicted, a fresh clock-based stamp invalidates the old entries
+            cache.add(VERSION_KEY, time.time_ns(), timeout=None)
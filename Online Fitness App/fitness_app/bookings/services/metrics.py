@@ -0,0 +1,228 @@
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from django.conf import settings
+
+# seconds between two writes of a process's metrics to the shared metrics directory
+FLUSH_INTERVAL_SECONDS = 1.0
+# seconds after its last write a process's file is dropped from the metrics directory, see BOOKINGS_METRICS_RETENTION_SECONDS
+DEFAULT_RETENTION_SECONDS = 24 * 60 * 60
+
+# upper bounds of the latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MetricsRegistry:
+    """
+    In-process store of counter and histogram values, cheap enough to update on every request.
+
+    Each worker process keeps its own values and, when `BOOKINGS_METRICS_DIR` is set, writes them
+    at most once every FLUSH_INTERVAL_SECONDS to its own file in that directory. The metrics
+    endpoint sums the files of all workers, so any worker can answer a scrape for the whole server.
+    A process removes its file when it exits, and scrapes delete the files of processes that have not
+    written for `BOOKINGS_METRICS_RETENTION_SECONDS` (workers killed without running their exit hooks).
+
+    Functionalities:
+        1. inc() / observe() - update a counter / histogram series
+        2. flush() - write this process's values to the metrics directory
+        3. collect() - values of all processes (or only this one without a metrics directory)
+            Output: ({(name, labels): value}, {(name, labels): [bucket counts..., sum, count]})
+        4. render() - the collected values in the Prometheus text exposition format
+    """
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+        self._reset()
+        atexit.register(self._remove_file)
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._file_name = f"{self._pid}-{time.time_ns()}.json"
+        self._counters = {}
+        self._histograms = {}
+        self._last_flush = time.monotonic()
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def inc(self, name, labels, amount):
+        with self._lock:
+            if self._pid != os.getpid():
+                # forked worker, the values inherited from the parent are reported by the parent
+                self._reset()
+            key = (name, labels)
+            self._counters[key] = self._counters.get(key, 0) + amount
+        self._maybe_flush()
+
+    def observe(self, name, labels, bucket_index, value):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            key = (name, labels)
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [0] * (len(self.metrics[name].buckets) + 3)
+            series[bucket_index] += 1
+            series[-2] += value
+            series[-1] += 1
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= FLUSH_INTERVAL_SECONDS:
+            self.flush()
+
+    def _snapshot(self):
+        with self._lock:
+            return dict(self._counters), {key: list(series) for key, series in self._histograms.items()}
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        directory = getattr(settings, "BOOKINGS_METRICS_DIR", None)
+        if not directory:
+            return
+        counters, histograms = self._snapshot()
+        data = {
+            "counters": [[name, labels, value] for (name, labels), value in counters.items()],
+            "histograms": [[name, labels, series] for (name, labels), series in histograms.items()],
+        }
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        # write then rename, so a scrape never reads a half written file
+        temporary = directory / f".{self._file_name}.tmp"
+        temporary.write_text(json.dumps(data))
+        os.replace(temporary, directory / self._file_name)
+
+    def _remove_file(self):
+        directory = getattr(settings, "BOOKINGS_METRICS_DIR", None)
+        if not directory or self._pid != os.getpid():
+            # a forked worker that never recorded anything, the file is its parent's
+            return
+        Path(directory, self._file_name).unlink(missing_ok=True)
+
+    def collect(self):
+        directory = getattr(settings, "BOOKINGS_METRICS_DIR", None)
+        if not directory:
+            return self._snapshot()
+
+        self.flush()
+        expired = time.time() - getattr(settings, "BOOKINGS_METRICS_RETENTION_SECONDS", DEFAULT_RETENTION_SECONDS)
+        counters, histograms = {}, {}
+        for path in Path(directory).glob("*.json"):
+            try:
+                if path.stat().st_mtime < expired:
+                    path.unlink(missing_ok=True)
+                    continue
+                data = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in data["counters"]:
+                key = (name, tuple(labels))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, series in data["histograms"]:
+                key = (name, tuple(labels))
+                total = histograms.setdefault(key, [0] * len(series))
+                for index, value in enumerate(series):
+                    total[index] += value
+        return counters, histograms
+
+    def render(self):
+        counters, histograms = self.collect()
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if metric.kind == "counter":
+                for (name, labels), value in sorted(counters.items()):
+                    if name == metric.name:
+                        lines.append(f"{name}{_format_labels(metric.labelnames, labels)} {float(value)}")
+                continue
+            for (name, labels), series in sorted(histograms.items()):
+                if name != metric.name:
+                    continue
+                cumulative = 0
+                for bound, count in zip((*metric.buckets, "+Inf"), series):
+                    cumulative += count
+                    bucket_labels = _format_labels((*metric.labelnames, "le"), (*labels, str(bound)))
+                    lines.append(f"{name}_bucket{bucket_labels} {float(cumulative)}")
+                lines.append(f"{name}_sum{_format_labels(metric.labelnames, labels)} {float(series[-2])}")
+                lines.append(f"{name}_count{_format_labels(metric.labelnames, labels)} {float(series[-1])}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Counter:
+    """A monotonically increasing count, e.g. `BOOKINGS_CREATED.inc()`."""
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        REGISTRY.register(self)
+
+    def inc(self, *labels, amount=1):
+        REGISTRY.inc(self.name, labels, amount)
+
+
+class Histogram:
+    """A distribution of observed values, e.g. `REQUEST_LATENCY.observe(0.012, "create-booking", "POST")`."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        REGISTRY.register(self)
+
+    def observe(self, value, *labels):
+        REGISTRY.observe(self.name, labels, bisect_left(self.buckets, value), value)
+
+
+REQUESTS = Counter(
+    "bookings_http_requests_total", "HTTP requests by view, method and status code.", ("view", "method", "status")
+)
+REQUEST_LATENCY = Histogram(
+    "bookings_http_request_duration_seconds", "Time taken to answer a request, by view.", ("view", "method")
+)
+DB_TIME = Histogram(
+    "bookings_db_duration_seconds", "Time spent in database queries per request, by view.", ("view", "method")
+)
+BOOKINGS_CREATED = Counter("bookings_created_total", "Bookings created.")
+BOOKING_REJECTIONS = Counter(
+    "bookings_rejected_total", "Booking requests rejected, by reason (class_full, duplicate_email, schedule_conflict).", ("reason",)
+)
+LOCK_RETRIES = Counter("bookings_lock_retries_total", "Booking transactions retried after hitting a locked row or database.")
+CACHE_REQUESTS = Counter(
+    "bookings_cache_requests_total", "Cache lookups by cache and result (hit or miss), the hit rate is hit / total.",
+    ("cache", "result")
+)
+
+
+class QueryTimer:
+    """Database execute wrapper adding up the time spent in queries."""
+    def __init__(self):
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
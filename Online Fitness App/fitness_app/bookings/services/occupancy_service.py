@@ -0,0 +1,192 @@
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay, TruncDate
+from django.utils import timezone
+from bookings.models.archived_booking_model import ArchivedBooking
+from bookings.models.archived_fitness_class_model import ArchivedFitnessClass
+from bookings.models.booking_model import Booking
+from bookings.models.fitness_class_model import FitnessClass
+from bookings.models.occupancy_rollup_model import OccupancyRollup
+from bookings.services.shards import shard_databases
+
+# rollup columns each `group_by` option of get_occupancy() aggregates over
+GROUP_BY_FIELDS = {
+    "class_type": ("class_name",),
+    "instructor": ("instructor_id", "instructor__instructor_name"),
+    "weekday": ("weekday",),
+    "hour": ("hour",),
+}
+
+
+class OccupancyService:
+    """
+    Service layer for occupancy analytics.
+
+    Functionalities:
+        1. record_class_created() - adds a new class and its slots to its rollup bucket
+            Input: Fitness class
+           record_classes_created() - the same for many new classes, new rollup buckets are inserted in bulk
+            Input: Fitness classes
+        2. record_booking_change() - adds (or removes, with a negative delta) bookings from a class's rollup bucket
+            Input: Fitness class, delta
+           record_class_changed() - moves an edited class to its new rollup bucket, or applies its new capacity
+            Input: Fitness class as stored before the edit, edited fitness class
+        3. rebuild() - recomputes every rollup bucket from the class and booking tables (live in every studio database, and archived)
+            Output: Number of rollup buckets written
+        4. get_occupancy() - fill rates aggregated from the rollups
+            Input: start_date, end_date, class_type, group_by
+            Output: List of {group, classes, capacity, bookings, fill_rate} dicts
+    """
+
+    @staticmethod
+    def _bucket(fitness_class):
+        scheduled_at = timezone.localtime(fitness_class.scheduled_at)
+        return {
+            "date": scheduled_at.date(),
+            "hour": scheduled_at.hour,
+            "class_name": fitness_class.class_name,
+            "instructor_id": fitness_class.instructor_id,
+        }
+
+    @staticmethod
+    def _apply(fitness_class, **deltas):
+        bucket = OccupancyService._bucket(fitness_class)
+        changes = {field: F(field) + delta for field, delta in deltas.items()}
+        if OccupancyRollup.objects.filter(**bucket).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                OccupancyRollup.objects.create(weekday=bucket["date"].isoweekday(), **bucket, **deltas)
+        except IntegrityError:
+            # a concurrent request created the bucket first
+            OccupancyRollup.objects.filter(**bucket).update(**changes)
+
+    @staticmethod
+    def record_class_created(fitness_class):
+        OccupancyService._apply(fitness_class, classes_count=1, capacity=fitness_class.capacity)
+
+    @staticmethod
+    def record_classes_created(fitness_classes):
+        # bucket key -> [a class of the bucket, classes, capacity]
+        buckets = {}
+        for fitness_class in fitness_classes:
+            key = tuple(OccupancyService._bucket(fitness_class).values())
+            totals = buckets.setdefault(key, [fitness_class, 0, 0])
+            totals[1] += 1
+            totals[2] += fitness_class.capacity
+        if not buckets:
+            return
+
+        existing = set(OccupancyRollup.objects.filter(
+            date__in={date for date, _, _, _ in buckets},
+            instructor_id__in={instructor_id for _, _, _, instructor_id in buckets},
+        ).values_list("date", "hour", "class_name", "instructor_id"))
+        new = [key for key in buckets if key not in existing]
+        try:
+            with transaction.atomic():
+                OccupancyRollup.objects.bulk_create([
+                    OccupancyRollup(
+                        **OccupancyService._bucket(buckets[key][0]), weekday=key[0].isoweekday(),
+                        classes_count=buckets[key][1], capacity=buckets[key][2],
+                    )
+                    for key in new
+                ])
+        except IntegrityError:
+            # a concurrent request created one of the buckets first
+            existing.update(new)
+        for key in buckets.keys() & existing:
+            fitness_class, classes, capacity = buckets[key]
+            OccupancyService._apply(fitness_class, classes_count=classes, capacity=capacity)
+
+    @staticmethod
+    def record_booking_change(fitness_class, delta: int = 1):
+        OccupancyService._apply(fitness_class, bookings_count=delta)
+
+    @staticmethod
+    def record_class_changed(before, fitness_class):
+        old, new = OccupancyService._bucket(before), OccupancyService._bucket(fitness_class)
+        if old == new:
+            if before.capacity != fitness_class.capacity:
+                OccupancyService._apply(fitness_class, capacity=fitness_class.capacity - before.capacity)
+            return
+        # rescheduled, retyped or handed to another instructor
+        OccupancyRollup.objects.filter(**old).update(
+            classes_count=F("classes_count") - 1,
+            capacity=F("capacity") - before.capacity,
+            bookings_count=F("bookings_count") - before.booked_count,
+        )
+        OccupancyService._apply(
+            fitness_class, classes_count=1, capacity=fitness_class.capacity, bookings_count=fitness_class.booked_count
+        )
+
+    @staticmethod
+    def _aggregate(queryset, prefix=""):
+        return queryset.annotate(
+            date=TruncDate(f"{prefix}scheduled_at"),
+            hour=ExtractHour(f"{prefix}scheduled_at"),
+            weekday=ExtractIsoWeekDay(f"{prefix}scheduled_at"),
+            bucket_class_name=F(f"{prefix}class_name"),
+            bucket_instructor_id=F(f"{prefix}instructor_id"),
+        ).values("date", "hour", "weekday", "bucket_class_name", "bucket_instructor_id").order_by()
+
+    @staticmethod
+    def rebuild(batch_size: int = 1000):
+        buckets = {}
+
+        def bucket_for(row):
+            key = (row["date"], row["hour"], row["bucket_class_name"], row["bucket_instructor_id"])
+            if key not in buckets:
+                buckets[key] = OccupancyRollup(
+                    date=row["date"], weekday=row["weekday"], hour=row["hour"],
+                    class_name=row["bucket_class_name"], instructor_id=row["bucket_instructor_id"],
+                )
+            return buckets[key]
+
+        # live classes of every studio database, archived ones of "default"
+        sources = [
+            *((FitnessClass, Booking, database) for database in shard_databases()),
+            (ArchivedFitnessClass, ArchivedBooking, DEFAULT_DB_ALIAS),
+        ]
+        for class_model, booking_model, database in sources:
+            for row in OccupancyService._aggregate(class_model.objects.using(database)).annotate(
+                classes=Count("id"), total_capacity=Sum("capacity")
+            ):
+                rollup = bucket_for(row)
+                rollup.classes_count += row["classes"]
+                rollup.capacity += row["total_capacity"]
+            for row in OccupancyService._aggregate(booking_model.objects.using(database), "fitness_class__").annotate(
+                bookings=Count("id")
+            ):
+                rollup = bucket_for(row)
+                rollup.bookings_count += row["bookings"]
+
+        with transaction.atomic():
+            OccupancyRollup.objects.all().delete()
+            OccupancyRollup.objects.bulk_create(buckets.values(), batch_size=batch_size)
+        return len(buckets)
+
+    @staticmethod
+    def get_occupancy(start_date=None, end_date=None, class_type=None, group_by="class_type"):
+        rollups = OccupancyRollup.objects.all()
+        if start_date:
+            rollups = rollups.filter(date__gte=start_date)
+        if end_date:
+            rollups = rollups.filter(date__lte=end_date)
+        if class_type:
+            rollups = rollups.filter(class_name=class_type)
+
+        group_fields = GROUP_BY_FIELDS[group_by]
+        rows = rollups.values(*group_fields).annotate(
+            classes=Sum("classes_count"), total_capacity=Sum("capacity"), bookings=Sum("bookings_count")
+        ).order_by(*group_fields)
+
+        return [
+            {
+                **{field: row[field] for field in group_fields},
+                "classes": row["classes"],
+                "capacity": row["total_capacity"],
+                "bookings": row["bookings"],
+                "fill_rate": round(row["bookings"] / row["total_capacity"], 4) if row["total_capacity"] else 0.0,
+            }
+            for row in rows
+        ]
@@ -0,0 +1,143 @@
+import io
+import json
+import pstats
+import uuid
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from time import perf_counter
+from django.conf import settings
+from django.db import connections
+
+# profile of the request being handled, set by ProfilingMiddleware
+_current_profile = ContextVar("bookings_request_profile", default=None)
+
+# shared no-op context manager returned by phase() when the request is not profiled
+_NOT_PROFILED = nullcontext()
+
+
+def profiling_settings():
+    return {
+        "ENABLED": False,
+        "SAMPLE_RATE": 0.0,
+        "REPORT_DIR": Path(settings.BASE_DIR) / "profiles",
+        "EXPLAIN_LIMIT": 10,
+        "STATS_LIMIT": 40,
+        **getattr(settings, "BOOKINGS_PROFILING", {}),
+    }
+
+
+class RequestProfile:
+    """
+    Timings collected while profiling one request: named phases and every SQL query.
+
+    Functionalities:
+        1. record_query() - database execute wrapper timing each query
+        2. record_phase() - adds the duration of a named phase (validation, service, serialization, rendering)
+        3. save() - writes the report, with EXPLAIN plans and cProfile stats, to the report directory
+            Output: Report ID
+    """
+    def __init__(self):
+        self.phases = {}
+        self.queries = []
+
+    def record_query(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                "alias": context["connection"].alias,
+                "sql": sql,
+                "params": params if not many else None,
+                "ms": round((perf_counter() - started) * 1000, 3),
+            })
+
+    def record_phase(self, name, ms):
+        self.phases[name] = round(self.phases.get(name, 0) + ms, 3)
+
+    def explain_slowest(self, limit):
+        """Attach the database's plan to the slowest distinct SELECT queries."""
+        seen = set()
+        for query in sorted(self.queries, key=lambda query: query["ms"], reverse=True):
+            if len(seen) >= limit:
+                break
+            if query["sql"] in seen or query["params"] is None or not query["sql"].lstrip().upper().startswith("SELECT"):
+                continue
+            seen.add(query["sql"])
+            connection = connections[query["alias"]]
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(f"{connection.ops.explain_query_prefix()} {query['sql']}", query["params"])
+                    query["plan"] = [" ".join(str(column) for column in row) for row in cursor.fetchall()]
+            except Exception as error:
+                query["plan"] = [f"EXPLAIN failed: {error}"]
+
+    def save(self, request, response, profiler, total_ms):
+        config = profiling_settings()
+        self.explain_slowest(config["EXPLAIN_LIMIT"])
+        stats = io.StringIO()
+        pstats.Stats(profiler, stream=stats).sort_stats("cumulative").print_stats(config["STATS_LIMIT"])
+
+        report_id = uuid.uuid4().hex
+        report = {
+            "id": report_id,
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "total_ms": round(total_ms, 3),
+            "phases": self.phases,
+            "sql_ms": round(sum(query["ms"] for query in self.queries), 3),
+            "queries": [{**query, "params": [str(param) for param in query["params"] or []]} for query in self.queries],
+            "profile": stats.getvalue(),
+        }
+        report_dir = Path(config["REPORT_DIR"])
+        report_dir.mkdir(parents=True, exist_ok=True)
+        (report_dir / f"{report_id}.json").write_text(json.dumps(report, indent=2))
+        return report_id
+
+
+def load_report(report_id: str):
+    """Return a stored report, or None if no report has this ID."""
+    try:
+        report_id = uuid.UUID(report_id).hex
+    except ValueError:
+        return None
+    path = Path(profiling_settings()["REPORT_DIR"]) / f"{report_id}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+@contextmanager
+def profile_scope(profile):
+    """Make `profile` the active profile for the duration of the block."""
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+def current_profile():
+    return _current_profile.get()
+
+
+@contextmanager
+def _timed_phase(profile, name):
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        profile.record_phase(name, (perf_counter() - started) * 1000)
+
+
+def phase(name: str):
+    """
+    Time a block as a named phase of the current request's profile.
+    Costs a single context variable lookup when the request is not being profiled.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return _NOT_PROFILED
+    return _timed_phase(profile, name)
@@ -0,0 +1,13 @@
+def project(queryset, columns=None):
+    """
+    Restrict a queryset to the given ORM paths with only(),
+    joining just the relations those paths go through.
+    Returns the queryset unchanged when no columns are given.
+    """
+    if not columns:
+        return queryset
+    relations = {column.rsplit("__", 1)[0] for column in columns if "__" in column}
+    if relations:
+        # select_related() without arguments would follow every foreign key
+        queryset = queryset.select_related(*relations)
+    return queryset.only(*columns)
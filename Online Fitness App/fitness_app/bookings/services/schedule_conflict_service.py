@@ -0,0 +1,170 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from datetime import timedelta
+from bookings.models.booking_model import Booking
+from bookings.models.client_model import Client
+from bookings.models.fitness_class_model import FitnessClass, MAX_CLASS_DURATION_MINUTES
+from bookings.services.shards import shard_databases
+
+MAX_CLASS_DURATION = timedelta(minutes=MAX_CLASS_DURATION_MINUTES)
+
+
+class IntervalIndex:
+    """
+    In-memory set of half-open [start, end) intervals kept sorted by start.
+
+    Functionalities:
+        1. add() - inserts an interval, O(log n) search plus list insertion
+        2. overlapping() - keys of every stored interval overlapping [start, end),
+           O(log n + k) where k is the number of intervals starting within the longest interval's reach
+        3. find_overlaps() - every overlapping pair within a batch of intervals, O(n log n + pairs)
+    """
+    def __init__(self, intervals=()):
+        self._intervals = sorted(intervals, key=lambda interval: interval[0])
+        self._starts = [interval[0] for interval in self._intervals]
+        self._max_length = max((end - start for start, end, _ in self._intervals), default=None)
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def add(self, start, end, key):
+        position = bisect_right(self._starts, start)
+        self._starts.insert(position, start)
+        self._intervals.insert(position, (start, end, key))
+        if self._max_length is None or end - start > self._max_length:
+            self._max_length = end - start
+
+    def overlapping(self, start, end):
+        if not self._intervals:
+            return []
+        # only intervals starting after (start - longest interval) can still be running at `start`
+        low = bisect_right(self._starts, start - self._max_length)
+        high = bisect_left(self._starts, end)
+        return [key for other_start, other_end, key in self._intervals[low:high] if other_end > start]
+
+    @staticmethod
+    def find_overlaps(intervals):
+        """Return (key, key) pairs of overlapping intervals using a sweep over the intervals sorted by start."""
+        active = []
+        overlaps = []
+        for start, end, key in sorted(intervals, key=lambda interval: interval[0]):
+            # drop intervals that finished before this one starts, keeping `active` sorted by end
+            del active[:bisect_right(active, (start,), key=lambda interval: interval[:1])]
+            overlaps += [(other_key, key) for _, other_key in active]
+            insort(active, (end, key), key=lambda interval: interval[:1])
+        return overlaps
+
+
+class ScheduleConflictService:
+    """
+    Service layer for detecting overlapping classes.
+
+    Instructors and clients can be at any studio, so every check covers all studio databases.
+
+    Functionalities:
+        1. instructor_conflicts() - classes of an instructor overlapping a time range
+            Input: instructor_id, start, end, optional class id to ignore
+            Output: List of overlapping classes
+        2. client_conflicts() - bookings of a client overlapping a class
+            Input: client email, fitness class
+            Output: List of overlapping bookings
+        3. validate_instructor_schedule() - batch check of many new classes against each other and the database
+            Input: List of (key, instructor_id, start, end)
+            Output: {key: list of conflicting keys / class ids}
+        4. validate_client_schedule() - batch check of many new bookings against each other and the clients' bookings
+            Input: List of (key, client email, fitness class)
+            Output: {key: list of conflicting keys / booking ids}, booking the same class twice counts as a conflict
+    """
+
+    @staticmethod
+    def instructor_conflicts(instructor_id, start, end, exclude_class_id=None):
+        # range scan on the (instructor, scheduled_at) index, bounded by the longest possible class
+        candidates = FitnessClass.objects.filter(
+            instructor_id=instructor_id,
+            scheduled_at__lt=end,
+            scheduled_at__gt=start - MAX_CLASS_DURATION,
+        ).exclude(id=exclude_class_id)
+        return [
+            fitness_class
+            for database in shard_databases()
+            for fitness_class in candidates.using(database)
+            if fitness_class.ends_at > start
+        ]
+
+    @staticmethod
+    def client_conflicts(client_email, fitness_class):
+        # range scan on the (client, scheduled_at) booking index
+        candidates = Booking.objects.filter(
+            client__email_address=Client.normalize_email(client_email),
+            scheduled_at__lt=fitness_class.ends_at,
+            scheduled_at__gt=fitness_class.scheduled_at - MAX_CLASS_DURATION,
+        ).exclude(fitness_class_id=fitness_class.id).select_related('fitness_class')
+        return [
+            booking
+            for database in shard_databases()
+            for booking in candidates.using(database)
+            if booking.fitness_class.ends_at > fitness_class.scheduled_at
+        ]
+
+    @staticmethod
+    def validate_instructor_schedule(entries):
+        conflicts = defaultdict(list)
+        if not entries:
+            return conflicts
+
+        # one range query per studio database for every instructor and the whole span of the batch
+        existing = FitnessClass.objects.filter(
+            instructor_id__in={instructor_id for _, instructor_id, _, _ in entries},
+            scheduled_at__lt=max(end for _, _, _, end in entries),
+            scheduled_at__gt=min(start for _, _, start, _ in entries) - MAX_CLASS_DURATION,
+        ).only('id', 'instructor_id', 'scheduled_at', 'duration_minutes')
+        indexes = defaultdict(IntervalIndex)
+        for fitness_class in (row for database in shard_databases() for row in existing.using(database)):
+            indexes[fitness_class.instructor_id].add(fitness_class.scheduled_at, fitness_class.ends_at, fitness_class.id)
+
+        batches = defaultdict(list)
+        for key, instructor_id, start, end in entries:
+            conflicts[key] += indexes[instructor_id].overlapping(start, end)
+            batches[instructor_id].append((start, end, key))
+
+        for intervals in batches.values():
+            for first, second in IntervalIndex.find_overlaps(intervals):
+                conflicts[first].append(second)
+                conflicts[second].append(first)
+        return {key: found for key, found in conflicts.items() if found}
+
+    @staticmethod
+    def validate_client_schedule(entries):
+        conflicts = defaultdict(list)
+        if not entries:
+            return conflicts
+        entries = [(key, Client.normalize_email(email), fitness_class) for key, email, fitness_class in entries]
+
+        # one range query per studio database on the (client, scheduled_at) booking index
+        # for every client and the whole span of the batch
+        existing = Booking.objects.filter(
+            client__email_address__in={email for _, email, _ in entries},
+            scheduled_at__lt=max(fitness_class.ends_at for _, _, fitness_class in entries),
+            scheduled_at__gt=min(fitness_class.scheduled_at for _, _, fitness_class in entries) - MAX_CLASS_DURATION,
+        ).values_list('id', 'client__email_address', 'fitness_class_id', 'scheduled_at', 'fitness_class__duration_minutes')
+        indexes = defaultdict(IntervalIndex)
+        for booking_id, email, class_id, scheduled_at, duration_minutes in (
+            row for database in shard_databases() for row in existing.using(database)
+        ):
+            indexes[email].add(scheduled_at, scheduled_at + timedelta(minutes=duration_minutes), (booking_id, class_id))
+
+        batches = defaultdict(list)
+        for key, email, fitness_class in entries:
+            conflicts[key] += [
+                booking_id
+                for booking_id, class_id in indexes[email].overlapping(fitness_class.scheduled_at, fitness_class.ends_at)
+                # an existing booking of the same class is a duplicate, not an overlap
+                if class_id != fitness_class.id
+            ]
+            batches[email].append((fitness_class.scheduled_at, fitness_class.ends_at, key))
+
+        for intervals in batches.values():
+            for first, second in IntervalIndex.find_overlaps(intervals):
+                conflicts[first].append(second)
+                conflicts[second].append(first)
+        return {key: found for key, found in conflicts.items() if found}
@@ -0,0 +1,108 @@
+import heapq
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# every database alias holding classes hands out class and booking IDs from its own range of this size,
+# alias number n from n * SHARD_ID_SPAN on, so an ID alone tells which alias holds the row
+SHARD_ID_SPAN = 10 ** 12
+
+# models whose rows live in the database alias of their studio
+SHARDED_MODELS = ("fitnessclass", "booking")
+# models whose rows are kept in "default" and copied, with the same IDs, into the aliases referencing them
+REPLICATED_MODELS = ("client", "instructor")
+
+
+def shard_numbers():
+    """Return {database alias: number} of every alias holding classes."""
+    return getattr(settings, "BOOKINGS_SHARD_NUMBERS", {DEFAULT_DB_ALIAS: 0})
+
+
+def shard_databases():
+    """Return the aliases holding classes, in the order of their numbers."""
+    numbers = shard_numbers()
+    return sorted(numbers, key=numbers.get)
+
+
+def studio_database(studio: str) -> str:
+    """Return the alias holding the classes and bookings of a studio."""
+    return getattr(settings, "BOOKINGS_STUDIO_DATABASES", {}).get(studio, DEFAULT_DB_ALIAS)
+
+
+def database_for_id(object_id: int) -> str:
+    """Return the alias holding the class or booking with the given ID."""
+    number = object_id // SHARD_ID_SPAN
+    for database, shard_number in shard_numbers().items():
+        if shard_number == number:
+            return database
+    return DEFAULT_DB_ALIAS
+
+
+def is_sharded(model) -> bool:
+    return model._meta.app_label == "bookings" and model._meta.model_name in SHARDED_MODELS
+
+
+def group_by_database(ids):
+    """Return {alias: [ids]} of class or booking IDs, keeping their order."""
+    groups = {}
+    for object_id in ids:
+        groups.setdefault(database_for_id(object_id), []).append(object_id)
+    return groups
+
+
+def merge_sorted(results, key):
+    """Merge per-alias results, each already sorted by `key`, into one sorted list."""
+    results = list(results)
+    if len(results) == 1:
+        return list(results[0])
+    return list(heapq.merge(*results, key=key))
+
+
+def replicate(instances, using: str):
+    """
+    Copy (or refresh) clients or instructors of "default" into another alias under the same IDs,
+    so the classes and bookings stored there can reference and join them.
+    """
+    if using == DEFAULT_DB_ALIAS:
+        return
+    by_model = {}
+    for instance in instances:
+        by_model.setdefault(type(instance), {})[instance.pk] = instance
+    for model, rows in by_model.items():
+        fields = [field.attname for field in model._meta.concrete_fields]
+        model.objects.using(using).bulk_create(
+            # fresh instances, bulk_create would move the given ones to the other alias
+            [model(**{field: getattr(instance, field) for field in fields}) for instance in rows.values()],
+            update_conflicts=True,
+            unique_fields=[model._meta.pk.name],
+            update_fields=[field for field in fields if field != model._meta.pk.attname],
+        )
+
+
+def reserve_id_range(using: str, models):
+    """Move the ID sequences of the given models on an alias to the start of the alias's range."""
+    start = shard_numbers().get(using, 0) * SHARD_ID_SPAN
+    if not start:
+        return
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        for model in models:
+            table = model._meta.db_table
+            if connection.vendor == "sqlite":
+                # the next AUTOINCREMENT ID is one past the sequence's value
+                cursor.execute("UPDATE sqlite_sequence SET seq = %s WHERE name = %s AND seq < %s", [start, table, start])
+                cursor.execute(
+                    "INSERT INTO sqlite_sequence (name, seq) SELECT %s, %s "
+                    "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = %s)",
+                    [table, start, table],
+                )
+            elif connection.vendor == "postgresql":
+                cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+                sequence = cursor.fetchone()[0]
+                cursor.execute(f"SELECT last_value FROM {sequence}")
+                if cursor.fetchone()[0] < start:
+                    cursor.execute("SELECT setval(%s, %s)", [sequence, start])
+            else:
+                raise ImproperlyConfigured(
+                    f"Class and booking ID ranges can only be reserved on SQLite and PostgreSQL, not {connection.vendor}."
+                )
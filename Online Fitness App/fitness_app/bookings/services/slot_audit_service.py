@@ -0,0 +1,66 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from itertools import chain
+from bookings.models.booking_model import Booking
+from bookings.models.fitness_class_model import FitnessClass
+from bookings.services.availability_broadcaster import get_broadcaster
+from bookings.services.listing_cache import ListingCache
+from bookings.services.shards import group_by_database, shard_databases
+
+
+class SlotAuditService:
+    """
+    Service layer reconciling the booked count of every class with its actual `Booking` rows.
+
+    Functionalities:
+        1. find_mismatches() - every class whose booked_count differs from its number of bookings,
+           found with one grouped aggregate query per studio database
+            Output: Iterator of (class_id, booked_count, bookings, capacity)
+        2. repair() - recounts the bookings of the given classes in batches, each in a short transaction
+           holding the class rows locked, so bookings made meanwhile are neither lost nor counted twice
+            Input: class IDs, batch size
+            Output: Number of classes updated
+    """
+
+    @staticmethod
+    def find_mismatches():
+        mismatches = FitnessClass.objects.values('id', 'booked_count', 'capacity').annotate(
+            bookings_total=Count('bookings')
+        ).exclude(
+            booked_count=F('bookings_total')
+        ).order_by('id').values_list('id', 'booked_count', 'bookings_total', 'capacity')
+        return chain.from_iterable(mismatches.using(database).iterator() for database in shard_databases())
+
+    @staticmethod
+    def repair(class_ids, batch_size: int = 500):
+        bookings_total = Coalesce(
+            Subquery(
+                Booking.objects.filter(fitness_class_id=OuterRef('pk')).order_by().values('fitness_class_id')
+                .annotate(total=Count('id')).values('total')
+            ),
+            Value(0),
+        )
+        repaired = 0
+        batches = (
+            (database, ids[start:start + batch_size])
+            for database, ids in group_by_database(class_ids).items()
+            for start in range(0, len(ids), batch_size)
+        )
+        for database, batch in batches:
+            classes = FitnessClass.objects.using(database)
+            with transaction.atomic(using=database):
+                # bookings lock their class row too, so the count cannot change until this batch commits
+                locked = list(
+                    classes.select_for_update().filter(id__in=batch).order_by('id').values_list('id', flat=True)
+                )
+                repaired += classes.filter(id__in=locked).update(booked_count=bookings_total)
+                seats = list(classes.filter(id__in=locked).only('id', 'capacity', 'booked_count'))
+
+            for fitness_class in seats:
+                get_broadcaster().publish(fitness_class.id, fitness_class.available_slots)
+
+        if repaired:
+            # update() sends no signals, invalidate the cached class listings here
+            ListingCache.bump_version()
+        return repaired
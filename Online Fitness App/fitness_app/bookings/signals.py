@@ -0,0 +1,117 @@
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+from bookings.models.booking_model import Booking
+from bookings.models.client_model import Client
+from bookings.models.fitness_class_model import FitnessClass
+from bookings.models.instructor_model import Instructor
+from bookings.services.availability_index import AvailabilityIndex
+from bookings.services.instructor_cache import InstructorCache
+from bookings.services.listing_cache import ListingCache
+from bookings.services.occupancy_service import OccupancyService
+from bookings.services.shards import reserve_id_range, shard_databases
+
+
+@receiver(post_save, sender=FitnessClass)
+@receiver(post_delete, sender=FitnessClass)
+def invalidate_class_listing(sender, **kwargs):
+    """A class was created, edited or had its seats changed, so cached listings are stale."""
+    ListingCache.bump_version()
+
+
+@receiver(post_save, sender=FitnessClass)
+def reschedule_bookings(sender, instance, created, using, update_fields=None, **kwargs):
+    """A class may have been rescheduled, move the class time copied into its bookings along."""
+    if created or (update_fields and "scheduled_at" not in update_fields):
+        return
+    bookings = Booking.objects.using(using).filter(fitness_class=instance).exclude(scheduled_at=instance.scheduled_at)
+    client_ids = list(bookings.values_list("client_id", flat=True))
+    if not client_ids:
+        return
+    bookings.update(scheduled_at=instance.scheduled_at)
+    # their histories and calendar feeds changed
+    Client.objects.filter(id__in=client_ids).update(bookings_version=F("bookings_version") + 1)
+
+
+# the fields of a class deciding its occupancy rollup bucket and what it adds to it
+OCCUPANCY_FIELDS = ("scheduled_at", "class_name", "instructor_id", "capacity", "booked_count")
+
+
+@receiver(pre_save, sender=FitnessClass)
+def remember_occupancy(sender, instance, using, update_fields=None, **kwargs):
+    """A class is about to be edited, keep what its occupancy rollup bucket holds of it."""
+    instance._occupancy_before = None
+    if instance._state.adding or (update_fields and set(update_fields) <= {"booked_count", "updated_on"}):
+        # new classes and seat changes are recorded by the services making them
+        return
+    stored = sender.objects.using(using).filter(pk=instance.pk).values(*OCCUPANCY_FIELDS).first()
+    if stored is not None:
+        instance._occupancy_before = FitnessClass(**stored)
+
+
+@receiver(post_save, sender=FitnessClass)
+def move_occupancy(sender, instance, created, **kwargs):
+    """A class was edited, move it to its new occupancy rollup bucket or apply its new capacity."""
+    before = getattr(instance, "_occupancy_before", None)
+    if created or before is None:
+        return
+    instance._occupancy_before = None
+    OccupancyService.record_class_changed(before, instance)
+
+
+@receiver(post_save, sender=FitnessClass)
+def reindex_class(sender, instance, using, update_fields=None, **kwargs):
+    """A class was created or edited, refresh it in this process's search index once committed."""
+    if update_fields and set(update_fields) <= {"booked_count", "updated_on"}:
+        # seat changes reach the index of every worker through the availability broadcaster
+        return
+    transaction.on_commit(lambda: AvailabilityIndex.refresh(instance), using=using)
+
+
+@receiver(post_delete, sender=FitnessClass)
+def unindex_class(sender, instance, using, **kwargs):
+    """A class was deleted, drop it from this process's search index once committed."""
+    class_id = instance.id
+    transaction.on_commit(lambda: AvailabilityIndex.remove(class_id), using=using)
+
+
+@receiver(post_save, sender=Instructor)
+@receiver(post_delete, sender=Instructor)
+def invalidate_instructor_cache(sender, **kwargs):
+    """An instructor was created, renamed or removed, so every worker's cached instructors are stale."""
+    InstructorCache.invalidate()
+    # again once committed, in case the old row was read back into a cache meanwhile
+    transaction.on_commit(InstructorCache.invalidate)
+    # listings embed the instructor name
+    ListingCache.bump_version()
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_save, sender=Instructor)
+def update_replicas(sender, instance, created, using, **kwargs):
+    """A client or instructor of "default" changed, refresh its copies in the other studio databases."""
+    if created or using != DEFAULT_DB_ALIAS:
+        return
+    fields = {field.attname: getattr(instance, field.attname) for field in sender._meta.concrete_fields}
+    for database in shard_databases():
+        if database != DEFAULT_DB_ALIAS:
+            sender.objects.using(database).filter(pk=instance.pk).update(**fields)
+
+
+@receiver(post_delete, sender=Client)
+@receiver(post_delete, sender=Instructor)
+def delete_replicas(sender, instance, using, **kwargs):
+    """A client or instructor of "default" was deleted, so are its copies with their classes or bookings."""
+    if using != DEFAULT_DB_ALIAS:
+        return
+    for database in shard_databases():
+        if database != DEFAULT_DB_ALIAS:
+            sender.objects.using(database).filter(pk=instance.pk).delete()
+
+
+@receiver(post_migrate)
+def reserve_shard_id_range(sender, using, **kwargs):
+    """Start the class and booking IDs of a studio database at the beginning of its range."""
+    if sender.name == "bookings" and using in shard_databases():
+        reserve_id_range(using, (FitnessClass, Booking))
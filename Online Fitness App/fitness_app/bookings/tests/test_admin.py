@@ -0,0 +1,86 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from bookings.models import Booking, Client, FitnessClass, Instructor
+from django.utils.timezone import now, timedelta
+
+
+class AdminChangelistQueryTests(TestCase):
+    # Initial setup
+    def setUp(self):
+        admin_user = User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(admin_user)
+
+    def add_rows(self, start, count):
+        for i in range(start, start + count):
+            instructor = Instructor.objects.create(instructor_name=f"Instructor{i}")
+            customer = Client.objects.create(
+                first_name="John", last_name=f"Doe{i}", email_address=f"john{i}@example.com", phone_number="9999999999"
+            )
+            fitness_class = FitnessClass.objects.create(
+                class_name="YOGA",
+                instructor=instructor,
+                available_slots=10,
+                scheduled_at=now() + timedelta(days=i + 1)
+            )
+            Booking.objects.create(client=customer, fitness_class=fitness_class)
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    # Test that the number of queries per changelist does not grow with the number of rows
+    def test_changelist_query_count_is_constant(self):
+        urls = [
+            "/admin/bookings/booking/",
+            "/admin/bookings/fitnessclass/",
+            "/admin/bookings/client/",
+            "/admin/bookings/instructor/",
+        ]
+        self.add_rows(0, 2)
+        small = [self.changelist_queries(url) for url in urls]
+        self.add_rows(2, 20)
+        large = [self.changelist_queries(url) for url in urls]
+        self.assertEqual(small, large)
+
+    # Test that the booking changelist loads its rows with the related objects in a single query
+    def test_booking_changelist_query_count(self):
+        self.add_rows(0, 10)
+        # session, user, paginator count, page of bookings joined with client, class and instructor
+        with self.assertNumQueries(4):
+            response = self.client.get("/admin/bookings/booking/")
+        self.assertContains(response, "John | Doe9")
+        self.assertContains(response, "YOGA by Instructor9")
+
+    # Test that searches ignore case, match names by prefix per word and look emails up exactly
+    def test_search_ignores_case(self):
+        self.add_rows(0, 12)
+        Client.objects.create(
+            first_name="Ronald", last_name="McDonald", email_address="ronald@example.com", phone_number="9999999999"
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/admin/bookings/client/", {"q": " JOHN3@Example.com "})
+        self.assertContains(response, "john3@example.com")
+        self.assertNotContains(response, "john11@example.com")
+        # the email is normalized and compared as stored, which its unique index answers
+        self.assertTrue([query for query in queries if '"email_address" = ' in query["sql"]])
+
+        for url, term, found in (
+            ("/admin/bookings/client/", "DOE1", 3),
+            ("/admin/bookings/client/", "mcdonald", 1),
+            ("/admin/bookings/fitnessclass/", "yoga", 12),
+            ("/admin/bookings/fitnessclass/", "Yoga INSTRUCTOR11", 1),
+            ("/admin/bookings/instructor/", "instructor11", 1),
+            ("/admin/bookings/booking/", "John5@example.com", 1),
+        ):
+            response = self.client.get(url, {"q": term})
+            self.assertEqual(response.context["cl"].result_count, found, term)
+
+        # the class autocomplete finds classes by each word of the term
+        response = self.client.get("/admin/autocomplete/", {
+            "app_label": "bookings", "model_name": "booking", "field_name": "fitness_class", "term": "yoga instructor3",
+        })
+        self.assertEqual(len(response.json()["results"]), 1)
@@ -0,0 +1,61 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+from bookings.models import ArchivedBooking, ArchivedFitnessClass, Booking, Client, FitnessClass, Instructor
+from django.utils.timezone import now, timedelta
+
+
+class ArchiveUnitTests(TestCase):
+    # Initial setup
+    def setUp(self):
+        self.client = APIClient()
+        self.instructor = Instructor.objects.create(instructor_name="Alice")
+        self.customer = Client.objects.create(
+            first_name="John", last_name="Doe", email_address="john@example.com", phone_number="9999999999"
+        )
+        self.old_class = FitnessClass.objects.create(
+            class_name="YOGA",
+            instructor=self.instructor,
+            available_slots=4,
+            scheduled_at=now() - timedelta(days=200)
+        )
+        self.new_class = FitnessClass.objects.create(
+            class_name="HIIT",
+            instructor=self.instructor,
+            available_slots=4,
+            scheduled_at=now() + timedelta(days=1)
+        )
+        self.old_booking = Booking.objects.create(client=self.customer, fitness_class=self.old_class)
+        Booking.objects.create(client=self.customer, fitness_class=self.new_class)
+
+    # Test that only classes past the retention window are moved, with their bookings
+    def test_archive_command_moves_old_classes(self):
+        call_command("archive_classes", "--retention-days=90", "--batch-size=1", stdout=StringIO())
+
+        self.assertFalse(FitnessClass.objects.filter(id=self.old_class.id).exists())
+        self.assertTrue(FitnessClass.objects.filter(id=self.new_class.id).exists())
+        self.assertEqual(Booking.objects.count(), 1)
+        archived_class = ArchivedFitnessClass.objects.get(id=self.old_class.id)
+        self.assertEqual(archived_class.scheduled_at, self.old_class.scheduled_at)
+        self.assertEqual(ArchivedBooking.objects.get().id, self.old_booking.id)
+        # the archived booking leaves the client's calendar feed
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.bookings_version, 1)
+
+    # Test that archived history is returned only when asked for
+    def test_get_bookings_include_archived(self):
+        call_command("archive_classes", "--retention-days=90", stdout=StringIO())
+
+        response = self.client.get("/api/bookings/get-all-bookings/?email_address=john@example.com")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 1)
+
+        response = self.client.get(
+            "/api/bookings/get-all-bookings/?email_address=john@example.com&include_archived=true"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [booking["fitness_class_name"] for booking in response.data["data"]], ["YOGA", "HIIT"]
+        )
@@ -0,0 +1,102 @@
+import asyncio
+from unittest import mock
+from django.test import AsyncClient, Client, TestCase
+from rest_framework.test import APIClient
+from bookings.models.instructor_model import Instructor
+from bookings.models.fitness_class_model import FitnessClass
+from bookings.services.availability_broadcaster import AvailabilityBroadcaster, LocalBackend, get_broadcaster
+from django.utils.timezone import now, timedelta
+
+
+class AvailabilityBroadcasterUnitTests(TestCase):
+    # Test that a slow consumer only receives the latest seat count per class
+    def test_updates_are_coalesced_per_class(self):
+        broadcaster = AvailabilityBroadcaster(backend=LocalBackend())
+
+        async def consume():
+            subscription = broadcaster.subscribe()
+            broadcaster.publish(1, 5)
+            broadcaster.publish(1, 4)
+            broadcaster.publish(2, 9)
+            broadcaster.publish(1, 3)
+            events = await subscription.next_batch(timeout=1)
+            broadcaster.unsubscribe(subscription)
+            return events
+
+        events = asyncio.run(consume())
+        self.assertEqual(
+            sorted(events, key=lambda event: event["class_id"]),
+            [{"class_id": 1, "available_slots": 3}, {"class_id": 2, "available_slots": 9}]
+        )
+
+    # Test that an idle subscription times out with no events
+    def test_idle_subscription_returns_empty_batch(self):
+        broadcaster = AvailabilityBroadcaster(backend=LocalBackend())
+
+        async def consume():
+            subscription = broadcaster.subscribe()
+            return await subscription.next_batch(timeout=0.01)
+
+        self.assertEqual(asyncio.run(consume()), [])
+
+    # Test that creating a booking publishes the new seat count
+    def test_create_booking_publishes_seat_count(self):
+        instructor = Instructor.objects.create(instructor_name="Alice")
+        fclass = FitnessClass.objects.create(
+            class_name="YOGA",
+            instructor=instructor,
+            available_slots=2,
+            scheduled_at=now() + timedelta(days=1)
+        )
+        payload = {
+            "class_id": fclass.id,
+            "first_name": "John",
+            "last_name": "Doe",
+            "email_address": "john@example.com"
+        }
+        with mock.patch("bookings.services.booking_service.get_broadcaster") as broadcaster:
+            APIClient().post("/api/bookings/create-booking/", payload, format="json")
+        broadcaster.return_value.publish.assert_called_once_with(fclass.id, 1)
+
+
+class AvailabilityStreamViewUnitTests(TestCase):
+    # Test the stream opens with a snapshot, ends after its lifetime and releases its subscription
+    async def test_stream_sends_snapshot_and_ends(self):
+        instructor = await Instructor.objects.acreate(instructor_name="Alice")
+        fclass = await FitnessClass.objects.acreate(
+            class_name="YOGA",
+            instructor=instructor,
+            available_slots=3,
+            scheduled_at=now() + timedelta(days=1)
+        )
+        broadcaster = get_broadcaster()
+        with mock.patch("bookings.views.STREAM_MAX_SECONDS", 0.05):
+            response = await AsyncClient().get("/api/classes/availability-stream/")
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+            chunks = [chunk async for chunk in response.streaming_content]
+
+        self.assertTrue(chunks[0].startswith(b"retry: "))
+        self.assertIn(f'event: snapshot\ndata: [{{"class_id": {fclass.id}, "available_slots": 3}}]'.encode(), chunks[0])
+        self.assertEqual(broadcaster._subscriptions, set())
+
+    # Test that under WSGI the stream is a plain iterator that sends each event as it comes
+    def test_stream_is_synchronous_under_wsgi(self):
+        instructor = Instructor.objects.create(instructor_name="Alice")
+        fclass = FitnessClass.objects.create(
+            class_name="YOGA",
+            instructor=instructor,
+            available_slots=3,
+            scheduled_at=now() + timedelta(days=1)
+        )
+        broadcaster = get_broadcaster()
+        with mock.patch("bookings.views.STREAM_MAX_SECONDS", 5):
+            response = Client().get("/api/classes/availability-stream/")
+            self.assertFalse(response.is_async)
+            chunks = iter(response.streaming_content)
+            self.assertIn(b"event: snapshot", next(chunks))
+            broadcaster.publish(fclass.id, 2)
+            self.assertEqual(
+                next(chunks), f'event: availability\ndata: [{{"class_id": {fclass.id}, "available_slots": 2}}]\n\n'.encode()
+            )
+            response.close()
+        self.assertEqual(broadcaster._subscriptions, set())
@@ -0,0 +1,89 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+from bookings.models import Booking, Client, FitnessClass, Instructor
+from bookings.services.booking_service import BookingService
+from django.utils.timezone import now, timedelta
+
+
+class BookingHistoryUnitTests(TestCase):
+    # Initial setup
+    def setUp(self):
+        self.client = APIClient()
+        instructor = Instructor.objects.create(instructor_name="Alice")
+        self.customer = Client.objects.create(
+            first_name="Alice", last_name="Example", email_address="Alice@Example.com", phone_number="9999999999"
+        )
+        # two past and three upcoming classes
+        for days in (-2, -1, 1, 2, 3):
+            fitness_class = FitnessClass.objects.create(
+                class_name="YOGA",
+                instructor=instructor,
+                available_slots=10,
+                scheduled_at=now() + timedelta(days=days)
+            )
+            Booking.objects.create(client=self.customer, fitness_class=fitness_class)
+
+    # Test that emails are matched case-insensitively
+    def test_lookup_is_case_insensitive(self):
+        self.assertEqual(self.customer.email_address, "alice@example.com")
+        response = self.client.get("/api/bookings/get-all-bookings/?email_address=ALICE@example.COM")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]), 5)
+
+    # Test that a client without live bookings gets an empty list and only an unknown email is rejected
+    def test_client_without_bookings(self):
+        Booking.objects.filter(client=self.customer).delete()
+        response = self.client.get("/api/bookings/get-all-bookings/?email_address=alice@example.com")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"], [])
+
+        response = self.client.get("/api/bookings/get-all-bookings/?email_address=bob@example.com&when=upcoming")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Test that a page is fetched with a single joined query
+    def test_page_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            bookings, next_cursor = BookingService.get_all_bookings("alice@example.com", limit=10)
+            [(booking.client.first_name, booking.fitness_class.instructor.instructor_name) for booking in bookings]
+        self.assertIsNone(next_cursor)
+
+    # Test walking the history with keyset cursors
+    def test_keyset_pagination(self):
+        seen = []
+        url = "/api/bookings/get-all-bookings/?email_address=alice@example.com&limit=2"
+        next_cursor = None
+        while True:
+            response = self.client.get(url + (f"&cursor={next_cursor}" if next_cursor else ""))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [booking["scheduled_at"] for booking in response.data["data"]]
+            next_cursor = response.data["next_cursor"]
+            if not next_cursor:
+                break
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen, sorted(seen))
+
+        response = self.client.get(url + "&cursor=not-a-cursor")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Test the upcoming and past filters
+    def test_upcoming_and_past_filters(self):
+        upcoming, _ = BookingService.get_all_bookings("alice@example.com", when="upcoming")
+        past, _ = BookingService.get_all_bookings("alice@example.com", when="past")
+        self.assertEqual((len(upcoming), len(past)), (3, 2))
+
+    # Test that rescheduling a class moves its bookings in the history and bumps the client's version
+    def test_rescheduled_class_moves_bookings(self):
+        fitness_class = FitnessClass.objects.order_by("scheduled_at")[2]
+        fitness_class.scheduled_at = now() + timedelta(days=5)
+        fitness_class.save()
+
+        self.assertEqual(Booking.objects.get(fitness_class=fitness_class).scheduled_at, fitness_class.scheduled_at)
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.bookings_version, 1)
+        bookings, _ = BookingService.get_all_bookings("alice@example.com", when="upcoming", limit=10)
+        self.assertEqual([booking.fitness_class_id for booking in bookings][-1], fitness_class.id)
+
+        # saving the seat count alone does not touch the bookings
+        with self.assertNumQueries(1):
+            fitness_class.save(update_fields=["booked_count"])
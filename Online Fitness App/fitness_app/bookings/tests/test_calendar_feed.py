@@ -0,0 +1,98 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+from bookings.models import Booking, Client, FitnessClass, Instructor
+from django.utils.timezone import now, timedelta
+
+FEED_URL = "/api/bookings/calendar.ics?email_address=John@Example.com"
+
+
+class CalendarFeedUnitTests(TestCase):
+    # Initial setup
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        instructor = Instructor.objects.create(instructor_name="Alice")
+        self.customer = Client.objects.create(
+            first_name="John", last_name="Doe", email_address="john@example.com", phone_number="9999999999"
+        )
+        self.yoga = FitnessClass.objects.create(
+            class_name="YOGA",
+            instructor=instructor,
+            available_slots=5,
+            scheduled_at=now() + timedelta(days=1),
+            duration_minutes=45
+        )
+        self.zumba = FitnessClass.objects.create(
+            class_name="ZUMBA",
+            instructor=instructor,
+            available_slots=5,
+            scheduled_at=now() + timedelta(days=2)
+        )
+        self.client.post("/api/bookings/create-booking/", {
+            "class_id": self.yoga.id, "first_name": "John", "last_name": "Doe", "email_address": "john@example.com"
+        }, format="json")
+
+    def feed(self, **headers):
+        response = self.client.get(FEED_URL, **headers)
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        return response, body.decode()
+
+    # Test the feed has one event per booking and is generated as a stream once, then served from cache
+    def test_feed_content(self):
+        response, body = self.feed()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/calendar"))
+        self.assertTrue(response.streaming)
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n") and body.endswith("END:VCALENDAR\r\n"))
+        self.assertEqual(body.count("BEGIN:VEVENT"), 1)
+        self.assertIn("SUMMARY:YOGA with Alice\r\n", body)
+        start = self.yoga.scheduled_at
+        self.assertIn(f"DTEND:{(start + timedelta(minutes=45)).strftime('%Y%m%dT%H%M%SZ')}\r\n", body)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in body.split("\r\n")))
+
+        cached, cached_body = self.feed()
+        self.assertFalse(cached.streaming)
+        self.assertEqual(cached_body, body)
+        self.assertEqual(cached["ETag"], response["ETag"])
+
+    # Test polling with the current ETag costs a single query and returns 304
+    def test_feed_not_modified(self):
+        etag = self.feed()[0]["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(FEED_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    # Test the ETag changes when the client's bookings change, and only then
+    def test_feed_etag_changes_with_bookings(self):
+        etag = self.feed()[0]["ETag"]
+        Client.objects.create(first_name="Jane", last_name="Doe", email_address="jane@example.com", phone_number="1")
+        self.client.post("/api/bookings/create-booking/", {
+            "class_id": self.zumba.id, "first_name": "Jane", "last_name": "Doe", "email_address": "jane@example.com"
+        }, format="json")
+        self.assertEqual(self.feed()[0]["ETag"], etag)
+
+        self.client.post("/api/bookings/create-booking/", {
+            "class_id": self.zumba.id, "first_name": "John", "last_name": "Doe", "email_address": "john@example.com"
+        }, format="json")
+        response, body = self.feed(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(body.count("BEGIN:VEVENT"), 2)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        booking = Booking.objects.get(client=self.customer, fitness_class=self.zumba)
+        self.client.delete("/api/bookings/cancel-booking/", {
+            "booking_id": booking.id, "email_address": "john@example.com"
+        }, format="json")
+        response, body = self.feed(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(body.count("BEGIN:VEVENT"), 1)
+        self.assertNotEqual(response["ETag"], etag)
+
+    # Test the feed of a missing or unknown client
+    def test_feed_unknown_client(self):
+        self.assertEqual(self.client.get("/api/bookings/calendar.ics").status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get("/api/bookings/calendar.ics?email_address=nobody@example.com")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
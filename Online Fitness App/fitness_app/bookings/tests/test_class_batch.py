@@ -0,0 +1,69 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from bookings.models import FitnessClass, Instructor
+from bookings.services.identity_map import identity_map_scope, load
+from bookings.services.instructor_cache import InstructorCache
+from django.utils.timezone import now, timedelta
+
+
+class FitnessClassBatchUnitTests(TestCase):
+    # Initial setup
+    def setUp(self):
+        self.client = APIClient()
+        self.instructor = Instructor.objects.create(instructor_name="Alice")
+        self.classes = [
+            FitnessClass.objects.create(
+                class_name="YOGA",
+                instructor=self.instructor,
+                available_slots=5,
+                scheduled_at=now() + timedelta(days=i + 1)
+            )
+            for i in range(30)
+        ]
+
+    # Test GET /classes/get-classes-by-ids in the requested order with a single query, instructors come from the cache
+    def test_get_classes_by_ids(self):
+        InstructorCache.get(self.instructor.id)
+        ids = [fitness_class.id for fitness_class in reversed(self.classes)] + [999999]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f"/api/classes/get-classes-by-ids/?ids={','.join(map(str, ids))}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual([fitness_class["id"] for fitness_class in response.data["data"]], ids[:-1])
+        self.assertEqual(response.data["data"][0]["instructor"]["instructor_name"], "Alice")
+        self.assertEqual(response.data["not_found"], [999999])
+
+        response = self.client.get("/api/classes/get-classes-by-ids/?ids=1,abc")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Test that objects are loaded once per identity map scope
+    def test_identity_map_reuses_instances(self):
+        with identity_map_scope():
+            with self.assertNumQueries(1):
+                first = load(FitnessClass, self.classes[0].id, select_related=('instructor',))
+                second = load(FitnessClass, self.classes[0].id)
+                instructor = load(Instructor, self.instructor.id)
+        self.assertIs(first, second)
+        self.assertIs(first.instructor, instructor)
+
+    # Test that booking a class takes the instructor from the instructor cache
+    def test_create_booking_does_not_refetch_instructor(self):
+        InstructorCache.get(self.instructor.id)
+        payload = {
+            "class_id": self.classes[0].id,
+            "first_name": "John",
+            "last_name": "Doe",
+            "email_address": "john@example.com"
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/api/bookings/create-booking/", payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        instructor_reads = [
+            query for query in queries
+            if query["sql"].startswith("SELECT") and 'FROM "bookings_instructor"' in query["sql"]
+        ]
+        self.assertEqual(len(instructor_reads), 0)
+        self.assertEqual(response.data["data"]["instructor_name"], "Alice")
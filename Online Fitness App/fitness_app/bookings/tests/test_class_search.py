@@ -0,0 +1,114 @@
+from unittest import mock
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+from bookings.models import FitnessClass, Instructor
+from bookings.services.availability_broadcaster import LocalBackend
+from bookings.services.availability_index import AvailabilityIndex
+from bookings.services.instructor_cache import InstructorCache
+from django.utils.timezone import now, timedelta
+
+
+class ClassSearchUnitTests(TestCase):
+    # Initial setup
+    def setUp(self):
+        AvailabilityIndex.invalidate()
+        self.client = APIClient()
+        self.alice = Instructor.objects.create(instructor_name="Alice")
+        self.bob = Instructor.objects.create(instructor_name="Bob")
+        self.evening = (now() + timedelta(days=1)).replace(hour=18, minute=0, second=0, microsecond=0)
+        self.classes = [
+            FitnessClass.objects.create(class_name=class_name, instructor=instructor, available_slots=slots,
+                                        scheduled_at=self.evening + timedelta(minutes=minutes))
+            for class_name, instructor, slots, minutes in (
+                ("YOGA", self.alice, 5, 90),
+                ("HIIT", self.bob, 1, 0),
+                ("ZUMBA", self.alice, 5, 30),
+                ("YOGA", self.bob, 5, 24 * 60),
+            )
+        ]
+        InstructorCache.get_many([self.alice.id, self.bob.id])
+
+    def search(self, **params):
+        params.setdefault("start", self.evening.isoformat())
+        params.setdefault("end", (self.evening + timedelta(hours=4)).isoformat())
+        return self.client.get("/api/classes/search/", params)
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [fitness_class["id"] for fitness_class in response.data["data"]]
+
+    # Test classes in the window are filtered by type, instructor and seats left, ordered by time
+    def test_search_filters(self):
+        yoga, hiit, zumba = self.classes[:3]
+        self.assertEqual(self.ids(self.search()), [hiit.id, zumba.id, yoga.id])
+        self.assertEqual(self.ids(self.search(class_type="YOGA")), [yoga.id])
+        self.assertEqual(self.ids(self.search(instructor_id=self.alice.id)), [zumba.id, yoga.id])
+        self.assertEqual(self.ids(self.search(min_slots=2, limit=1)), [zumba.id])
+        self.assertEqual(self.ids(self.search(studio="north")), [])
+
+        response = self.search(class_type="YOGA")
+        self.assertEqual(response.data["data"][0]["instructor"], {"id": self.alice.id, "instructor_name": "Alice"})
+        self.assertEqual(response.data["data"][0]["available_slots"], 5)
+
+        response = self.search(start=self.evening.isoformat(), end=(self.evening - timedelta(hours=1)).isoformat())
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.search(class_type="BOXING").status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Test a warm index answers without touching the database when every worker's seat changes reach it
+    @mock.patch.object(LocalBackend, "cross_process", True)
+    def test_warm_index_skips_database(self):
+        self.search()
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.ids(self.search(min_slots=0))), 3)
+
+    # Test seats changed by another worker are read back when the backend only reaches this process
+    def test_seats_verified_with_local_backend(self):
+        hiit = self.classes[1]
+        self.search()
+        # as booked by another worker, whose event never reaches this process
+        FitnessClass.objects.filter(id=hiit.id).update(booked_count=1)
+        # the full class is dropped and the next match read in its place
+        with self.assertNumQueries(2):
+            self.assertEqual(self.ids(self.search(limit=2)), [self.classes[2].id, self.classes[0].id])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.ids(self.search()), [self.classes[2].id, self.classes[0].id])
+        # the index took the fresh seat count
+        with mock.patch.object(LocalBackend, "cross_process", True), self.assertNumQueries(0):
+            self.assertEqual(self.search(min_slots=0).data["data"][0]["available_slots"], 0)
+
+    # Test bookings and new classes reach the index without a rebuild
+    @mock.patch.object(LocalBackend, "cross_process", True)
+    def test_incremental_updates(self):
+        hiit = self.classes[1]
+        self.assertIn(hiit.id, self.ids(self.search()))
+        response = self.client.post("/api/bookings/create-booking/", {
+            "class_id": hiit.id, "first_name": "John", "last_name": "Doe", "email_address": "john@example.com"
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        with self.assertNumQueries(0):
+            self.assertNotIn(hiit.id, self.ids(self.search()))
+            self.assertIn(hiit.id, self.ids(self.search(min_slots=0)))
+
+        response = self.client.post("/api/classes/create-class/", {
+            "class_name": "HIIT",
+            "instructor_id": self.bob.id,
+            "available_slots": 10,
+            "scheduled_at": (self.evening + timedelta(hours=3)).isoformat(),
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # only the new class is read
+        with self.assertNumQueries(1):
+            self.assertEqual(self.ids(self.search(class_type="HIIT")), [response.data["data"]["id"]])
+
+    # Test rescheduled and deleted classes are re-indexed once committed
+    def test_edits_and_deletes(self):
+        yoga, zumba = self.classes[0], self.classes[2]
+        self.search()
+        with self.captureOnCommitCallbacks(execute=True):
+            yoga.scheduled_at = self.evening + timedelta(hours=10)
+            yoga.save()
+            zumba.delete()
+        self.assertEqual(self.ids(self.search()), [self.classes[1].id])
+        self.assertEqual(self.ids(self.search(end=(self.evening + timedelta(hours=12)).isoformat())),
+                         [self.classes[1].id, yoga.id])
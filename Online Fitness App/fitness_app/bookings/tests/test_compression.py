@@ -0,0 +1,70 @@
+import gzip
+import json
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from bookings.models import FitnessClass, Instructor
+from django.utils.timezone import now, timedelta
+
+
+class CompressionUnitTests(TestCase):
+    # Initial setup
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.instructor = Instructor.objects.create(instructor_name="Alice")
+        for i in range(20):
+            FitnessClass.objects.create(
+                class_name="YOGA",
+                instructor=self.instructor,
+                available_slots=10,
+                scheduled_at=now() + timedelta(days=i + 1)
+            )
+
+    def get_classes(self):
+        return self.client.get("/api/classes/get-all-classes/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+    # Test that the listing is gzip compressed and repeat hits are served from the cache
+    def test_listing_is_compressed_and_cached(self):
+        response = self.get_classes()
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))["data"]), 20)
+
+        with self.assertNumQueries(0):
+            cached = self.get_classes()
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(len(cached.data["data"]), 20)
+
+        identity = self.client.get("/api/classes/get-all-classes/")
+        self.assertFalse(identity.has_header("Content-Encoding"))
+        self.assertEqual(len(json.loads(identity.content)["data"]), 20)
+
+    # Test that saving a class invalidates the cached listing
+    def test_listing_cache_is_invalidated(self):
+        self.get_classes()
+        FitnessClass.objects.create(
+            class_name="HIIT",
+            instructor=self.instructor,
+            available_slots=10,
+            scheduled_at=now() + timedelta(days=30)
+        )
+        response = self.get_classes()
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))["data"]), 21)
+
+    # Test that small error responses are not compressed
+    def test_small_responses_are_not_compressed(self):
+        response = self.client.post(
+            "/api/instructors/create-instructor/", {}, format="json", HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    # Test that pages outside the bookings API, such as the admin's HTML carrying CSRF tokens, are not compressed
+    def test_admin_pages_are_not_compressed(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+        response = self.client.get("/admin/bookings/fitnessclass/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(response.content), 512)
+        self.assertFalse(response.has_header("Content-Encoding"))
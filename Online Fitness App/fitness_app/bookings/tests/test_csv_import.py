@@ -0,0 +1,99 @@
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from bookings.models import Client, FitnessClass, Instructor, OccupancyRollup
+from bookings.services.import_service import ImportService
+from django.utils.timezone import now, timedelta
+
+
+class CsvImportUnitTests(TestCase):
+    # Initial setup
+    def setUp(self):
+        self.instructor = Instructor.objects.create(instructor_name="Alice")
+        self.start = (now() + timedelta(days=2)).replace(microsecond=0)
+        FitnessClass.objects.create(
+            class_name="YOGA",
+            instructor=self.instructor,
+            capacity=5,
+            scheduled_at=self.start
+        )
+        Client.objects.create(
+            first_name="Jane", last_name="Doe", email_address="jane@example.com", phone_number="1111111111"
+        )
+
+    def csv_file(self, content):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(handle, "w", newline="") as csv_file:
+            csv_file.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def at(self, hours):
+        return (self.start + timedelta(hours=hours)).isoformat()
+
+    # Test clients are upserted by email address, invalid rows are reported with their line
+    def test_import_clients(self):
+        report = ImportService.import_clients(StringIO(
+            "first_name,last_name,email_address,phone_number\n"
+            "Janet,Doe,JANE@example.com,2222222222\n"
+            "John,Doe,john@example.com,3333333333\n"
+            "J0hn,Doe,bad@example.com,4444444444\n"
+            "Anne,Gold,not-an-email,5555555555\n"
+            "Johnny,Doe,john@example.com,6666666666\n"
+        ), chunk_size=2)
+
+        self.assertEqual((report["rows"], report["created"], report["updated"], report["failed"]), (5, 1, 2, 2))
+        self.assertEqual([line for line, _ in report["errors"]], [4, 5])
+        self.assertIn("first_name", report["errors"][0][1])
+        jane = Client.objects.get(email_address="jane@example.com")
+        self.assertEqual(jane.first_name, "Janet")
+        # the calendar feeds of updated clients carry their new names, john was created and then updated by a later chunk
+        self.assertEqual(jane.bookings_version, 1)
+        self.assertEqual(Client.objects.get(email_address="john@example.com").bookings_version, 1)
+        self.assertEqual(Client.objects.get(email_address="john@example.com").phone_number, "6666666666")
+        self.assertEqual(Client.objects.count(), 2)
+
+    # Test classes are inserted with their occupancy, clashing rows are rejected
+    def test_import_classes(self):
+        instructor_id = self.instructor.id
+        report = ImportService.import_classes(StringIO(
+            "class_name,instructor_id,available_slots,scheduled_at,duration_minutes\n"
+            f"ZUMBA,{instructor_id},10,{self.at(2)},\n"
+            f"HIIT,{instructor_id},10,{self.at(2)},30\n"
+            f"YOGA,{instructor_id},10,{self.at(0)},60\n"
+            f"HIIT,{instructor_id},10,{self.at(0.5)},60\n"
+            f"HIIT,999999,10,{self.at(5)},60\n"
+            f"HIIT,{instructor_id},500,{self.at(6)},60\n"
+            f"HIIT,{instructor_id},10,{self.at(8)},60\n"
+        ), chunk_size=3)
+
+        self.assertEqual((report["rows"], report["created"], report["failed"]), (7, 2, 5))
+        self.assertEqual([line for line, _ in report["errors"]], [3, 4, 6, 7, 5])
+        self.assertIn("overlapping", report["errors"][0][1])
+        self.assertIn("already scheduled", report["errors"][1][1])
+        self.assertIn("instructor_id", report["errors"][2][1])
+        self.assertIn("overlapping", report["errors"][4][1])
+        imported = FitnessClass.objects.exclude(class_name="YOGA").order_by("scheduled_at")
+        self.assertEqual([(c.class_name, c.capacity, c.duration_minutes) for c in imported],
+                         [("ZUMBA", 10, 60), ("HIIT", 10, 60)])
+        self.assertEqual(sum(OccupancyRollup.objects.values_list("classes_count", flat=True)), 2)
+
+    # Test the command reports the failed rows and the import rate
+    def test_import_command(self):
+        path = self.csv_file(
+            "first_name,last_name,email_address,phone_number\n"
+            "John,Doe,john@example.com,3333333333\n"
+            ",Doe,anne@example.com,5555555555\n"
+        )
+        out = StringIO()
+        call_command("import_csv", "clients", path, "--chunk-size=1", stdout=out)
+
+        self.assertIn("Line 3: first_name", out.getvalue())
+        self.assertIn("1 created, 0 updated, 1 failed", out.getvalue())
+        self.assertIn("rows/s", out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command("import_csv", "classes", path, stdout=StringIO())
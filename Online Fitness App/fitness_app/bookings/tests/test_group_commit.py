@@ -0,0 +1,92 @@
+import threading
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework import status
+from bookings.models import Booking, Client, FitnessClass, Instructor
+from bookings.services.booking_service import BookingService
+from bookings.services.group_commit import GroupCommitQueue
+from django.utils.timezone import now, timedelta
+
+
+class GroupCommitQueueUnitTests(SimpleTestCase):
+    def submit_concurrently(self, group_commit, payloads):
+        results = {}
+
+        def submit(payload):
+            try:
+                results[payload] = group_commit.submit("class-1", payload, window_seconds=5, max_batch_size=len(payloads))
+            except Exception as error:
+                results[payload] = error
+
+        threads = [threading.Thread(target=submit, args=(payload,)) for payload in payloads]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    # Test concurrent submissions are committed as one batch, each request getting its own result
+    def test_requests_share_one_commit(self):
+        batches = []
+
+        def commit_batch(key, payloads):
+            batches.append((key, sorted(payloads)))
+            return [payload.upper() for payload in payloads]
+
+        results = self.submit_concurrently(GroupCommitQueue(commit_batch), ["a", "b", "c"])
+        self.assertEqual(batches, [("class-1", ["a", "b", "c"])])
+        self.assertEqual(results, {"a": "A", "b": "B", "c": "C"})
+
+    # Test a failing batch raises its error in every waiting request
+    def test_batch_error_reaches_every_request(self):
+        def commit_batch(key, payloads):
+            raise RuntimeError("commit failed")
+
+        results = self.submit_concurrently(GroupCommitQueue(commit_batch), ["a", "b"])
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results.values()))
+
+
+class GroupCommitBookingUnitTests(TestCase):
+    # Initial setup
+    def setUp(self):
+        self.client = APIClient()
+        instructor = Instructor.objects.create(instructor_name="Alice")
+        self.fitness_class = FitnessClass.objects.create(
+            class_name="YOGA",
+            instructor=instructor,
+            capacity=3,
+            scheduled_at=now() + timedelta(days=1)
+        )
+        booked = Client.objects.create(
+            first_name="Jane", last_name="Doe", email_address="jane@example.com", phone_number="9999999999"
+        )
+        BookingService.create_booking(self.fitness_class.id, "Jane", "Doe", booked.email_address)
+
+    # Test a batch takes the free slots in arrival order with one slot update and one bulk insert
+    def test_create_bookings(self):
+        requests = [
+            ("John", "Doe", "john@example.com"),
+            ("Jane", "Doe", "JANE@example.com"),
+            ("John", "Doe", "john@example.com"),
+            ("Anne", "Gold", "anne@example.com"),
+            ("Bob", "Marley", "bob@example.com"),
+        ]
+        bookings = BookingService.create_bookings(self.fitness_class.id, requests)
+
+        self.assertEqual([booking and booking.client.email_address for booking in bookings],
+                         ["john@example.com", None, None, "anne@example.com", None])
+        self.fitness_class.refresh_from_db()
+        self.assertEqual((self.fitness_class.booked_count, self.fitness_class.available_slots), (3, 0))
+        self.assertEqual(Booking.objects.filter(fitness_class=self.fitness_class).count(), 3)
+        self.assertEqual(Client.objects.get(email_address="anne@example.com").bookings_version, 1)
+
+    # Test the booking API goes through the group commit queue when it is enabled
+    @override_settings(BOOKINGS_GROUP_COMMIT={"ENABLED": True, "WINDOW_MS": 1, "MAX_BATCH_SIZE": 10})
+    def test_create_booking_with_group_commit(self):
+        response = self.client.post("/api/bookings/create-booking/", {
+            "class_id": self.fitness_class.id, "first_name": "John", "last_name": "Doe", "email_address": "john@example.com"
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["data"]["instructor_name"], "Alice")
+        self.fitness_class.refresh_from_db()
+        self.assertEqual(self.fitness_class.booked_count, 2)
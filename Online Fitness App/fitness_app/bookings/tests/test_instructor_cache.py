@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from bookings.models import FitnessClass, Instructor
+from bookings.services.instructor_cache import VERSION_KEY, InstructorCache
+from django.utils.timezone import now, timedelta
+
+
+class InstructorCacheUnitTests(TestCase):
+    # Initial setup
+    def setUp(self):
+        self.client = APIClient()
+        self.instructors = [Instructor.objects.create(instructor_name=name) for name in ("Alice", "Bob", "Carol")]
+        FitnessClass.objects.create(
+            class_name="YOGA",
+            instructor=self.instructors[0],
+            available_slots=5,
+            scheduled_at=now() + timedelta(days=1)
+        )
+
+    def instructor_reads(self, queries):
+        return [query for query in queries if 'FROM "bookings_instructor"' in query["sql"]]
+
+    # Test instructors are read through once, then served from the cache
+    def test_read_through(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(InstructorCache.get(self.instructors[0].id).instructor_name, "Alice")
+        with self.assertNumQueries(0):
+            self.assertEqual(InstructorCache.get(self.instructors[0].id).instructor_name, "Alice")
+        self.assertIsNone(InstructorCache.get(999999))
+
+    # Test the class listing and class validation skip the instructor join and lookup
+    def test_listing_and_validation_skip_instructor(self):
+        InstructorCache.get(self.instructors[0].id)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/classes/get-all-classes/")
+        self.assertEqual(response.data["data"][0]["instructor"]["instructor_name"], "Alice")
+        self.assertEqual(self.instructor_reads(queries), [])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/api/classes/create-class/", {
+                "class_name": "HIIT",
+                "instructor_id": self.instructors[0].id,
+                "available_slots": 10,
+                "scheduled_at": (now() + timedelta(days=3)).isoformat(),
+            }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["data"]["instructor"]["instructor_name"], "Alice")
+        self.assertEqual(self.instructor_reads(queries), [])
+
+    # Test saving an instructor invalidates the cache
+    def test_invalidated_on_save(self):
+        InstructorCache.get(self.instructors[0].id)
+        self.instructors[0].instructor_name = "Alicia"
+        self.instructors[0].save()
+        response = self.client.get("/api/classes/get-all-classes/")
+        self.assertEqual(response.data["data"][0]["instructor"]["instructor_name"], "Alicia")
+
+    # Test a change made by another worker is noticed through the shared version stamp
+    @override_settings(BOOKINGS_INSTRUCTOR_CACHE_RECHECK_SECONDS=0)
+    def test_invalidated_by_other_worker(self):
+        InstructorCache.get(self.instructors[0].id)
+        Instructor.objects.filter(id=self.instructors[0].id).update(instructor_name="Alicia")
+        self.assertEqual(InstructorCache.get(self.instructors[0].id).instructor_name, "Alice")
+
+        # another worker saved the instructor and bumped the shared version
+        cache.incr(VERSION_KEY)
+        self.assertEqual(InstructorCache.get(self.instructors[0].id).instructor_name, "Alicia")
+
+    # Test the least recently used instructor is evicted once the cache is full
+    @override_settings(BOOKINGS_INSTRUCTOR_CACHE_SIZE=2)
+    def test_lru_eviction(self):
+        alice, bob, carol = (instructor.id for instructor in self.instructors)
+        InstructorCache.get_many([alice, bob])
+        InstructorCache.get(alice)
+        InstructorCache.get(carol)
+        with self.assertNumQueries(0):
+            InstructorCache.get_many([alice, carol])
+        with self.assertNumQueries(1):
+            InstructorCache.get(bob)
@@ -0,0 +1,138 @@
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework import status
+from bookings.models import FitnessClass, Instructor
+from bookings.services.booking_service import BookingService
+from bookings.services.metrics import REGISTRY
+from django.utils.timezone import now, timedelta
+
+
+def sample(text, series):
+    """Value of one series in a Prometheus text payload, 0 if absent."""
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+class MetricsUnitTests(TestCase):
+    # Initial setup
+    def setUp(self):
+        self.client = APIClient()
+        instructor = Instructor.objects.create(instructor_name="Alice")
+        self.fitness_class = FitnessClass.objects.create(
+            class_name="YOGA",
+            instructor=instructor,
+            available_slots=1,
+            scheduled_at=now() + timedelta(days=1)
+        )
+
+    def scrape(self):
+        response = self.client.get("/api/metrics/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        return response.content.decode()
+
+    def book(self, email):
+        return self.client.post("/api/bookings/create-booking/", {
+            "class_id": self.fitness_class.id, "first_name": "John", "last_name": "Doe", "email_address": email
+        }, format="json")
+
+    # Test bookings, rejections and request latencies are counted
+    def test_booking_metrics(self):
+        before = self.scrape()
+        self.assertEqual(self.book("john@example.com").status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.book("john@example.com").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.book("jane@example.com").status_code, status.HTTP_400_BAD_REQUEST)
+        overlapping = FitnessClass.objects.create(
+            class_name="HIIT",
+            instructor=self.fitness_class.instructor,
+            available_slots=5,
+            scheduled_at=self.fitness_class.scheduled_at + timedelta(minutes=30)
+        )
+        response = self.client.post("/api/bookings/create-booking/", {
+            "class_id": overlapping.id, "first_name": "John", "last_name": "Doe", "email_address": "john@example.com"
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        after = self.scrape()
+
+        def delta(series):
+            return sample(after, series) - sample(before, series)
+
+        self.assertEqual(delta("bookings_created_total"), 1)
+        # the second request is both a duplicate and for a full class, it is counted once
+        self.assertEqual(delta('bookings_rejected_total{reason="duplicate_email"}'), 1)
+        self.assertEqual(delta('bookings_rejected_total{reason="class_full"}'), 1)
+        self.assertEqual(delta('bookings_rejected_total{reason="schedule_conflict"}'), 1)
+        self.assertEqual(delta('bookings_http_requests_total{view="create-booking",method="POST",status="201"}'), 1)
+        self.assertEqual(delta('bookings_http_requests_total{view="create-booking",method="POST",status="400"}'), 3)
+        self.assertEqual(delta('bookings_http_request_duration_seconds_count{view="create-booking",method="POST"}'), 4)
+        self.assertEqual(delta('bookings_http_request_duration_seconds_bucket{view="create-booking",method="POST",le="+Inf"}'), 4)
+        self.assertGreater(delta('bookings_db_duration_seconds_sum{view="create-booking",method="POST"}'), 0)
+
+    # Test class listing cache hits and misses are counted
+    def test_cache_metrics(self):
+        before = self.scrape()
+        self.client.get("/api/classes/get-all-classes/")
+        self.client.get("/api/classes/get-all-classes/")
+        after = self.scrape()
+        for result in ("hit", "miss"):
+            series = f'bookings_cache_requests_total{{cache="class_listing",result="{result}"}}'
+            self.assertEqual(sample(after, series) - sample(before, series), 1)
+
+    # Test the metrics of all worker processes are added up
+    def test_metrics_of_all_workers(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(BOOKINGS_METRICS_DIR=directory):
+            own = sample(self.scrape(), "bookings_created_total")
+            Path(directory, "1-1.json").write_text(json.dumps({
+                "counters": [["bookings_created_total", [], 5]],
+                "histograms": [],
+            }))
+            self.assertEqual(sample(self.scrape(), "bookings_created_total"), own + 5)
+
+    # Test the files of workers gone for longer than the retention window are deleted, and a worker removes its own at exit
+    def test_metrics_files_are_cleaned_up(self):
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(BOOKINGS_METRICS_DIR=directory, BOOKINGS_METRICS_RETENTION_SECONDS=60):
+            own = sample(self.scrape(), "bookings_created_total")
+            stale = Path(directory, "1-1.json")
+            stale.write_text(json.dumps({"counters": [["bookings_created_total", [], 5]], "histograms": []}))
+            os.utime(stale, (time.time() - 120, time.time() - 120))
+            self.assertEqual(sample(self.scrape(), "bookings_created_total"), own)
+            self.assertFalse(stale.exists())
+
+            REGISTRY._remove_file()
+            self.assertEqual(list(Path(directory).glob("*.json")), [])
+
+    # Test scrapes must carry the configured token
+    @override_settings(BOOKINGS_METRICS_TOKEN="secret")
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get("/api/metrics/").status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get("/api/metrics/", HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get("/api/metrics/", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("bookings_created_total", response.content.decode())
+
+    # Test a booking transaction hitting a locked database is retried and counted
+    def test_lock_retries(self):
+        operation = mock.Mock(side_effect=[OperationalError("database is locked"), "booked"])
+        before = self.scrape()
+        with mock.patch("bookings.services.booking_service.transaction.get_connection") as get_connection, \
+                mock.patch("bookings.services.booking_service.time.sleep"):
+            get_connection.return_value.in_atomic_block = False
+            self.assertEqual(BookingService._retry_on_lock(operation), "booked")
+        self.assertEqual(sample(self.scrape(), "bookings_lock_retries_total") - sample(before, "bookings_lock_retries_total"), 1)
+
+        # errors other than lock errors are not retried
+        operation = mock.Mock(side_effect=OperationalError("no such table"))
+        with self.assertRaises(OperationalError):
+            BookingService._retry_on_lock(operation)
+        self.assertEqual(operation.call_count, 1)
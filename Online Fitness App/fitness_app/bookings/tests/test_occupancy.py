@@ -0,0 +1,85 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+from bookings.models import Booking, FitnessClass, Instructor, OccupancyRollup
+from django.utils.timezone import now, timedelta
+
+
+class OccupancyAnalyticsUnitTests(TestCase):
+    # Initial setup
+    def setUp(self):
+        self.client = APIClient()
+        self.instructor = Instructor.objects.create(instructor_name="Alice")
+        response = self.client.post("/api/classes/create-class/", {
+            "class_name": "YOGA",
+            "instructor_id": self.instructor.id,
+            "available_slots": 4,
+            "scheduled_at": (now() + timedelta(days=1)).isoformat()
+        }, format="json")
+        self.class_id = response.data["data"]["id"]
+        for name in ("john", "jane"):
+            self.client.post("/api/bookings/create-booking/", {
+                "class_id": self.class_id,
+                "first_name": name.title(),
+                "last_name": "Doe",
+                "email_address": f"{name}@example.com"
+            }, format="json")
+
+    def rollup_counts(self):
+        return list(OccupancyRollup.objects.values_list("classes_count", "capacity", "bookings_count"))
+
+    # Test that creating classes and bookings updates the rollups incrementally
+    def test_rollups_follow_bookings_and_cancellations(self):
+        self.assertEqual(self.rollup_counts(), [(1, 4, 2)])
+
+        booking = Booking.objects.get(client__email_address="jane@example.com")
+        response = self.client.delete("/api/bookings/cancel-booking/", {
+            "booking_id": booking.id,
+            "email_address": "jane@example.com"
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.rollup_counts(), [(1, 4, 1)])
+
+    # Test that rescheduling a class moves it to its new bucket and editing its capacity updates the bucket
+    def test_rollups_follow_class_edits(self):
+        fitness_class = FitnessClass.objects.get(id=self.class_id)
+        fitness_class.scheduled_at += timedelta(days=1)
+        fitness_class.save()
+        self.assertEqual(self.rollup_counts(), [(0, 0, 0), (1, 4, 2)])
+        self.assertEqual(OccupancyRollup.objects.get(classes_count=1).date, fitness_class.scheduled_at.date())
+
+        fitness_class.capacity = 6
+        fitness_class.save()
+        self.assertEqual(self.rollup_counts(), [(0, 0, 0), (1, 6, 2)])
+
+        OccupancyRollup.objects.all().delete()
+        call_command("rebuild_occupancy", stdout=StringIO())
+        self.assertEqual(self.rollup_counts(), [(1, 6, 2)])
+
+    # Test that the rebuild command recomputes the same rollups from scratch
+    def test_rebuild_matches_incremental_rollups(self):
+        incremental = self.rollup_counts()
+        OccupancyRollup.objects.all().delete()
+        call_command("rebuild_occupancy", stdout=StringIO())
+        self.assertEqual(self.rollup_counts(), incremental)
+
+    # Test GET /analytics/occupancy grouped by instructor and filtered by class type
+    def test_get_occupancy(self):
+        response = self.client.get("/api/analytics/occupancy/?group_by=instructor&class_type=YOGA")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"], [{
+            "instructor_id": self.instructor.id,
+            "instructor__instructor_name": "Alice",
+            "classes": 1,
+            "capacity": 4,
+            "bookings": 2,
+            "fill_rate": 0.5,
+        }])
+
+        response = self.client.get("/api/analytics/occupancy/?class_type=ZUMBA")
+        self.assertEqual(response.data["data"], [])
+
+        response = self.client.get("/api/analytics/occupancy/?group_by=month")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,61 @@
+import tempfile
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework import status
+from bookings.models import FitnessClass, Instructor
+from bookings.services.profiling import current_profile, phase
+from django.utils.timezone import now, timedelta
+
+REPORT_DIR = tempfile.mkdtemp()
+
+
+@override_settings(BOOKINGS_PROFILING={"ENABLED": True, "SAMPLE_RATE": 0.0, "REPORT_DIR": REPORT_DIR})
+class ProfilingUnitTests(TestCase):
+    # Initial setup
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = User.objects.create_user("staff", password="secret", is_staff=True)
+        instructor = Instructor.objects.create(instructor_name="Alice")
+        FitnessClass.objects.create(
+            class_name="YOGA",
+            instructor=instructor,
+            available_slots=5,
+            scheduled_at=now() + timedelta(days=1)
+        )
+
+    # Test a staff request asking for a profile gets a downloadable report
+    def test_staff_request_is_profiled(self):
+        self.client.force_login(self.staff)
+        response = self.client.get("/api/classes/get-all-classes/?profile=1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        report_id = response["X-Profile-Report"]
+
+        report = self.client.get(f"/api/profiling/reports/{report_id}/").data["data"]
+        self.assertEqual(report["status"], 200)
+        self.assertTrue({"service", "serialization", "rendering"} <= set(report["phases"]))
+        self.assertTrue(any("bookings_fitnessclass" in query["sql"] for query in report["queries"]))
+        self.assertTrue(any(query.get("plan") for query in report["queries"]))
+        self.assertIn("function calls", report["profile"])
+
+    # Test requests are not profiled without asking, or for non-staff users
+    def test_unprofiled_requests(self):
+        self.client.force_login(self.staff)
+        self.assertFalse(self.client.get("/api/classes/get-all-classes/").has_header("X-Profile-Report"))
+        self.client.logout()
+        response = self.client.get("/api/classes/get-all-classes/?profile=1")
+        self.assertFalse(response.has_header("X-Profile-Report"))
+
+    # Test reports can only be downloaded by staff users
+    def test_report_download_is_staff_only(self):
+        response = self.client.get("/api/profiling/reports/0123456789abcdef0123456789abcdef/")
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        self.client.force_login(self.staff)
+        response = self.client.get("/api/profiling/reports/0123456789abcdef0123456789abcdef/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    # Test phase() is a no-op outside of a profiled request
+    def test_phase_without_profile(self):
+        self.assertIsNone(current_profile())
+        with phase("service"):
+            pass
@@ -0,0 +1,114 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+from bookings.models import Booking, FitnessClass, Instructor
+from bookings.services.booking_service import BookingService
+from bookings.services.schedule_conflict_service import IntervalIndex, ScheduleConflictService
+from django.utils.timezone import now, timedelta
+
+
+class IntervalIndexUnitTests(TestCase):
+    # Test overlap queries against stored intervals, with touching intervals not overlapping
+    def test_overlapping(self):
+        index = IntervalIndex([(0, 10, "a"), (10, 20, "b"), (30, 90, "c")])
+        index.add(15, 16, "d")
+        self.assertEqual(index.overlapping(5, 12), ["a", "b"])
+        self.assertEqual(index.overlapping(20, 30), [])
+        self.assertEqual(sorted(index.overlapping(15, 40)), ["b", "c", "d"])
+        self.assertEqual(index.overlapping(80, 85), ["c"])
+
+    # Test finding every overlapping pair within a batch
+    def test_find_overlaps(self):
+        overlaps = IntervalIndex.find_overlaps([(0, 10, "a"), (5, 15, "b"), (10, 20, "c"), (12, 13, "d")])
+        self.assertEqual(
+            sorted(tuple(sorted(pair)) for pair in overlaps), [("a", "b"), ("b", "c"), ("b", "d"), ("c", "d")]
+        )
+
+
+class ScheduleConflictUnitTests(TestCase):
+    # Initial setup
+    def setUp(self):
+        self.client = APIClient()
+        self.instructor = Instructor.objects.create(instructor_name="Alice")
+        self.start = (now() + timedelta(days=1)).replace(microsecond=0)
+        self.fclass = FitnessClass.objects.create(
+            class_name="YOGA",
+            instructor=self.instructor,
+            available_slots=5,
+            scheduled_at=self.start,
+            duration_minutes=90
+        )
+
+    # Test that an instructor cannot teach two overlapping classes
+    def test_create_overlapping_class_for_instructor(self):
+        payload = {
+            "class_name": "HIIT",
+            "instructor_id": self.instructor.id,
+            "available_slots": 5,
+            "scheduled_at": (self.start + timedelta(minutes=60)).isoformat(),
+        }
+        response = self.client.post("/api/classes/create-class/", payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        payload["scheduled_at"] = (self.start + timedelta(minutes=90)).isoformat()
+        response = self.client.post("/api/classes/create-class/", payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["data"]["duration_minutes"], 60)
+
+    # Test that a client cannot book two overlapping classes
+    def test_book_overlapping_classes(self):
+        other_instructor = Instructor.objects.create(instructor_name="Bob")
+        overlapping = FitnessClass.objects.create(
+            class_name="ZUMBA",
+            instructor=other_instructor,
+            available_slots=5,
+            scheduled_at=self.start + timedelta(minutes=30)
+        )
+        payload = {"first_name": "John", "last_name": "Doe", "email_address": "john@example.com"}
+        response = self.client.post("/api/bookings/create-booking/", {"class_id": self.fclass.id, **payload}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post("/api/bookings/create-booking/", {"class_id": overlapping.id, **payload}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Test batch validation against the database and within the batch
+    def test_validate_instructor_schedule(self):
+        hour = timedelta(hours=1)
+        conflicts = ScheduleConflictService.validate_instructor_schedule([
+            ("row-1", self.instructor.id, self.start + hour, self.start + 2 * hour),
+            ("row-2", self.instructor.id, self.start + 2 * hour, self.start + 3 * hour),
+            ("row-3", self.instructor.id, self.start + 2 * hour + timedelta(minutes=30), self.start + 4 * hour),
+        ])
+        self.assertEqual(conflicts, {"row-1": [self.fclass.id], "row-2": ["row-3"], "row-3": ["row-2"]})
+
+    # Test batch validation of bookings against the clients' bookings and within the batch
+    def test_validate_client_schedule(self):
+        BookingService.create_booking(self.fclass.id, "John", "Doe", "john@example.com")
+        other_instructor = Instructor.objects.create(instructor_name="Bob")
+        first, second, third = [
+            FitnessClass.objects.create(class_name="HIIT", instructor=other_instructor, available_slots=5,
+                                        scheduled_at=self.start + timedelta(minutes=minutes))
+            for minutes in (60, 150, 180)
+        ]
+        conflicts = ScheduleConflictService.validate_client_schedule([
+            ("a", "JOHN@example.com", first),
+            ("b", "john@example.com", self.fclass),
+            ("c", "john@example.com", second),
+            ("d", "john@example.com", third),
+            ("e", "jane@example.com", first),
+        ])
+        booking_id = Booking.objects.get(fitness_class=self.fclass).id
+        self.assertEqual(conflicts, {"a": [booking_id, "b"], "b": ["a"], "c": ["d"], "d": ["c"]})
+
+    # Test a bulk booking rejects the clients already booked into an overlapping class
+    def test_create_bookings_rejects_overlaps(self):
+        BookingService.create_booking(self.fclass.id, "John", "Doe", "john@example.com")
+        overlapping = FitnessClass.objects.create(
+            class_name="ZUMBA",
+            instructor=Instructor.objects.create(instructor_name="Bob"),
+            available_slots=5,
+            scheduled_at=self.start + timedelta(minutes=30)
+        )
+        bookings = BookingService.create_bookings(overlapping.id, [
+            ("John", "Doe", "john@example.com"), ("Jane", "Doe", "jane@example.com")
+        ])
+        self.assertEqual([booking and booking.client.email_address for booking in bookings], [None, "jane@example.com"])
@@ -0,0 +1,177 @@
+from io import StringIO
+from unittest import skipUnless
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework import status
+from bookings.models import ArchivedFitnessClass, Booking, Client, FitnessClass, Instructor, OccupancyRollup
+from bookings.services.archive_service import ArchiveService
+from bookings.services.booking_service import BookingService
+from bookings.services.import_service import ImportService
+from bookings.services.occupancy_service import OccupancyService
+from bookings.routers import StudioRouter
+from bookings.services.shards import SHARD_ID_SPAN, database_for_id, studio_database
+from bookings.services.slot_audit_service import SlotAuditService
+from django.utils.timezone import now, timedelta
+
+STUDIO_SETTINGS = {
+    "BOOKINGS_STUDIO_DATABASES": {"north": "studio_north", "south": "studio_south"},
+    "BOOKINGS_SHARD_NUMBERS": {"default": 0, "studio_north": 1, "studio_south": 2},
+}
+
+
+@override_settings(**STUDIO_SETTINGS)
+class StudioRouterUnitTests(SimpleTestCase):
+    # Test studios and IDs are mapped to the database alias holding them
+    def test_databases(self):
+        self.assertEqual(studio_database("north"), "studio_north")
+        self.assertEqual(studio_database("main"), "default")
+        self.assertEqual(database_for_id(42), "default")
+        self.assertEqual(database_for_id(2 * SHARD_ID_SPAN + 7), "studio_south")
+
+    # Test new classes and bookings are placed in their studio's database, other tables stay on default
+    def test_router(self):
+        router = StudioRouter()
+        fitness_class = FitnessClass(studio="south")
+        self.assertEqual(router.db_for_write(FitnessClass, instance=fitness_class), "studio_south")
+        self.assertEqual(router.db_for_write(Booking, instance=Booking(fitness_class_id=SHARD_ID_SPAN + 1)), "studio_north")
+        self.assertIsNone(router.db_for_write(Client, instance=Client()))
+
+        self.assertTrue(router.allow_migrate("studio_north", "bookings", "booking"))
+        self.assertTrue(router.allow_migrate("studio_north", "bookings", "client"))
+        self.assertFalse(router.allow_migrate("studio_north", "bookings", "occupancyrollup"))
+        self.assertFalse(router.allow_migrate("studio_north", "auth", "user"))
+        self.assertIsNone(router.allow_migrate("default", "bookings", "occupancyrollup"))
+
+
+@skipUnless(
+    "studio_north" in settings.DATABASES,
+    "needs the studio databases, run with --settings=fitness_app.settings_sharded",
+)
+class ShardedStudioUnitTests(TestCase):
+    databases = "__all__"
+
+    # Initial setup
+    def setUp(self):
+        self.client = APIClient()
+        self.instructor = Instructor.objects.create(instructor_name="Alice")
+        self.start = now() + timedelta(days=1)
+        self.classes = {}
+        for hours, studio in ((2, "north"), (0, "south"), (4, "main"), (6, "north")):
+            response = self.client.post("/api/classes/create-class/", {
+                "class_name": "YOGA",
+                "instructor_id": self.instructor.id,
+                "available_slots": 5,
+                "scheduled_at": (self.start + timedelta(hours=hours)).isoformat(),
+                "studio": studio,
+            }, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.classes.setdefault(studio, []).append(response.data["data"]["id"])
+
+    def book(self, class_id, email="john@example.com"):
+        return self.client.post("/api/bookings/create-booking/", {
+            "class_id": class_id, "first_name": "John", "last_name": "Doe", "email_address": email
+        }, format="json")
+
+    # Test classes are stored in their studio's database with IDs from its range
+    def test_classes_stored_per_studio(self):
+        north = self.classes["north"][0]
+        self.assertEqual(north // SHARD_ID_SPAN, 1)
+        self.assertEqual(self.classes["south"][0] // SHARD_ID_SPAN, 2)
+        self.assertTrue(FitnessClass.objects.using("studio_north").filter(id=north, studio="north").exists())
+        self.assertFalse(FitnessClass.objects.filter(id=north).exists())
+        # the instructor is copied alongside its classes
+        self.assertTrue(Instructor.objects.using("studio_north").filter(id=self.instructor.id).exists())
+
+    # Test the listing merges every studio by scheduled time, or lists a single studio
+    def test_cross_studio_listing(self):
+        response = self.client.get("/api/classes/get-all-classes/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([c["studio"] for c in response.data["data"]], ["south", "north", "main", "north"])
+        self.assertEqual(response.data["data"][0]["instructor"]["instructor_name"], "Alice")
+
+        response = self.client.get("/api/classes/get-all-classes/?studio=north&fields=id,scheduled_at")
+        self.assertEqual([c["id"] for c in response.data["data"]], self.classes["north"])
+
+        response = self.client.get(f"/api/classes/get-classes-by-ids/?ids={self.classes['north'][1]},{self.classes['main'][0]}")
+        self.assertEqual([c["id"] for c in response.data["data"]], [self.classes["north"][1], self.classes["main"][0]])
+
+    # Test bookings and seat counts live next to their class, the client in default with a copy
+    def test_booking_routed_by_class(self):
+        north = self.classes["north"][0]
+        response = self.book(north)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["data"]["instructor_name"], "Alice")
+
+        booking = Booking.objects.using("studio_north").get(fitness_class_id=north)
+        self.assertEqual(booking.id // SHARD_ID_SPAN, 1)
+        self.assertEqual(FitnessClass.objects.using("studio_north").get(id=north).booked_count, 1)
+        client = Client.objects.get(email_address="john@example.com")
+        self.assertEqual(client.bookings_version, 1)
+        self.assertTrue(Client.objects.using("studio_north").filter(id=client.id).exists())
+
+        # the same client cannot be at an overlapping class of another studio
+        overlapping = FitnessClass.objects.using("studio_south").get(id=self.classes["south"][0])
+        overlapping.scheduled_at = self.start + timedelta(hours=2, minutes=30)
+        overlapping.save()
+        self.assertEqual(self.book(overlapping.id).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.book(north).status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.delete("/api/bookings/cancel-booking/", {
+            "booking_id": booking.id, "email_address": "john@example.com"
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(FitnessClass.objects.using("studio_north").get(id=north).booked_count, 0)
+
+    # Test importing clients refreshes their copies in the studio databases
+    def test_import_refreshes_client_copies(self):
+        self.assertEqual(self.book(self.classes["north"][0]).status_code, status.HTTP_201_CREATED)
+        ImportService.import_clients(StringIO(
+            "first_name,last_name,email_address,phone_number\n"
+            "Johnny,Doe,john@example.com,2222222222\n"
+            "Anne,Gold,anne@example.com,3333333333\n"
+        ))
+        client = Client.objects.get(email_address="john@example.com")
+        copy = Client.objects.using("studio_north").get(id=client.id)
+        self.assertEqual((copy.first_name, copy.bookings_version), ("Johnny", client.bookings_version))
+        self.assertFalse(Client.objects.using("studio_north").filter(email_address="anne@example.com").exists())
+        self.assertFalse(Client.objects.using("studio_south").filter(id=client.id).exists())
+
+    # Test a client's history merges the bookings of every studio by class time
+    def test_history_across_studios(self):
+        for class_id in (self.classes["north"][1], self.classes["south"][0], self.classes["main"][0]):
+            self.assertEqual(self.book(class_id).status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get("/api/bookings/get-all-bookings/?email_address=john@example.com&limit=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        page = [booking["scheduled_at"] for booking in response.data["data"]]
+        response = self.client.get(
+            f"/api/bookings/get-all-bookings/?email_address=john@example.com&cursor={response.data['next_cursor']}"
+        )
+        page += [booking["scheduled_at"] for booking in response.data["data"]]
+        self.assertEqual(len(page), 3)
+        self.assertEqual(page, sorted(page))
+
+        # drift in one studio is found and repaired there
+        FitnessClass.objects.using("studio_south").filter(id=self.classes["south"][0]).update(booked_count=3)
+        mismatches = [class_id for class_id, *_ in SlotAuditService.find_mismatches()]
+        self.assertEqual(mismatches, [self.classes["south"][0]])
+        self.assertEqual(SlotAuditService.repair(mismatches), 1)
+        self.assertEqual(FitnessClass.objects.using("studio_south").get(id=self.classes["south"][0]).booked_count, 1)
+
+    # Test old classes of every studio are archived into default and counted by the occupancy rebuild
+    def test_archive_and_rebuild_across_studios(self):
+        old_class = FitnessClass.objects.using("studio_north").create(
+            studio="north", class_name="HIIT", instructor_id=self.instructor.id, capacity=5,
+            scheduled_at=now() - timedelta(days=200)
+        )
+        BookingService.create_booking(old_class.id, "John", "Doe", "john@example.com")
+
+        self.assertEqual(ArchiveService.archive_past_classes(retention_days=90), (1, 1))
+        self.assertEqual(ArchivedFitnessClass.objects.get(id=old_class.id).studio, "north")
+        self.assertFalse(FitnessClass.objects.using("studio_north").filter(id=old_class.id).exists())
+        self.assertEqual(Client.objects.get(email_address="john@example.com").bookings_version, 2)
+
+        OccupancyService.rebuild()
+        self.assertEqual(sum(OccupancyRollup.objects.values_list("classes_count", flat=True)), 5)
+        self.assertEqual(sum(OccupancyRollup.objects.values_list("bookings_count", flat=True)), 1)
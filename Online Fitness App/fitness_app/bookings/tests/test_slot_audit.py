@@ -0,0 +1,72 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework import status
+from bookings.models import Booking, Client, FitnessClass, Instructor
+from bookings.services.slot_audit_service import SlotAuditService
+from django.utils.timezone import now, timedelta
+
+
+class SlotAuditUnitTests(TestCase):
+    # Initial setup
+    def setUp(self):
+        self.client = APIClient()
+        instructor = Instructor.objects.create(instructor_name="Alice")
+        self.customers = [
+            Client.objects.create(
+                first_name="John", last_name="Doe", email_address=f"john{i}@example.com", phone_number="9999999999"
+            )
+            for i in range(3)
+        ]
+        self.classes = [
+            FitnessClass.objects.create(
+                class_name="YOGA",
+                instructor=instructor,
+                capacity=2,
+                scheduled_at=now() + timedelta(days=i + 1)
+            )
+            for i in range(3)
+        ]
+
+    # Test bookings count against the capacity, which itself never changes
+    def test_available_slots_derived_from_capacity(self):
+        fitness_class = self.classes[0]
+        response = self.client.post("/api/bookings/create-booking/", {
+            "class_id": fitness_class.id, "first_name": "John", "last_name": "Doe", "email_address": "john0@example.com"
+        }, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        fitness_class.refresh_from_db()
+        self.assertEqual((fitness_class.capacity, fitness_class.booked_count, fitness_class.available_slots), (2, 1, 1))
+
+        response = self.client.get("/api/classes/get-all-classes/?fields=id,capacity,available_slots")
+        self.assertEqual(response.data["data"][0], {"id": fitness_class.id, "capacity": 2, "available_slots": 1})
+
+        # an overbooked class has no slots left rather than a negative count
+        fitness_class.booked_count = 5
+        self.assertEqual(fitness_class.available_slots, 0)
+
+    # Test the audit finds drifted classes in one query and repairs them
+    def test_audit_repairs_mismatches(self):
+        drifted, overbooked, correct = self.classes
+        # bookings inserted behind the services' back, as seed scripts or manual edits do
+        Booking.objects.create(client=self.customers[0], fitness_class=drifted)
+        for customer in self.customers:
+            Booking.objects.create(client=customer, fitness_class=overbooked)
+        FitnessClass.objects.filter(id=correct.id).update(booked_count=0)
+
+        with self.assertNumQueries(1):
+            mismatches = list(SlotAuditService.find_mismatches())
+        self.assertEqual(mismatches, [(drifted.id, 0, 1, 2), (overbooked.id, 0, 3, 2)])
+
+        output = StringIO()
+        call_command("audit_slots", "--dry-run", stdout=output)
+        self.assertIn("Found 2 mismatched classes", output.getvalue())
+        self.assertIn("(overbooked)", output.getvalue())
+        self.assertEqual(FitnessClass.objects.get(id=drifted.id).booked_count, 0)
+
+        call_command("audit_slots", "--batch-size=1", stdout=output)
+        self.assertIn("Repaired 2 classes", output.getvalue())
+        counts = dict(FitnessClass.objects.values_list("id", "booked_count"))
+        self.assertEqual(counts, {drifted.id: 1, overbooked.id: 3, correct.id: 0})
+        self.assertEqual(list(SlotAuditService.find_mismatches()), [])
@@ -0,0 +1,55 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from bookings.models import Booking, Client, FitnessClass, Instructor
+from django.utils.timezone import now, timedelta
+
+
+class SparseFieldsUnitTests(TestCase):
+    # Initial setup
+    def setUp(self):
+        self.client = APIClient()
+        instructor = Instructor.objects.create(instructor_name="Alice")
+        customer = Client.objects.create(
+            first_name="John", last_name="Doe", email_address="john@example.com", phone_number="9999999999"
+        )
+        fitness_class = FitnessClass.objects.create(
+            class_name="YOGA",
+            instructor=instructor,
+            available_slots=5,
+            scheduled_at=now() + timedelta(days=1)
+        )
+        Booking.objects.create(client=customer, fitness_class=fitness_class)
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, " ".join(query["sql"] for query in queries)
+
+    # Test GET /classes with fields, the instructor is joined only when requested
+    def test_get_classes_with_fields(self):
+        response, sql = self.get("/api/classes/get-all-classes/?fields=id,class_name,available_slots")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data["data"][0]), {"id", "class_name", "available_slots"})
+        self.assertNotIn("bookings_instructor", sql)
+        self.assertNotIn('"bookings_fitnessclass"."duration_minutes"', sql)
+
+        response, sql = self.get("/api/classes/get-all-classes/?fields=instructor")
+        self.assertEqual(set(response.data["data"][0]), {"instructor"})
+        self.assertEqual(response.data["data"][0]["instructor"]["instructor_name"], "Alice")
+        self.assertIn("bookings_instructor", sql)
+
+        response, _ = self.get("/api/classes/get-all-classes/?fields=id,password")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    # Test GET /bookings with fields, unrequested relations are not selected
+    def test_get_bookings_with_fields(self):
+        response, sql = self.get(
+            "/api/bookings/get-all-bookings/?email_address=john@example.com&fields=fitness_class_name,scheduled_at"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data["data"][0]), {"fitness_class_name", "scheduled_at"})
+        self.assertNotIn("bookings_instructor", sql)
+        self.assertNotIn('"bookings_client"."first_name"', sql)
@@ -1,10 +1,18 @@
 from django.urls import path
-from .views import BookingView, FitnessClassesView, InstructorView
+from .views import BookingView, FitnessClassesView, FitnessClassBatchView, ClassSearchView, InstructorView, AvailabilityStreamView, OccupancyAnalyticsView, ProfileReportView, MetricsView, CalendarFeedView
 
 urlpatterns = [
     path('bookings/get-all-bookings/', BookingView.as_view(), name='get-all-bookings'), # get all bookings endpoint
     path('bookings/create-booking/', BookingView.as_view(), name='create-booking'), # create booking endpoint 
+    path('bookings/cancel-booking/', BookingView.as_view(), name='cancel-booking'), # cancel booking endpoint
+    path('bookings/calendar.ics', CalendarFeedView.as_view(), name='calendar-feed'), # client's iCalendar feed endpoint
     path('classes/get-all-classes/', FitnessClassesView.as_view(), name='get-all-classes'), # get all classes endpoint
     path('classes/create-class/', FitnessClassesView.as_view(), name='create-class'), # create class endpoint
+    path('classes/get-classes-by-ids/', FitnessClassBatchView.as_view(), name='get-classes-by-ids'), # batch get classes endpoint
+    path('classes/search/', ClassSearchView.as_view(), name='search-classes'), # search upcoming classes with free seats endpoint
+    path('classes/availability-stream/', AvailabilityStreamView.as_view(), name='availability-stream'), # live seat availability (SSE) endpoint
+    path('analytics/occupancy/', OccupancyAnalyticsView.as_view(), name='occupancy-analytics'), # occupancy analytics endpoint
     path('instructors/create-instructor/', InstructorView.as_view(), name='create-instructor'), # create instructor endpoint
+    path('metrics/', MetricsView.as_view(), name='metrics'), # Prometheus metrics endpoint
+    path('profiling/reports/<str:report_id>/', ProfileReportView.as_view(), name='profile-report'), # download profile report endpoint (staff only)
 ]
\ No newline at end of file
@@ -1,32 +1,66 @@
+import hmac
+import json
 import logging
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
 from .services.instructor_service import InstructorService
 from .serializers.instructor_serializer import InstructorSerializer
 from .services.booking_service import BookingService
-from .serializers.booking_serializer import BookingSerializer, CreateBookingSerializer
-from .serializers.fitness_class_serializer import FitnessClassSerializer, CreateFitnessClassSerializer
+from .serializers.booking_serializer import BookingSerializer, CreateBookingSerializer, CancelBookingSerializer, BookingHistoryQuerySerializer
+from .serializers.occupancy_serializer import OccupancyQuerySerializer
+from .serializers.fitness_class_serializer import FitnessClassSerializer, CreateFitnessClassSerializer, ClassIdsQuerySerializer, ClassSearchQuerySerializer, ClassSearchResultSerializer
 from .services.fitness_class_service import FitnessClassService
+from .services.availability_broadcaster import get_broadcaster
+from .services.occupancy_service import OccupancyService
+from .services.listing_cache import ListingCache
+from .services.instructor_cache import InstructorCache
+from .services.profiling import load_report, phase
+from .services.metrics import BOOKING_REJECTIONS, REGISTRY
+from .services.calendar_service import CalendarService
+from .responses import CachedPayloadResponse
 
 # get a logger instance
 logger = logging.getLogger(__name__)
 
+# seconds between keep-alive comments on an idle availability stream
+STREAM_KEEPALIVE_SECONDS = 15
+# seconds an availability stream stays open, Django does not end a streaming response when its client
+# disconnects, so streams end on their own and clients reconnect after STREAM_RETRY_MS milliseconds
+STREAM_MAX_SECONDS = 300
+STREAM_RETRY_MS = 3000
+
 class BookingView(APIView):
     """
     API View for handling operations related to Bookings.
     Supports retrieving a client's bookings via email,
     Creates booking provided class id, first name, last name and email 
+    Cancels booking provided booking id and email
     """
     def get(self, request):
         """
-        Retrieve all bookings associated with a given client email.
+        Retrieve a page of bookings associated with a given client email, ordered by class time.
         Query Parameters:
-            email_address (str): The email address of the client.
+            email_address (str): The email address of the client (case-insensitive).
+            include_archived (bool, optional): Also return bookings of archived (past) classes.
+            when (str, optional): `upcoming` or `past` classes only.
+            start, end (datetime, optional): Only classes scheduled within this range.
+            cursor (str, optional): The `next_cursor` of the previous page.
+            limit (int, optional): Page size, 50 by default and at most 200.
+            fields (str, optional): Comma separated fields to return, only their columns and joins are loaded.
         Returns:
-            Response: A JSON response containing the list of bookings or an error message. 
+            Response: A JSON response containing the page of bookings and the cursor of the next page, or an error message. 
         Raises:
-            HTTP_400_BAD_REQUEST: If the 'email_address' parameter is missing or no bookings are found.
+            HTTP_400_BAD_REQUEST: If the 'email_address' parameter is missing, any parameter is invalid or no bookings are found.
         """
         client_email = request.query_params.get('email_address')
         logger.info(f"Received email from the params: {client_email}")
@@ -38,9 +72,25 @@ class BookingView(APIView):
                 "data": []
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        with phase("validation"):
+            query = BookingHistoryQuerySerializer(data=request.query_params)
+            valid = query.is_valid()
+        if not valid:
+            logger.error(f"Error occured while validating the params: {query.errors}")
+            return Response({
+                "message": "Invalid query parameters.",
+                "status": False,
+                "errors": query.errors,
+                "data": []
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        all_bookings = BookingService.get_all_bookings(client_email)
-        if all_bookings is None:
+        params = dict(query.validated_data)
+        fields = params.pop('fields', None)
+        if fields:
+            params['columns'] = BookingSerializer.columns_for(fields)
+        with phase("service"):
+            result = BookingService.get_all_bookings(params.pop('email_address'), **params)
+        if result is None:
             logger.error(f"No bookings found for the client email: {client_email}")
             return Response({
                 "message": f"No booking exists with email: {client_email}",
@@ -48,12 +98,15 @@ class BookingView(APIView):
                 "data": []
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        serializer = BookingSerializer(all_bookings, many=True)
-        logger.info(f"Successfully fetched all bookings of client: {serializer.data}")
+        bookings, next_cursor = result
+        with phase("serialization"):
+            data = BookingSerializer(bookings, many=True, context={"fields": fields}).data
+        logger.info(f"Successfully fetched all bookings of client: {data}")
         return Response({
             "message": "Success",
             "status": True,
-            "data": serializer.data
+            "data": data,
+            "next_cursor": next_cursor
         }, status=status.HTTP_200_OK)
 
 
@@ -72,8 +125,13 @@ class BookingView(APIView):
             HTTP_500_INTERNAL_SERVER_ERROR : Any other errors caused due to external factors
         """
         serializer = CreateBookingSerializer(data=request.data)
-        if not serializer.is_valid():
+        with phase("validation"):
+            valid = serializer.is_valid()
+        if not valid:
             logger.error(f"Error occured while validating the data: {serializer.errors}")
+            reason = serializer.rejection_reason()
+            if reason:
+                BOOKING_REJECTIONS.inc(reason)
             return Response({
                 "message": "Invalid booking data.",
                 "status": False,
@@ -82,12 +140,13 @@ class BookingView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            booking = BookingService.create_booking(
-                serializer.validated_data['class_id'],
-                serializer.validated_data['first_name'],
-                serializer.validated_data['last_name'],
-                serializer.validated_data['email_address'],
-            )
+            with phase("service"):
+                booking = BookingService.create_booking(
+                    serializer.validated_data['class_id'],
+                    serializer.validated_data['first_name'],
+                    serializer.validated_data['last_name'],
+                    serializer.validated_data['email_address'],
+                )
             if not booking:
                 logger.error(f"Error occured while creating the booking: {serializer.errors}")
                 return Response({
@@ -96,11 +155,13 @@ class BookingView(APIView):
                     "errors": serializer.errors,
                     "data": []
                 }, status=status.HTTP_400_BAD_REQUEST)
-            logger.info(f"Successfully created booking for client - {serializer.validated_data['email_address']}, data: {BookingSerializer(booking).data}")
+            with phase("serialization"):
+                data = BookingSerializer(booking).data
+            logger.info(f"Successfully created booking for client - {serializer.validated_data['email_address']}, data: {data}")
             return Response({
                 "message": "Booking created successfully.",
                 "status": True,
-                "data": BookingSerializer(booking).data
+                "data": data
             }, status=status.HTTP_201_CREATED)
 
         except Exception as error:
@@ -111,6 +172,47 @@ class BookingView(APIView):
                 "data": []
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+
+    def delete(self, request):
+        """
+        Cancel a booking provided with booking id and client email, releasing its slot
+        Request Parameters:
+            booking_id (int) : ID of the booking to be cancelled.
+            email_address (str) : Email address of the client who made the booking.
+        Returns:
+            A JSON body confirming the cancellation.
+        Raises:
+            HTTP_400_BAD_REQUEST : if invalid data is provided
+            HTTP_404_NOT_FOUND : if no such booking exists for the client
+        """
+        serializer = CancelBookingSerializer(data=request.data)
+        if not serializer.is_valid():
+            logger.error(f"Error occured while validating the data: {serializer.errors}")
+            return Response({
+                "message": "Invalid cancellation data.",
+                "status": False,
+                "errors": serializer.errors,
+                "data": []
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        cancelled = BookingService.cancel_booking(
+            serializer.validated_data['booking_id'],
+            serializer.validated_data['email_address'],
+        )
+        if not cancelled:
+            logger.error(f"No booking {serializer.validated_data['booking_id']} found for client: {serializer.validated_data['email_address']}")
+            return Response({
+                "message": "No such booking exists for this email.",
+                "status": False,
+                "data": []
+            }, status=status.HTTP_404_NOT_FOUND)
+        logger.info(f"Cancelled booking {serializer.validated_data['booking_id']}")
+        return Response({
+            "message": "Booking cancelled successfully.",
+            "status": True,
+            "data": []
+        }, status=status.HTTP_200_OK)
+
         
 class FitnessClassesView(APIView):
     """
@@ -121,19 +223,55 @@ class FitnessClassesView(APIView):
     def get(self, request):
         """
         Retrieves all the upcoming classes
+        Query Parameters:
+            fields (str, optional): Comma separated fields to return, e.g. `id,class_name,available_slots`.
+                Only the matching columns are loaded and the instructor is joined only when requested.
+            studio (str, optional): Only the classes of this studio, otherwise the classes of every studio.
         Returns:
             A JSON body with all the upcoming classes data if present, else an empty array object
+        Raises:
+            HTTP_400_BAD_REQUEST: if an unknown field is requested
         """
         logger.info("Getting all classes")
-        all_fitness_classes = FitnessClassService.get_all_classes()
+        fields = columns = None
+        if request.query_params.get('fields'):
+            try:
+                fields = FitnessClassSerializer.parse_fields(request.query_params['fields'])
+            except ValidationError as error:
+                logger.error(f"Invalid fields requested: {error.detail}")
+                return Response({
+                    "message": "Invalid fields",
+                    "status": False,
+                    "errors": {"fields": error.detail},
+                    "data": []
+                }, status=status.HTTP_400_BAD_REQUEST)
+            columns = FitnessClassSerializer.columns_for(fields)
+
+        # the JSON listing is cached together with its compressed variants
+        use_cache = request.accepted_renderer.format == 'json'
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        studio = request.query_params.get('studio') or None
+        cache_key = ListingCache.key(fields, studio)
+        entry = ListingCache.get(cache_key) if use_cache else None
+        if entry is not None:
+            logger.info("Served upcoming classes from cache")
+            return CachedPayloadResponse(entry, accept_encoding, status=status.HTTP_200_OK)
 
-        serializer = FitnessClassSerializer(all_fitness_classes, many=True)
+        with phase("service"):
+            all_fitness_classes = FitnessClassService.get_all_classes(columns, studio)
+
+        with phase("serialization"):
+            data = FitnessClassSerializer(all_fitness_classes, many=True, context={"fields": fields}).data
         logger.info("Fetched all upcoming classes successfully!")
-        return Response({
+        payload = {
             "message": "Fetched all upcoming classes successfully!",
             "status":True,
-            "data": serializer.data
-        }, status=status.HTTP_200_OK)
+            "data": data
+        }
+        if use_cache:
+            entry = ListingCache.store(cache_key, payload)
+            return CachedPayloadResponse(entry, accept_encoding, data=payload, status=status.HTTP_200_OK)
+        return Response(payload, status=status.HTTP_200_OK)
     
     def post(self, request):
         """
@@ -143,13 +281,17 @@ class FitnessClassesView(APIView):
             instructor_id (int): ID of the instructor associated with the class
             available_slots (int): Number of slots open for the class
             scheduled_at (datetimefield) : timestamp for the class associated
+            duration_minutes (int, optional): length of the class in minutes, 60 by default
+            studio (str, optional): studio holding the class, "main" by default
         Returns:
             A JSON body containing newly created fitness class details.
         Raises:
             HTTP_400_BAD_REQUEST: for any data invalidations
         """
         serializer = CreateFitnessClassSerializer(data=request.data)
-        if not serializer.is_valid():
+        with phase("validation"):
+            valid = serializer.is_valid()
+        if not valid:
             logger.error(f"Error occured while validating data: {serializer.errors}")
             return Response({
                 "message": "Invalid data",
@@ -161,18 +303,23 @@ class FitnessClassesView(APIView):
         data = serializer.validated_data
         try:
             logger.info("Creating class with provided data...")
-            fitness_class = FitnessClassService.create_fitness_class(
-                data['class_name'],
-                data['instructor_id'],
-                data['available_slots'],
-                data['scheduled_at']
-            )
+            with phase("service"):
+                fitness_class = FitnessClassService.create_fitness_class(
+                    data['class_name'],
+                    data['instructor_id'],
+                    data['available_slots'],
+                    data['scheduled_at'],
+                    data['duration_minutes'],
+                    data['studio']
+                )
 
-            logger.info(f"Created class successfully with details: {FitnessClassSerializer(fitness_class).data}")
+            with phase("serialization"):
+                class_data = FitnessClassSerializer(fitness_class).data
+            logger.info(f"Created class successfully with details: {class_data}")
             return Response({
                 "message": "Fitness class created successfully!",
                 "status": True,
-                "data": FitnessClassSerializer(fitness_class).data
+                "data": class_data
             }, status=status.HTTP_201_CREATED)
         except Exception as error:
             logger.error(f"Exception occured: {error}")
@@ -182,6 +329,78 @@ class FitnessClassesView(APIView):
                 "data": []
             }, status=status.HTTP_400_BAD_REQUEST)
 
+class FitnessClassBatchView(APIView):
+    """
+    APIView for fetching specific fitness classes, e.g. the classes a user has favorited.
+    """
+    def get(self, request):
+        """
+        Retrieves the classes with the given IDs in a single query.
+        Query Parameters:
+            ids (str): Comma separated class IDs, at most 100.
+        Returns:
+            A JSON body with the classes found, in the requested order, and the IDs that do not exist.
+        Raises:
+            HTTP_400_BAD_REQUEST: if the IDs are missing or invalid
+        """
+        serializer = ClassIdsQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            logger.error(f"Error occured while validating class ids: {serializer.errors}")
+            return Response({
+                "message": "Invalid class IDs",
+                "status": False,
+                "errors": serializer.errors,
+                "data": []
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        fitness_classes, missing_ids = FitnessClassService.get_classes_by_ids(serializer.validated_data['ids'])
+        logger.info(f"Fetched {len(fitness_classes)} classes by id, {len(missing_ids)} not found")
+        return Response({
+            "message": "Fetched classes successfully!",
+            "status": True,
+            "data": FitnessClassSerializer(fitness_classes, many=True).data,
+            "not_found": missing_ids
+        }, status=status.HTTP_200_OK)
+
+class ClassSearchView(APIView):
+    """
+    APIView for finding upcoming classes with free seats, e.g. "anything free this evening at my studio".
+    Answers from the in-memory availability index, never from the class table.
+    """
+    def get(self, request):
+        """
+        Searches upcoming classes by time window, class type, instructor, studio and seats left.
+        Query Parameters:
+            start (datetime, optional): Earliest start, now by default.
+            end (datetime, optional): Latest start, 24 hours after `start` by default.
+            class_type (str, optional): Choices of YOGA, ZUMBA, HIIT
+            instructor_id (int, optional): ID of the instructor.
+            studio (str, optional): Studio of the classes.
+            min_slots (int, optional): Fewest seats left, 1 by default.
+            limit (int, optional): Most classes returned, 50 by default and at most 200.
+        Returns:
+            A JSON body with the matching classes ordered by scheduled time.
+        Raises:
+            HTTP_400_BAD_REQUEST: for any invalid query parameter
+        """
+        serializer = ClassSearchQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            logger.error(f"Error occured while validating the search: {serializer.errors}")
+            return Response({
+                "message": "Invalid query parameters",
+                "status": False,
+                "errors": serializer.errors,
+                "data": []
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        fitness_classes = FitnessClassService.search_classes(**serializer.validated_data)
+        instructors = InstructorCache.get_many(fitness_class.instructor_id for fitness_class in fitness_classes)
+        return Response({
+            "message": "Fetched classes successfully!",
+            "status": True,
+            "data": ClassSearchResultSerializer(fitness_classes, many=True, context={"instructors": instructors}).data
+        }, status=status.HTTP_200_OK)
+
 class InstructorView(APIView):
     """
     APIView for handling operations supporting Instructors.
@@ -213,4 +432,209 @@ class InstructorView(APIView):
             "message": "Instructor created successfully",
             "status": True,
             "data": InstructorSerializer(instructor).data
-        }, status=status.HTTP_201_CREATED)
\ No newline at end of file
+        }, status=status.HTTP_201_CREATED)
+
+
+class OccupancyAnalyticsView(APIView):
+    """
+    APIView for occupancy analytics.
+    Answers from the pre-aggregated occupancy rollups, never from the booking table.
+    """
+    def get(self, request):
+        """
+        Retrieves fill rates of classes grouped by class type, instructor, weekday or hour.
+        Query Parameters:
+            start_date (date, optional): First class date to include (YYYY-MM-DD).
+            end_date (date, optional): Last class date to include (YYYY-MM-DD).
+            class_type (str, optional): Choices of YOGA, ZUMBA, HIIT
+            group_by (str, optional): class_type (default), instructor, weekday or hour
+        Returns:
+            A JSON body with classes, capacity, bookings and fill rate of every group.
+        Raises:
+            HTTP_400_BAD_REQUEST: for any invalid query parameter
+        """
+        serializer = OccupancyQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            logger.error(f"Error occured while validating the query: {serializer.errors}")
+            return Response({
+                "message": "Invalid query parameters",
+                "status": False,
+                "errors": serializer.errors,
+                "data": []
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        occupancy = OccupancyService.get_occupancy(**serializer.validated_data)
+        return Response({
+            "message": "Fetched occupancy successfully!",
+            "status": True,
+            "data": occupancy
+        }, status=status.HTTP_200_OK)
+
+
+class AvailabilityStreamView(View):
+    """
+    Server-Sent Events stream of seat availability for upcoming classes.
+    Sends one `snapshot` event with the current seat counts, followed by `availability`
+    events carrying only the classes whose seat count changed since the last event.
+    Under ASGI each connection is held open by an async task. Under WSGI (e.g. `runserver`) the stream
+    is a plain iterator and holds a worker thread for as long as it stays open.
+    Streams end after `STREAM_MAX_SECONDS`, EventSource clients then reconnect and get a fresh snapshot.
+    """
+    @staticmethod
+    def snapshot_event(snapshot):
+        logger.info(f"Opened availability stream with {len(snapshot)} upcoming classes")
+        return f"retry: {STREAM_RETRY_MS}\nevent: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+
+    @staticmethod
+    def availability_event(events):
+        return f"event: availability\ndata: {json.dumps(events)}\n\n" if events else ": keep-alive\n\n"
+
+    @staticmethod
+    async def async_event_stream():
+        broadcaster = get_broadcaster()
+        # subscribe before taking the snapshot so no change falls in between
+        subscription = broadcaster.subscribe()
+        try:
+            snapshot = await sync_to_async(FitnessClassService.get_availability_snapshot)()
+            yield AvailabilityStreamView.snapshot_event(snapshot)
+            closes_at = time.monotonic() + STREAM_MAX_SECONDS
+            while (remaining := closes_at - time.monotonic()) > 0:
+                events = await subscription.next_batch(min(STREAM_KEEPALIVE_SECONDS, remaining))
+                yield AvailabilityStreamView.availability_event(events)
+        finally:
+            broadcaster.unsubscribe(subscription)
+            logger.info("Closed availability stream")
+
+    @staticmethod
+    def event_stream():
+        broadcaster = get_broadcaster()
+        subscription = broadcaster.subscribe()
+        try:
+            yield AvailabilityStreamView.snapshot_event(FitnessClassService.get_availability_snapshot())
+            closes_at = time.monotonic() + STREAM_MAX_SECONDS
+            while (remaining := closes_at - time.monotonic()) > 0:
+                events = subscription.wait_batch(min(STREAM_KEEPALIVE_SECONDS, remaining))
+                yield AvailabilityStreamView.availability_event(events)
+        finally:
+            broadcaster.unsubscribe(subscription)
+            logger.info("Closed availability stream")
+
+    def get(self, request):
+        """
+        Opens the availability stream.
+        Returns:
+            A `text/event-stream` response that stays open for `STREAM_MAX_SECONDS`.
+        """
+        # a WSGI server would drain an async iterator before sending anything
+        stream = self.async_event_stream() if isinstance(request, ASGIRequest) else self.event_stream()
+        response = StreamingHttpResponse(stream, content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class CalendarFeedView(View):
+    """
+    iCalendar feed of a client's booked classes, for calendar apps to subscribe to.
+    Polls are answered from the client's bookings version: `304 Not Modified` while it matches the
+    ETag the app already has, otherwise the feed is served from cache or generated as a stream.
+    """
+    def get(self, request):
+        """
+        Retrieves a client's calendar feed.
+        Query Parameters:
+            email_address (str): The email address of the client (case-insensitive).
+        Returns:
+            A `text/calendar` body with one event per booking, or 304 if the feed has not changed.
+        Raises:
+            HTTP_400_BAD_REQUEST: if the 'email_address' parameter is missing
+            HTTP_404_NOT_FOUND: if no client has this email
+        """
+        client_email = request.GET.get('email_address')
+        if not client_email:
+            logger.error(f"Email is absent in the params!")
+            return JsonResponse({
+                "message": "Email is absent in the params!",
+                "status": False,
+                "data": []
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        feed_version = CalendarService.feed_version(client_email)
+        if feed_version is None:
+            logger.error(f"No client found for the calendar feed of: {client_email}")
+            return JsonResponse({
+                "message": f"No client exists with email: {client_email}",
+                "status": False,
+                "data": []
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        etag = CalendarService.etag(*feed_version)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            return not_modified
+
+        body = CalendarService.cached_feed(*feed_version)
+        if body is not None:
+            response = HttpResponse(body, content_type="text/calendar; charset=utf-8")
+        else:
+            logger.info(f"Generating calendar feed version {feed_version[1]} of client {feed_version[0]}")
+            response = StreamingHttpResponse(
+                CalendarService.stream_feed(*feed_version), content_type="text/calendar; charset=utf-8"
+            )
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        response["Content-Disposition"] = 'inline; filename="bookings.ics"'
+        return response
+
+
+class MetricsView(View):
+    """
+    Prometheus scrape endpoint with the request, database, booking and cache metrics of all workers.
+    With `BOOKINGS_METRICS_TOKEN` set, scrapes must send it as a bearer token.
+    """
+    def get(self, request):
+        """
+        Returns:
+            The metrics in the Prometheus text exposition format.
+        Raises:
+            HTTP_403_FORBIDDEN: if a token is configured and the request does not carry it
+        """
+        token = getattr(settings, "BOOKINGS_METRICS_TOKEN", None)
+        if token and not hmac.compare_digest(
+            request.META.get("HTTP_AUTHORIZATION", "").encode(), f"Bearer {token}".encode()
+        ):
+            logger.error("Metrics scrape without a valid token")
+            return HttpResponse("Forbidden", status=status.HTTP_403_FORBIDDEN, content_type="text/plain")
+        return HttpResponse(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class ProfileReportView(APIView):
+    """
+    APIView for downloading stored request profiles, staff only.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, report_id):
+        """
+        Retrieves a profile report recorded by the profiling middleware.
+        Path Parameters:
+            report_id (str): The ID sent back in the `X-Profile-Report` header of the profiled response.
+        Returns:
+            A JSON body with phase timings, SQL queries with timings and EXPLAIN plans, and cProfile stats.
+        Raises:
+            HTTP_404_NOT_FOUND: if no report has this ID
+        """
+        report = load_report(report_id)
+        if report is None:
+            logger.error(f"No profile report found with id: {report_id}")
+            return Response({
+                "message": "No such profile report.",
+                "status": False,
+                "data": []
+            }, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            "message": "Fetched profile report successfully!",
+            "status": True,
+            "data": report
+        }, status=status.HTTP_200_OK)
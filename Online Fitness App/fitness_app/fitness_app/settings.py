@@ -42,13 +42,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'bookings.middleware.metrics_middleware',
     'django.middleware.security.SecurityMiddleware',
+    'bookings.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'bookings.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'bookings.middleware.identity_map_middleware',
 ]
 
 ROOT_URLCONF = 'fitness_app.urls'
@@ -82,6 +86,9 @@ DATABASES = {
     }
 }
 
+# Places each studio's classes and bookings on its database alias, see BOOKINGS_STUDIO_DATABASES
+DATABASE_ROUTERS = ['bookings.routers.StudioRouter']
+
 
 LOGGING = {
     'version': 1,
@@ -109,6 +116,81 @@ LOGGING = {
     },
 }
 
+# Backend used by the availability stream to fan out seat changes.
+# Replace with a pub/sub backend when running several worker processes.
+BOOKINGS_AVAILABILITY_BACKEND = 'bookings.services.availability_broadcaster.LocalBackend'
+
+# Classes scheduled longer ago than this are moved to the archive tables
+# by `python manage.py archive_classes` (run it from cron or any scheduler).
+BOOKINGS_ARCHIVE_RETENTION_DAYS = 90
+
+# Cache used for the upcoming-classes listing (and its precompressed variants).
+# Point it at a shared backend (Redis / Memcached) when running several workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Seconds a cached class listing stays valid; it is also invalidated whenever a class changes.
+BOOKINGS_LISTING_CACHE_TIMEOUT = 30
+
+# Seconds a generated calendar feed stays cached; feeds are versioned, so this only bounds memory use.
+BOOKINGS_CALENDAR_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Size of each worker's in-process instructor cache, and how often (in seconds) a worker checks
+# the shared version stamp for instructor changes made by other workers.
+BOOKINGS_INSTRUCTOR_CACHE_SIZE = 1000
+BOOKINGS_INSTRUCTOR_CACHE_RECHECK_SECONDS = 1.0
+
+# Seconds after which a worker rebuilds its in-memory class search index. Changes made in the same worker
+# reach it at once. Those made by other workers only do through a cross-process availability backend,
+# otherwise this bounds how long a new or rescheduled class can be missed by searches (seat counts of
+# the classes found are then always read back from the database).
+BOOKINGS_SEARCH_INDEX_MAX_AGE = 60
+
+# Responses smaller than this many bytes are not compressed.
+BOOKINGS_COMPRESSION_MIN_SIZE = 512
+
+# Opt-in request profiling for staff users. When disabled the middleware removes itself.
+# Profiled are staff requests carrying `?profile=1` (or an `X-Profile: 1` header) and a
+# SAMPLE_RATE fraction of all other staff requests. Reports are written to REPORT_DIR and
+# downloaded from /api/profiling/reports/<id>/.
+BOOKINGS_PROFILING = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 0.0,
+    'REPORT_DIR': BASE_DIR / 'profiles',
+}
+
+# Group commit for bursts of bookings on the same class: the first request waits up to WINDOW_MS
+# (or until MAX_BATCH_SIZE requests arrived) and books the whole batch in one transaction.
+# Only useful with threaded workers, a process serving one request at a time never batches.
+BOOKINGS_GROUP_COMMIT = {
+    'ENABLED': False,
+    'WINDOW_MS': 5,
+    'MAX_BATCH_SIZE': 50,
+}
+
+# Directory where every worker process writes its metrics, so that /api/metrics/ reports the
+# totals of all workers. Leave unset to report the metrics of the answering process only.
+# With several workers point it at a directory shared by them. Each worker removes its file when it
+# exits, files not written for BOOKINGS_METRICS_RETENTION_SECONDS (killed workers) are deleted by scrapes.
+BOOKINGS_METRICS_DIR = None
+BOOKINGS_METRICS_RETENTION_SECONDS = 24 * 60 * 60
+# Bearer token /api/metrics/ scrapes must send (`Authorization: Bearer <token>`). Left unset the endpoint
+# is open to anyone reaching the server, so it must then only be reachable from the internal network.
+BOOKINGS_METRICS_TOKEN = None
+
+# Database alias holding the classes, bookings and seat counts of each studio, studios not listed
+# stay on 'default'. Clients and instructors live on 'default' and are copied into the other aliases.
+BOOKINGS_STUDIO_DATABASES = {}
+# Number of every alias holding classes: alias n hands out class and booking IDs from n * 10**12 on,
+# so an ID tells which alias holds the row. Numbers must never change once an alias holds data.
+# Run `python manage.py migrate --database=<alias>` for every new alias.
+BOOKINGS_SHARD_NUMBERS = {
+    'default': 0,
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -0,0 +1,28 @@
+"""
+Settings splitting the studios over several local SQLite files, e.g. for
+`python manage.py test bookings.tests.test_sharding --settings=fitness_app.settings_sharded`.
+"""
+from fitness_app.settings import *  # noqa: F401,F403
+from fitness_app.settings import BASE_DIR, DATABASES
+
+DATABASES = {
+    **DATABASES,
+    'studio_north': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_studio_north.sqlite3',
+    },
+    'studio_south': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_studio_south.sqlite3',
+    },
+}
+
+BOOKINGS_STUDIO_DATABASES = {
+    'north': 'studio_north',
+    'south': 'studio_south',
+}
+BOOKINGS_SHARD_NUMBERS = {
+    'default': 0,
+    'studio_north': 1,
+    'studio_south': 2,
+}